@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+import sys
+import argparse
+from gbstools import digest
+from gbstools import gbsbed
+
+USAGE = """
+digest_fasta.py -f <reference FASTA file>
+                -e <enzyme names> (e.g. -e PstI MspI)
+                -o <output file> (default=stdout)
+                --gbsbed (write GBSBED instead of BED)
+"""
+
+DESCRIPTION = """
+In-silico restriction digest of a reference genome, replacing EMBOSS
+restrict + digest_to_bed.py. Writes a BED file of restriction sites, or
+with --gbsbed a GBSBED file (as made by make_gbsbed.py). If the GBSBED
+file name ends in .gz, the output is compressed with bgzip and indexed
+with tabix. The FASTA file may be bgzipped, and is indexed with faidx if
+it has no index. Supported enzymes: %s. Other enzymes can be given with
+--site NAME=SEQUENCE (IUPAC codes allowed), along with their ligation
+offsets (--ligation_offsets) for GBSBED output.
+""" % ', '.join(sorted(digest.ENZYMES))
+
+parser = argparse.ArgumentParser(usage=USAGE, description=DESCRIPTION)
+parser.add_argument('-f', '--fasta', dest='f', required=True, help='reference FASTA file')
+parser.add_argument('-e', '--enzymes', dest='e', nargs='+', default=[], help='enzyme names')
+parser.add_argument('--site', dest='site', action='append', default=[], help='NAME=SEQUENCE of an additional enzyme')
+parser.add_argument('-o', '--output', dest='o', default=None, help='output file (default=stdout)')
+parser.add_argument('--gbsbed', dest='gbsbed', action='store_true', help='write GBSBED instead of BED')
+parser.add_argument('--ligation_offsets', dest='offsets', default=None, help='file of ligation site offsets from recognition sites')
+parser.add_argument('--ligation_sort', dest='ligsort', action="store_true", help='sort fwd and rev ligation sites separately')
+parser.add_argument('-p', '--processes', dest='p', type=int, default=1, help='number of processes (default=1)')
+parser.add_argument('--region_size', dest='region_size', type=int, default=10000000, help='bases digested per task (default=10,000,000)')
+args = parser.parse_args()
+
+enzymes = {}
+for enzyme in args.e:
+    if enzyme not in digest.ENZYMES:
+        sys.exit("Unknown enzyme %s. Use --site %s=SEQUENCE." % (enzyme, enzyme))
+    enzymes[enzyme] = digest.ENZYMES[enzyme]
+for site in args.site:
+    try:
+        enzyme, seq = site.split('=')
+        digest.site_mask(seq)
+    except (ValueError, KeyError):
+        sys.exit("Couldn't parse --site %s (expected NAME=SEQUENCE)." % site)
+    enzymes[enzyme] = seq.upper()
+if not enzymes:
+    sys.exit("No enzymes given (use -e and/or --site).")
+
+sites = digest.digest(args.f, enzymes, processes=args.p, region_size=args.region_size)
+
+if args.gbsbed:
+    offsets = gbsbed.DEFAULT_OFFSETS
+    if args.offsets:
+        try:
+            offsets = gbsbed.parse_offsets(args.offsets)
+        except (IOError, ValueError):
+            sys.stderr.write("Couldn't parse %s. Using default offsets.\n" % args.offsets)
+    records = gbsbed.make_sites(sites, offsets, args.ligsort)
+    if args.o:
+        gbsbed.write_file(records, args.o)
+    else:
+        gbsbed.write(records, sys.stdout)
+else:
+    if args.o:
+        outstream = open(args.o, 'w')
+    else:
+        outstream = sys.stdout
+    digest.write_bed(sites, outstream)
+    outstream.close()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+import sys
+import argparse
+import numpy
+import gbstools
+from gbstools import dispersion
+
+# Parse command line arguments from user.
+USAGE = """
+estimate_dispersion.py -i <input vcf file>
+                       -b <tab-delimited file of sample/bam file pairs>
+                       --normfactors <output from normfactors.py>
+                       > dispersion.txt
+"""
+
+DESCRIPTION = """
+Estimate the coverage dispersion index of the GBStools model as a linear
+function of mean coverage (slope and intercept) from a sample of markers,
+optionally for bins of the median insert size. The output file can be given
+to polymorphism_test.py with --dispersion in place of --dispersion_slope and
+--dispersion_intercept.
+"""
+
+parser = argparse.ArgumentParser(usage=USAGE, description=DESCRIPTION)
+parser.add_argument('-i', '--input', dest='i', help='input VCF file containing GBS SNPs', required=True)
+parser.add_argument('-o', '--output', dest='o', default=None, help='output dispersion file (default is stdout)')
+parser.add_argument('-b', '--bam', dest='bamlist', default=None, help='list of sample/bam file pairs (use bam files instead of VCF to get alignment data)')
+parser.add_argument('-n', '--normfactors', dest='nf', default=None, help='normalization factors file (default NF=1.0 for all samples). See also normfactors.py.')
+parser.add_argument('-s', '--samples', dest='samples', default=None, help='samples to include')
+parser.add_argument('--markers', dest='markers', default=10000, type=int, help='maximum number of markers to use (default=10000)')
+parser.add_argument('--step', dest='step', default=1, type=int, help='use every STEP-th marker of the VCF (default=1)')
+parser.add_argument('--bins', dest='bins', default=None, help='comma-separated insert size bin edges, e.g. 0,200,300,500 (default is no bins)')
+parser.add_argument('--min_samples', dest='min_samples', default=5, type=int, help='minimum samples with reads for a marker to be used (default=5)')
+parser.add_argument('--constant', dest='constant', action='store_true', help='fit a constant dispersion index (slope 0)')
+args = parser.parse_args()
+
+reader = gbstools.Reader(filename=args.i, bamlist=args.bamlist, norm=args.nf,
+                         samples=args.samples, dpmode=True)
+
+# Collect the depths, normalization factors and median insert sizes of the markers.
+dp = []
+nf = []
+inserts = []
+while len(dp) < args.markers:
+    try:
+        marker = reader.next()
+    except StopIteration:
+        break
+    dp.append([call.DP for call in marker.calls])
+    nf.append([call.NF for call in marker.calls])
+    inserts.append(marker.info['InsMed'])
+    if args.step > 1:
+        reader.skip(args.step - 1)
+if not dp:
+    sys.exit("No markers in %s." % args.i)
+
+if args.bins:
+    edges = [float(edge) for edge in args.bins.split(',')]
+else:
+    edges = []
+result, counts = dispersion.estimate(numpy.array(dp), numpy.array(nf), inserts, edges,
+                                     args.constant, args.min_samples)
+
+if args.o:
+    outstream = open(args.o, 'w')
+else:
+    outstream = sys.stdout
+dispersion.write(outstream, result, counts)
+if args.o:
+    outstream.close()
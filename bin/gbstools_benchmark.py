@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+import os
+import sys
+import argparse
+import tempfile
+from gbstools import benchmark
+
+USAGE = """
+gbstools_benchmark.py --samples <numbers of samples>
+                      --markers <number of markers>
+                      --lambda <mean depths of coverage>
+                      --data <pl and/or dp>
+                      -o <output JSON file>
+                      --baseline <baseline JSON file to compare against>
+"""
+
+DESCRIPTION = """
+Benchmark the cold import time of gbstools, the EM (em.update, em.ped_update, Marker.fit), Reader (VCF and
+bamlist modes), Writer, annotate_se_bam.py, annotate_pe_bam.py and
+mapping_summary.py on synthetic data sets of a given number of markers, for
+each combination of sample count, depth of coverage and data type (pl: DP
+and PL, dp: DP only). Results (markers/sec, reads/sec and peak RSS of each
+benchmark) are written as JSON. With --baseline, results are compared with
+a previous run and regressions are reported (exit status 1).
+Benchmarks: %s.
+""" % ', '.join([name for name, func in benchmark.BENCHMARKS])
+
+parser = argparse.ArgumentParser(usage=USAGE, description=DESCRIPTION)
+parser.add_argument('--samples', dest='samples', type=int, nargs='+', default=[100], help='numbers of samples (default=100)')
+parser.add_argument('--markers', dest='markers', type=int, default=200, help='number of markers (default=200)')
+parser.add_argument('-l', '--lambda', dest='lamb', type=float, nargs='+', default=[20.0], help='mean depths of coverage (default=20)')
+parser.add_argument('-d', '--dispersion', dest='d', type=float, default=2.5, help='index of dispersion (default=2.5)')
+parser.add_argument('--data', dest='data', nargs='+', choices=['pl', 'dp'], default=['pl'], help='data types: pl (DP and PL) and/or dp (DP only) (default=pl)')
+parser.add_argument('-b', '--benchmarks', dest='benchmarks', nargs='+', default=None, help='benchmarks to run (default=all)')
+parser.add_argument('-r', '--repeat', dest='repeat', type=int, default=3, help='runs per benchmark; the fastest is reported (default=3)')
+parser.add_argument('--seed', dest='seed', type=int, default=0, help='seed for the synthetic data (default=0)')
+parser.add_argument('-w', '--workdir', dest='workdir', default=None, help='directory for the synthetic data (default=temporary directory)')
+parser.add_argument('-o', '--output', dest='o', default='benchmark.json', help='output JSON file (default=benchmark.json)')
+parser.add_argument('--baseline', dest='baseline', default=None, help='baseline JSON file to compare the results with')
+parser.add_argument('--tolerance', dest='tolerance', type=float, default=0.1, help='fraction by which throughput may fall or RSS rise before a regression is reported (default=0.1)')
+args = parser.parse_args()
+
+names = [name for name, func in benchmark.BENCHMARKS]
+if args.benchmarks:
+    for name in args.benchmarks:
+        if name not in names:
+            sys.exit("Unknown benchmark %s." % name)
+    names = [name for name in names if name in args.benchmarks]
+workdir = args.workdir or tempfile.mkdtemp(prefix='gbstools_benchmark.')
+bindir = os.path.dirname(os.path.abspath(__file__))
+
+workloads = benchmark.workloads(args.samples, args.markers, args.lamb, args.d, args.data, args.seed)
+results = benchmark.run(workloads, names, workdir, bindir, repeat=args.repeat)
+benchmark.write_results(results, args.o)
+
+if args.baseline:
+    regressions = benchmark.compare(results, args.baseline, args.tolerance)
+    for result, old, reasons in regressions:
+        sys.stderr.write('REGRESSION %s: %s\n' % (benchmark.format_result(result), '; '.join(reasons)))
+    if regressions:
+        sys.exit(1)
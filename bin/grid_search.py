@@ -3,7 +3,7 @@ import re
 import sys
 import argparse
 import gbstools
-import copy
+import numpy
 
 # Parse command line arguments from user.
 USAGE = """
@@ -16,7 +16,9 @@ polymorphism_test.py -i <input vcf file>
 DESCRIPTION = """
 Calculate likelihood ratio for absence/presence of restriction site polymorphism
 at GBS SNPs with GBStools, and output maximum likelihood estimates of allele
-frequency at restriction sites.
+frequency at restriction sites. The H1 log-likelihood is printed on a lambda x
+phi3 grid; grid points without a likelihood (lambda 0, or phi3 larger than
+the REF or ALT frequency it is taken from) are printed as -inf.
 """
 
 parser = argparse.ArgumentParser(usage=USAGE, description=DESCRIPTION)
@@ -65,9 +67,12 @@ try:
 except:
    snps = (snp for snp in reader)
 
+lambda_grid = [args.lambdamin + i * (args.lambdamax - args.lambdamin) / args.lambdagrid for i in range(args.lambdagrid + 1)]
+phi_grid = [args.phimin + i * (args.phimax - args.phimin) / args.phigrid for i in range(args.phigrid + 1)]
+
 # Print header.
 header = ['CHROM', 'POS', 'lambda']
-header += [str(args.phimin + i * (args.phimax - args.phimin) / args.phigrid) for i in range(args.phigrid + 1)]
+header += [str(phi3) for phi3 in phi_grid]
 header += ['lambda_em', 'phi3_em', 'loglik_em']
 print '\t'.join(header)
 
@@ -83,26 +88,22 @@ for snp in snps:
 
       # Do the grid search.
       if not snp.param['H1'][-1]['fail']:
-         for lamb in [args.lambdamin + i * (args.lambdamax - args.lambdamin) / args.lambdagrid for i in range(args.lambdagrid + 1)]:
-            output = [snp.record.CHROM, snp.record.POS, lamb]
-            for phi3 in [args.phimin + i * (args.phimax - args.phimin) / args.phigrid for i in range(args.phigrid + 1)]:
-               # Start with the last parameter estimates from EM.
-               param = copy.deepcopy(snp.param['H1'][-1])
-               # Re-set the lambda and phi3 parameters to the grid parameters.
-               param['lambda'] = lamb
-               param['phi'][2] = phi3
-               # Subtract phi3 from phi1 or phi2, whichever is larger.
-               if param['phi'][0] > param['phi'][1]:
-                  param['phi'][0] -= phi3
-               else:
-                  param['phi'][1] -=  phi3  
-               # Calculate log likelihood (with update function).
-               param_updated = snp.update_param([param])
-               # Add loglik to grid.
-               output.append(param_updated['loglik'])
-            output += [snp.param['H1'][-1]['lambda'], snp.param['H1'][-1]['phi'][2], snp.param['H1'][-1]['loglik']]
+         param = snp.param['H1'][-1]
+         lambdas = numpy.array(lambda_grid)
+         # Re-set phi3 to the grid values, subtracting phi3 from phi1 or phi2, whichever is larger.
+         phi = numpy.tile(param['phi'], (len(phi_grid), 1))
+         phi[:, 2] = phi_grid
+         if param['phi'][0] > param['phi'][1]:
+            phi[:, 0] -= phi_grid
+         else:
+            phi[:, 1] -= phi_grid
+         # Calculate the lambda x phi3 loglik surface (other parameters from EM).
+         surface = snp.loglik_surface(phi[numpy.newaxis], lambdas[:, numpy.newaxis], param['delta'])
+         for lamb, logliks in zip(lambda_grid, surface.tolist()):
+            output = [snp.record.CHROM, snp.record.POS, lamb] + logliks
+            output += [param['lambda'], param['phi'][2], param['loglik']]
             print '\t'.join([str(i) for i in output])
-            
+
       while not snp.check_convergence(snp.param['H0']):
          param = snp.update_param(snp.param['H0'])
          snp.param['H0'].append(param)
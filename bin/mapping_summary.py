@@ -1,80 +1,195 @@
 #!/usr/bin/env python
+import os
+import sys
 import argparse
+import multiprocessing
+import numpy
 import pysam
 
+try:
+    from collections import Counter
+except ImportError:
+    from counter import Counter
+
 USAGE = """
-mapping_summary.py -i <input BAM file>
+mapping_summary.py -i <input BAM file(s)>
+                   -b <tab-delimited file of sample/bam file pairs>
+                   -o <output directory> (default=stdout for a single BAM file)
+                   -p <number of processes>
 """
 
 DESCRIPTION = """
 Summarize restriction site mapping for a BAM file annotated with
-annotate_pe_bam.py or annotate_se_bam.py.
+annotate_pe_bam.py or annotate_se_bam.py. The BAM index is split into
+regions that are scanned in parallel, and several BAM files can be
+summarized in one run (one summary file is written per sample). BAM files
+without an index are scanned in one pass by a single worker.
 """
 
 parser = argparse.ArgumentParser(usage=USAGE, description=DESCRIPTION)
-parser.add_argument('-i',dest='i',help='input bam file', required=True)
+parser.add_argument('-i', dest='i', nargs='+', default=[], help='input bam file(s); only indexed bam files are split into regions')
+parser.add_argument('-b', '--bamlist', dest='bamlist', default=None, help='list of sample/bam file pairs; only indexed bam files are split into regions')
+parser.add_argument('-o', '--outdir', dest='outdir', default=None, help='output directory for summary files (default=stdout for a single bam file)')
+parser.add_argument('--suffix', dest='suffix', default='.rs_mapping_summary', help='summary file suffix (default=.rs_mapping_summary)')
+parser.add_argument('--summaries', dest='summaries', default=None, help='write a list of sample/summary file pairs for normfactors.py')
+parser.add_argument('-p', '--processes', dest='processes', type=int, default=1, help='number of worker processes (default=1)')
+parser.add_argument('--region_size', dest='region_size', type=int, default=10000000, help='size of the BAM regions scanned by each worker (default=10000000)')
 args = parser.parse_args()
 
-bam = pysam.Samfile(args.i, 'rb')
-enzyme_counts = {}
-insert_counts = {}
-# Keyed by: no. mapped, no. mapped to restriction site.
-read_counts = {0:{0:0, 1:0, 2:0},
-               1:{0:0, 1:0, 2:0},
-               2:{0:0, 1:0, 2:0}}
-
-print "# file: %s" % args.i
-print "#"
-for read in bam:
-    tags = dict(read.tags)
-    enzyme1, enzyme2, insert = None, None, None
+
+def has_index(bam):
+    '''Check whether a bam file has an index.'''
     try:
-        # Get the enzyme tag.
-        enzyme1 = tags['Z2'].split(';')[0]
-        if enzyme1 in enzyme_counts:
-            # Increment the read counter for that enzyme.
+        return(bam.has_index())
+    except AttributeError:
+        # pysam < 0.9
+        return(bam._hasIndex())
+
+
+def get_regions(bamfile, region_size):
+    '''Split the reference sequences of a bam file into regions. A bam file
+    without an index is one region, (None, None, None).'''
+    bam = pysam.Samfile(bamfile, 'rb')
+    if not has_index(bam):
+        bam.close()
+        return([(None, None, None)])
+    regions = []
+    for chrom, length in zip(bam.references, bam.lengths):
+        for start in range(0, length, region_size):
+            regions.append((chrom, start, min(start + region_size, length)))
+    # Reads without a reference are scanned separately.
+    regions.append(('*', None, None))
+    bam.close()
+    return(regions)
+
+
+def summarize_region(task):
+    '''Count reads, enzymes and inserts in one region of a bam file.'''
+    index, bamfile, (chrom, start, end) = task
+    bam = pysam.Samfile(bamfile, 'rb')
+    # Keyed by: no. mapped, no. mapped to restriction site.
+    read_counts = numpy.zeros((3, 3), dtype=numpy.int64)
+    enzyme_counts = Counter()
+    insert_counts = Counter()
+    if chrom is None:
+        reads = bam.fetch(until_eof=True)
+    elif chrom == '*':
+        # Only recent pysam versions fetch the unplaced reads by region,
+        # so look for them in a scan of the whole file.
+        reads = (read for read in bam.fetch(until_eof=True) if read.tid < 0)
+    else:
+        reads = bam.fetch(chrom, start, end)
+    for read in reads:
+        # Reads that overlap the start of the region were counted with the
+        # previous region.
+        if start is not None and read.pos < start:
+            continue
+        enzyme1, enzyme2 = None, None
+        try:
+            # Get the enzyme tag.
+            enzyme1 = read.opt('Z2').split(';')[0]
             enzyme_counts[enzyme1] += 1
+        except KeyError:
+            pass
+        try:
+            # Get the mate enzyme tag.
+            enzyme2 = read.opt('Z4').split(';')[0]
+        except KeyError:
+            pass
+        try:
+            # Get the insert size.
+            insert_counts[read.opt('Z0')] += 1
+        except KeyError:
+            pass
+        if read.is_paired:
+            # Number of reads in pair that mapped.
+            mapped = 2 - (read.is_unmapped + read.mate_is_unmapped)
         else:
-            enzyme_counts[enzyme1] = 1
-    except:
-        pass
-    try:
-        # Get the mate enzyme tag.
-        enzyme2 = tags['Z4'].split(';')[0]
-    except:
-        pass
-    try:
-        # Get the insert size.
-        insert = tags['Z0']
-        if insert in insert_counts:
-            # Increment the read counter for that insert size.
-            insert_counts[insert] += 1
-        else:
-            insert_counts[insert] = 1
-    except:
-        pass
-    if read.is_paired:
-        # Number of reads in pair that mapped.
-        mapped = 2 - (read.is_unmapped + read.mate_is_unmapped)
-    else:
-        mapped = not read.is_unmapped
-    # Number of read in pair that mapped to a restriction site.
-    enzyme_mapped = bool(enzyme1) + bool(enzyme2)
-    # Increment the read counter.
-    read_counts[mapped][enzyme_mapped] += 1
-
-print "# mapped_in_pair\tmapped_in_pair_to_restriction_site\treads"
-for i in (0, 1, 2):
-    for j in (0, 1, 2):
-        print "# %i\t%i\t%i" % (i, j, read_counts[i][j])
-print "#"
-
-print "# enzyme\treads"
-for enzyme in enzyme_counts:
-    print "# %s\t%i" % (enzyme, enzyme_counts[enzyme])
-print "#"
-
-print "insert_size\treads"
-inserts = sorted(insert_counts.keys())
-for insert in inserts:
-    print "%i\t%i" % (insert, insert_counts[insert])
+            mapped = int(not read.is_unmapped)
+        # Number of read in pair that mapped to a restriction site.
+        enzyme_mapped = bool(enzyme1) + bool(enzyme2)
+        read_counts[mapped, enzyme_mapped] += 1
+    bam.close()
+    return(index, read_counts, enzyme_counts, insert_counts)
+
+
+def write_summary(out, bamfile, read_counts, enzyme_counts, insert_counts):
+    '''Write the mapping summary for one bam file.'''
+    lines = ["# file: %s" % bamfile, "#"]
+    lines.append("# mapped_in_pair\tmapped_in_pair_to_restriction_site\treads")
+    for i in (0, 1, 2):
+        for j in (0, 1, 2):
+            lines.append("# %i\t%i\t%i" % (i, j, read_counts[i, j]))
+    lines.append("#")
+    lines.append("# enzyme\treads")
+    for enzyme in sorted(enzyme_counts):
+        lines.append("# %s\t%i" % (enzyme, enzyme_counts[enzyme]))
+    lines.append("#")
+    lines.append("insert_size\treads")
+    for insert in sorted(insert_counts):
+        lines.append("%i\t%i" % (insert, insert_counts[insert]))
+    out.write('\n'.join(lines) + '\n')
+    return(None)
+
+
+# Make a list of (sample, bam file) pairs.
+bams = []
+for bamfile in args.i:
+    sample = os.path.basename(bamfile)
+    if sample.endswith('.bam'):
+        sample = sample[:-4]
+    bams.append((sample, bamfile))
+if args.bamlist:
+    for line in open(args.bamlist, 'r'):
+        line = line.strip()
+        if line:
+            sample, bamfile = line.split()
+            bams.append((sample, bamfile))
+if not bams:
+    parser.error('no input bam files (use -i or -b)')
+
+# Each task is one region of one bam file.
+tasks = []
+for index, (sample, bamfile) in enumerate(bams):
+    for region in get_regions(bamfile, args.region_size):
+        tasks.append((index, bamfile, region))
+
+# Merge the partial histograms from each region.
+read_counts = [numpy.zeros((3, 3), dtype=numpy.int64) for bam in bams]
+enzyme_counts = [Counter() for bam in bams]
+insert_counts = [Counter() for bam in bams]
+if args.processes > 1:
+    pool = multiprocessing.Pool(args.processes)
+    results = pool.imap_unordered(summarize_region, tasks)
+else:
+    pool = None
+    results = (summarize_region(task) for task in tasks)
+for index, region_reads, region_enzymes, region_inserts in results:
+    read_counts[index] += region_reads
+    enzyme_counts[index].update(region_enzymes)
+    insert_counts[index].update(region_inserts)
+if pool:
+    pool.close()
+    pool.join()
+
+# Write one summary per sample.
+if len(bams) == 1 and args.outdir is None and args.summaries is None:
+    sample, bamfile = bams[0]
+    write_summary(sys.stdout, bamfile, read_counts[0], enzyme_counts[0], insert_counts[0])
+else:
+    outdir = args.outdir or '.'
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    summaries = []
+    for index, (sample, bamfile) in enumerate(bams):
+        summary = os.path.join(outdir, sample + args.suffix)
+        out = open(summary, 'w')
+        write_summary(out, bamfile, read_counts[index], enzyme_counts[index],
+                      insert_counts[index])
+        out.close()
+        summaries.append((sample, summary))
+    if args.summaries:
+        out = open(args.summaries, 'w')
+        for sample, summary in summaries:
+            out.write("%s\t%s\n" % (sample, summary))
+        out.close()
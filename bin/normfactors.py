@@ -1,5 +1,9 @@
 #!/usr/bin/env python
+import sys
 import argparse
+import multiprocessing
+import numpy
+from gbstools import normfactors
 
 # Parse command line arguments from user.
 USAGE = """
@@ -17,55 +21,41 @@ parser = argparse.ArgumentParser(usage=USAGE, description=DESCRIPTION)
 parser.add_argument('--summaries', dest='summaries', help='list of mapping summary files', required=True)
 parser.add_argument('--max_insert', dest='max_insert', type=int, default=1000, help='maximum insert size to include in the output file')
 parser.add_argument('--window', dest='window', type=int, default=0, help='sliding window size for smoothing of normalization factors')
+parser.add_argument('--binary', dest='binary', default=None, help='also write the normalization factors in binary format to this file (can be read by GBStools in place of the text file)')
+parser.add_argument('-p', '--processes', dest='processes', type=int, default=1, help='number of processes for reading summaries (default=1)')
 args = parser.parse_args()
 
 max_insert = args.max_insert
-win = args.window
 
-# Parse the rs mapping summaries and store insert counts in a dict.
-counts = {}
-summaries = open(args.summaries, 'r')
-for line in summaries:
+
+def read_summary(summary):
+    return(normfactors.read_summary(summary, max_insert))
+
+
+# Parse the list of rs mapping summaries.
+summaries = {}
+for line in open(args.summaries, 'r'):
     line = line.strip()
-    sample, summary = line.split()
-    # Store counts in a list.
-    counts[sample] = [0] * max_insert
-    summary = open(summary, 'r')
-    for line in summary:
-        line = line.strip()
-        # Ignore headers.
-        if not line or line[0] == "#":
-            continue
-        line = line.split()
-        if line[0] == "insert_size":
-            continue
-        insert = int(line[0])
-        count = int(line[1])
-        try:
-            counts[sample][insert] = count
-        except:
-            pass
+    if line:
+        sample, summary = line.split()
+        summaries[sample] = summary
+samples = sorted(summaries.keys())
 
-# Normalize counts for each insert size.
-samples = sorted(counts.keys())
-normfactors = []
-for insert in range(max_insert):
-    count = [counts[sample][insert] for sample in samples]
-    mean_count = float(sum(count)) / len(count)
-    try:
-        nf = [c / mean_count for c in count]
-    except:
-        nf = [0] * len(count)
-    normfactors.append(dict(zip(samples, nf)))
+# Read the insert counts into a samples x inserts matrix.
+files = [summaries[sample] for sample in samples]
+if args.processes > 1:
+    pool = multiprocessing.Pool(args.processes)
+    counts = pool.map(read_summary, files)
+    pool.close()
+    pool.join()
+else:
+    counts = [read_summary(summary) for summary in files]
+counts = numpy.array(counts).reshape(len(samples), max_insert)
 
-# Print header line.
-print "#insert\t" + "\t".join(samples)
-# Take a sliding-window mean of the normalization factors.
-for insert in range(1, max_insert):
-    window = range(max(insert - win, 0), min(insert + win + 1, max_insert))
-    nf = {}
-    for sample in samples:
-        nf[sample] = sum([normfactors[i][sample] for i in window]) / len(window)
-    output = "%i\t" % insert
-    output = output + "\t".join(['{0:.3f}'.format(nf[sample]) for sample in samples])
-    print output
+# Normalize counts for each insert size and take a sliding-window mean.
+nf = normfactors.normalize(counts, args.window)
+# Insert size 0 is not written.
+result = normfactors.NormFactors(samples, range(1, max_insert), nf[:, 1:])
+normfactors.write_text(sys.stdout, result)
+if args.binary:
+    normfactors.write_binary(args.binary, result)
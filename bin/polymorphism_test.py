@@ -1,8 +1,13 @@
 #!/usr/bin/env python
+import os
 import re
 import sys
 import argparse
 import gbstools
+from gbstools import checkpoint
+from gbstools import cache
+from gbstools import incremental
+from gbstools import pipeline
 
 # Parse command line arguments from user.
 USAGE = """
@@ -26,22 +31,60 @@ parser.add_argument('-n', '--normfactors', dest='nf', default=None, help='normal
 parser.add_argument('-s', '--samples', dest='samples', default=None, help='samples to include (excluded samples will remain in output VCF, but will not be used in EM)')
 parser.add_argument('--dispersion_slope', dest='disp_slope', default=0.0, type=float, help='slope for linear function of dispersion index vs mean coverage (default=0.0)')
 parser.add_argument('--dispersion_intercept', dest='disp_intercept', default=2.5, type=float, help='intecept for linear function of dispersion index vs mean coverage (default=2.5)')
+parser.add_argument('--dispersion', dest='disp_file', default=None, help='dispersion file from estimate_dispersion.py (replaces --dispersion_slope and --dispersion_intercept)')
 parser.add_argument('--dpmode',dest='dpmode', action="store_true", help='use DP data only; ignore PL data from VCF')
 parser.add_argument('--ped',dest='ped', default=None, help='PED file for nuclear family (when specified, pedigree-mode is used)')
 parser.add_argument('--intervals',dest='intervals', default=None, type=str, help='samtools-style intervals (e.g. chr1:1-1000)')
+parser.add_argument('--ci', dest='ci', default=None, type=float, help='confidence level of profile likelihood intervals for DFreq and LambdaH1 (e.g. 0.95; default is no intervals)')
+parser.add_argument('--stats', dest='stats', default=None, help='write per-stage timings and counters (markers, EM iterations, etc.) as JSON to this file')
+parser.add_argument('--progress', dest='progress', default=None, type=float, help='write a progress line (markers/sec) to stderr every PROGRESS seconds')
+parser.add_argument('--profile', dest='profile', default=None, type=int, help='run cProfile over the first PROFILE markers and write the profile to stderr (or --profile_out)')
+parser.add_argument('--profile_out', dest='profile_out', default=None, help='file for the binary cProfile output (see pstats)')
+parser.add_argument('--checkpoint', dest='checkpoint', default=None, help='checkpoint file (default=<output VCF>.checkpoint)')
+parser.add_argument('--checkpoint_interval', dest='checkpoint_interval', default=1000, type=int, help='markers between checkpoints of the output VCF (default=1000; 0 for no checkpoints)')
+parser.add_argument('--resume', dest='resume', action='store_true', help='resume an interrupted run from its checkpoint (the output VCF is truncated to the checkpoint)')
+parser.add_argument('--cache', dest='cache', default=None, help='cache of marker fits, keyed by their EM inputs, reused across runs (SQLite file)')
+parser.add_argument('--cache_size', dest='cache_size', default=1024, type=float, help='maximum size of the fit cache in MB; least recently used fits are evicted (default=1024)')
+parser.add_argument('--previous', dest='previous', default=None, help='scored VCF from a previous run (e.g. before new samples were added); its estimates are the EM starting values')
+parser.add_argument('--skip_lr_change', dest='skip_lr_change', default=None, type=float, help='with --previous, keep the previous estimates (no EM) when the new samples change the likelihood ratio by less than this')
+parser.add_argument('--score_screen', dest='score_screen', default=None, type=float, help='skip the alt hypothesis EM (DLR=0) at markers whose dropout score statistic (DScore) is at most this, e.g. 0.1 (default is no screening)')
+parser.add_argument('--early_stop', dest='early_stop', action='store_true', help='stop the alt hypothesis EM as soon as DLR is above --critical (as in gbstools_filter.py); such markers get the EMEarlyStop INFO field. The full fit almost always stays above the threshold, but this is not guaranteed')
+parser.add_argument('--critical', dest='critical', default=2.71, type=float, help='DLR threshold for --early_stop (default=2.71, as in gbstools_filter.py)')
+parser.add_argument('--engine', dest='engine', default='em', choices=['em', 'qn'], help='fitting engine: em (EM) or qn (quasi-Newton maximization of the likelihood, with EM as fallback) (default=em)')
+parser.add_argument('-p', '--processes', dest='processes', default=1, type=int, help='number of EM worker processes; with more than 1, markers are read, fitted and written in pipelined stages (default=1)')
+parser.add_argument('--pipeline', dest='pipeline', action='store_true', help='with -p 1, read and write markers in their own threads while the EM runs in the main thread. This overlaps I/O waits (e.g. BAM files or output on a slow disk) with the EM, but not CPU work, so it only helps I/O bound runs')
+parser.add_argument('--queue_depth', dest='queue_depth', default=64, type=int, help='with --processes or --pipeline, markers queued between stages (default=64)')
 parser.add_argument('--debug',dest='debug', action='store_true', help='use debug mode')
 args = parser.parse_args()
 
 if args.o:
+   checkpointfile = args.checkpoint or args.o + '.checkpoint'
+elif args.resume:
+   sys.exit("--resume needs an output VCF file (-o).")
+else:
+   checkpointfile = None
+   args.checkpoint_interval = 0
+state = None
+if args.resume:
+   state = checkpoint.read(checkpointfile)
+   if state is None:
+      sys.stderr.write("No checkpoint found in %s. Starting from the first record.\n" % checkpointfile)
+
+if state:
+   # Appended to after the last checkpoint (see below).
+   outstream = open(args.o, 'r+')
+elif args.o:
    outstream = open(args.o, 'w')
 else:
    outstream = sys.stdout
 
+stats = gbstools.Stats(enabled=bool(args.stats or args.progress))
 reader = gbstools.Reader(filename=args.i, bamlist=args.bamlist, norm=args.nf,
                          disp_slope=args.disp_slope, disp_intercept=args.disp_intercept,
-                         ped=args.ped, samples=args.samples, dpmode=args.dpmode)
+                         ped=args.ped, samples=args.samples, dpmode=args.dpmode,
+                         stats=stats, engine=args.engine, disp_file=args.disp_file)
                          
-writer = gbstools.Writer(outstream, template=reader)
+writer = gbstools.Writer(outstream, template=reader, header=(state is None))
 
 try:
    intervals = re.split('[:-]', args.intervals)
@@ -58,40 +101,97 @@ try:
 except:
    snps = (snp for snp in reader)
 
-for snp in snps:
-   if not reader.family:
-      while not snp.check_convergence(snp.param['H0']):
-         param = snp.update_param(snp.param['H0'])
-         snp.param['H0'].append(param)
-         if len(snp.param['H0']) > 30:
-            snp.param['H0'][-1]['fail'] = True
-      param = snp.update_param(snp.param['H0'])
-      snp.param['H0'][-1]['loglik'] = param['loglik']
-
-      while not snp.check_convergence(snp.param['H1']):
-         param = snp.update_param(snp.param['H1'])
-         snp.param['H1'].append(param)
-         if len(snp.param['H1']) > 30:
-            snp.param['H1'][-1]['fail'] = True
-      param = snp.update_param(snp.param['H1'])
-      snp.param['H1'][-1]['loglik'] = param['loglik']
-      # If the null hypothesis has a higher loglik, use it instead.
-      if snp.param['H1'][-1]['loglik'] < snp.param['H0'][-1]['loglik']:
-         snp.param['H1'].append(snp.param['H0'][-1])
+# Options that change the output records (a run must be resumed with the
+# same ones). Files are compared by their absolute paths.
+options = {}
+for key in ('i', 'bamlist', 'nf', 'samples', 'disp_file', 'previous', 'ped'):
+   path = getattr(args, key)
+   options[key] = os.path.abspath(path) if path else None
+for key in ('intervals', 'disp_slope', 'disp_intercept', 'dpmode', 'ci', 'skip_lr_change',
+            'score_screen', 'early_stop', 'critical', 'engine'):
+   options[key] = getattr(args, key)
+
+records = 0
+if state:
+   if checkpoint.header_hash(writer.header) != state['header']:
+      sys.exit("The output header differs from the checkpoint in %s. "
+               "Resume with the same input and options." % checkpointfile)
+   changed = checkpoint.changed_options(state, options)
+   if changed:
+      sys.exit("Options %s differ from the checkpoint in %s. Resume with the "
+               "same input and options." % (', '.join(changed), checkpointfile))
+   # Truncate the output to the last checkpoint.
+   outstream.truncate(state['offset'])
+   outstream.seek(0, os.SEEK_END)
+   writer.offset = state['offset']
+   last = reader.skip(state['records'])
+   if last != (state['chrom'], state['pos']):
+      sys.exit("Record %i of the input is not at %s:%i as in the checkpoint in %s." %
+               (state['records'], state['chrom'], state['pos'], checkpointfile))
+   records = state['records']
+
+def write_profile(profiler):
+   '''Write the cProfile output to a file or as text to stderr.'''
+   import pstats
+   profiler.disable()
+   if args.profile_out:
+      profiler.dump_stats(args.profile_out)
+   else:
+      pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(40)
+
+previous = None
+if args.previous and not args.ped:
+   previous = incremental.PreviousEstimates(args.previous)
+   old_samples = set(previous.samples)
+   new_samples = set(reader.samples) - old_samples
 
+early_stop = {}
+if args.early_stop:
+   early_stop = {'critical':args.critical}
+
+fitcache = None
+if args.cache:
+   fitcache = cache.FitCache(args.cache, max_size=int(args.cache_size * 1e6))
+
+profiler = None
+if args.profile:
+   import cProfile
+   profiler = cProfile.Profile()
+   profiler.enable()
+
+processed = 0
+def process(snp):
+   '''Fit a marker, or return its fit task for a worker process (see
+   pipeline.run).'''
+   global processed, profiler
+   task = None
+   estimates = None
+   if previous:
+      estimates = previous.get(snp.record)
+   if estimates:
+      snp.warm_start(estimates, old_samples)
+   if args.ped:
+      snp.fit()
+   elif (estimates and args.skip_lr_change is not None and
+         abs(snp.lr_change(new_samples)) < args.skip_lr_change):
+      snp.evaluate()
+      if args.ci:
+         snp.profile_intervals(args.ci)
+   elif args.processes > 1:
+      task = snp.task(cache=fitcache, screen=args.score_screen, ci=args.ci, **early_stop)
    else:
-      for gt in snp.param:
-         while not snp.check_convergence(snp.param[gt]):
-            param = snp.update_param(param=snp.param[gt], parental_gt=gt)
-            snp.param[gt].append(param)
-            if len(snp.param[gt]) > 30:
-               snp.param[gt][-1]['fail'] = True
-         param = snp.update_param(snp.param[gt])
-         snp.param[gt][-1]['loglik'] = param['loglik']
-
-   snp.lik_ratio = snp.likelihood_ratio()
-   snp.update_info()
+      snp.fit(cache=fitcache, screen=args.score_screen, **early_stop)
+      if args.ci:
+         snp.profile_intervals(args.ci)
+   processed += 1
+   if profiler and processed == args.profile:
+      write_profile(profiler)
+      profiler = None
+   return(task)
 
+def write(snp):
+   '''Write a marker and checkpoint the output.'''
+   global records
    if args.debug:
       keys = ('phi', 'lambda', 'fail', 'loglik')
       print 'H0:'
@@ -105,5 +205,38 @@ for snp in snps:
       print 'NF: %s' % str([call.NF for call in snp.calls])
 
    writer.write_record(snp)
+   records += 1
+   if args.checkpoint_interval and records % args.checkpoint_interval == 0:
+      outstream.flush()
+      os.fsync(outstream.fileno())
+      checkpoint.write(checkpointfile, records, snp.record.CHROM, snp.record.POS,
+                       writer.offset, writer.header, options)
+   if args.progress:
+      stats.progress(sys.stderr, args.progress)
+
+if args.processes > 1 or args.pipeline:
+   result = pipeline.run(snps, process, write, read_depth=args.queue_depth,
+                         write_depth=args.queue_depth, stats=stats, processes=args.processes)
+   if args.stats:
+      sys.stderr.write("Pipeline utilization: %s\n" %
+                       ', '.join(["%s %.2f" % (stage, result['utilization'][stage])
+                                  for stage in ('read', 'process', 'fit', 'write')]))
+else:
+   for snp in snps:
+      process(snp)
+      write(snp)
+
+if profiler:
+   write_profile(profiler)
+outstream.close()
+if fitcache:
+   fitcache.close()
+   sys.stderr.write(fitcache.summary() + '\n')
+if checkpointfile:
+   checkpoint.remove(checkpointfile)
+if args.stats:
+   statsfile = open(args.stats, 'w')
+   stats.dump(statsfile)
+   statsfile.close()
 
 
@@ -1,16 +1,28 @@
 #!/usr/bin/env python
+import os
+import sys
 import pysam
+import numpy
+import multiprocessing
 import argparse
-from numpy import median
+from itertools import groupby
+from collections import namedtuple
+from gbstools import normfactors
 
 USAGE = """
-rs_dp.py -i <input BAM file> -b <GBSBED file of restriction sites> -n <normfactors>
+rs_dp.py -i <input BAM file> -s <sample> -b <GBSBED file of restriction sites> -n <normfactors>
+rs_dp.py --bamlist <sample/bam file pairs> -b <GBSBED file> -n <normfactors> -o <output matrix>
 """
 
 DESCRIPTION = """
 Parse reads in a BAM file and calculate depth of coverage at restriction sites
 in a GBSBED file. Also calculate normalized depth of coverage according to the
 normalization factors provided by the user.
+
+In cohort mode (--bamlist) the BAM files are scanned in parallel and the
+results are written as a sites x samples matrix, either as a bgzipped,
+tabix-indexed table (output ending in .gz) or as a NumPy .npz archive
+(output ending in .npz).
 """
 
 parser = argparse.ArgumentParser(usage=USAGE, description=DESCRIPTION)
@@ -19,77 +31,317 @@ parser.add_argument('-s', '--sample', dest='sample', help='sample name')
 parser.add_argument('-b', '--bed', dest='bed', help='GBSBED file of restriction sites')
 parser.add_argument('-n', '--normfactors', dest='nf', help='DP normalization factors')
 parser.add_argument('-w', '--window', dest='window', type=int, default=102, help='window for searching for reads around restriction sites (default=102)')
+parser.add_argument('--sweep', dest='sweep', action='store_true', help='read each chromosome of the BAM file once instead of fetching reads for every restriction site')
+parser.add_argument('--bamlist', dest='bamlist', default=None, help='list of sample/bam file pairs (cohort mode)')
+parser.add_argument('-o', '--output', dest='o', default=None, help='output matrix file for cohort mode (.gz or .npz)')
+parser.add_argument('-p', '--processes', dest='processes', type=int, default=1, help='number of processes for cohort mode (default=1)')
 args = parser.parse_args()
 
-# Parse the normfactors file and store in dict.
-normfactors = {}
-nf = open(args.nf, 'r')
-header = nf.readline()
-header = header.strip('#').strip()
-header = header.split()
-sample_index = header.index(args.sample)
-for line in nf:
-    line = line.strip()
-    fields = line.split()
-    insert = int(fields[0])
-    normfactors[insert] = float(fields[sample_index])
-
-header = ['chrom', 'start', 'end', 'fwd_insert', 'rev_insert', 'enzyme', 'strand',
+HEADER = ['chrom', 'start', 'end', 'fwd_insert', 'rev_insert', 'enzyme', 'strand',
           'fwd_ins_med', 'fwd_counts', 'fwd_normcounts',
           'rev_ins_med', 'rev_counts', 'rev_normcounts']
-print '#' + '\t'.join(header)
-window = args.window
-bed = open(args.bed, 'r')
-sam = pysam.Samfile(args.i, 'rb')
-for line in bed:
-    line = line.strip()
-    # Ignore header.
-    if line[0] == "#":
-        continue
-    (chrom, start, end, fwd_ins, rev_ins, enzyme,
-     strand, site_id, freq, cut_allele, fwd_lig, rev_lig) = line.split()
-    start = int(start)
-    end = int(end)
-    site_tag = "%s;%s;%s" % (enzyme, strand, start)
-    # Read counts, keyed by read.is_reverse.
-    counts = {0:0, 1:0}
-    # Insert lists, keyed by read.is_reverse.
-    inserts = {0:[], 1:[]}
-    for read in sam.fetch(chrom, max(start - window, 0), end + window):
-        tags = dict(read.tags)
-        if 'Z1' in tags:
-            print tags
+
+Site = namedtuple('Site', 'chrom start end fwd_ins rev_ins enzyme strand tag')
+
+
+def read_gbsbed(bedfile):
+    '''Parse a GBSBED file into a list of (chrom, sites) pairs in file order.'''
+    sites = []
+    for line in open(bedfile, 'r'):
+        line = line.strip()
+        # Ignore header.
+        if not line or line[0] == "#":
+            continue
+        (chrom, start, end, fwd_ins, rev_ins, enzyme,
+         strand, site_id, freq, cut_allele, fwd_lig, rev_lig) = line.split()
+        site_tag = "%s;%s;%s" % (enzyme, strand, start)
+        sites.append(Site(chrom, int(start), int(end), fwd_ins, rev_ins,
+                          enzyme, strand, site_tag))
+    return([(chrom, list(chrom_sites)) for chrom, chrom_sites
+            in groupby(sites, key=lambda site: site.chrom)])
+
+
+def insert_median(inserts):
+    '''Median of the non-zero inserts in a list, or "." for an empty list.'''
+    if inserts:
+        return(numpy.median([i for i in inserts if i]))
+    return('.')
+
+
+def histogram_median(n, hist):
+    '''Median of the inserts in a histogram, or "." if no reads were counted.'''
+    if not n:
+        return('.')
+    total = sum(hist.values())
+    if not total:
+        return(float('nan'))
+    values = sorted(hist)
+    # Find the middle two order statistics (equal when total is odd).
+    lower = (total - 1) // 2
+    upper = total // 2
+    seen = 0
+    lower_value = None
+    for value in values:
+        seen += hist[value]
+        if lower_value is None and seen > lower:
+            lower_value = value
+        if seen > upper:
+            return((lower_value + value) / 2.0)
+
+
+def fetch_depths(sam, chrom, sites, window):
+    '''Count reads at each restriction site with one BAM fetch per site.'''
+    depths = []
+    for site in sites:
+        # Read counts, keyed by read.is_reverse.
+        counts = {0:0, 1:0}
+        # Insert lists, keyed by read.is_reverse.
+        inserts = {0:[], 1:[]}
+        for read in sam.fetch(chrom, max(site.start - window, 0), site.end + window):
+            try:
+                read_tag = read.opt('Z2')
+            except KeyError:
+                continue
+            if read_tag == site.tag:
+                try:
+                    insert = read.opt('Z0')
+                except KeyError:
+                    insert = None
+                counts[read.is_reverse] += 1
+                inserts[read.is_reverse].append(insert)
+        depths.append((counts[0], insert_median(inserts[0]),
+                       counts[1], insert_median(inserts[1])))
+    return(depths)
+
+
+def sweep_depths(sam, chrom, sites, window):
+    '''Count reads at each restriction site in a single pass over a chromosome.
+
+    Reads are assigned to sites by their Z2 tag (see annotate_se_bam.py), and
+    insert size histograms are kept per site so the medians can be found
+    without storing every insert.
+    '''
+    site_index = dict((site.tag, i) for i, site in enumerate(sites))
+    counts = [[0, 0] for site in sites]
+    hists = [[{}, {}] for site in sites]
+    if chrom in sam.references:
+        reads = sam.fetch(chrom)
+    else:
+        reads = []
+    for read in reads:
         try:
-            read_tag = tags['Z2']
-        except:
-            read_tag = None
+            i = site_index[read.opt('Z2')]
+        except KeyError:
+            continue
+        site = sites[i]
+        # Only count reads inside the search window around the site.
+        aend = read.aend or read.pos + 1
+        if read.pos >= site.end + window or aend <= max(site.start - window, 0):
+            continue
+        counts[i][read.is_reverse] += 1
         try:
-            insert = tags['Z0']
-        except:
+            insert = read.opt('Z0')
+        except KeyError:
             insert = None
-        if read_tag == site_tag:
-            counts[read.is_reverse] += 1
-            inserts[read.is_reverse].append(insert)
-    if inserts[0]:
-        fwd_insert_med = median([i for i in inserts[0] if i])
-    else:
-        fwd_insert_med = '.'
-    if inserts[1]:
-        rev_insert_med = median([i for i in inserts[1] if i])
-    else:
-        rev_insert_med = '.'
+        if insert:
+            hist = hists[i][read.is_reverse]
+            hist[insert] = hist.get(insert, 0) + 1
+    depths = []
+    for (fwd, rev), (fwd_hist, rev_hist) in zip(counts, hists):
+        depths.append((fwd, histogram_median(fwd, fwd_hist),
+                       rev, histogram_median(rev, rev_hist)))
+    return(depths)
 
+
+def normalize_counts(count, insert_med, nf):
+    '''Divide a read count by the normalization factor for the insert size.'''
     try:
-        fwd_normcounts = counts[0] / normfactors[int(fwd_insert_med)]
-        fwd_normcounts = '{0:.3f}'.format(fwd_normcounts)
-    except:
-        fwd_normcounts = '.'
-    try:
-        rev_normcounts = counts[1] / normfactors[int(rev_insert_med)]
-        rev_normcounts = '{0:.3f}'.format(rev_normcounts)
+        if nf.keys() == [None]:
+            # RAD-seq normalization factors (a single ``NA`` insert size).
+            return('{0:.3f}'.format(count / nf[None]))
+        return('{0:.3f}'.format(count / nf[int(insert_med)]))
     except:
-        rev_normcounts = '.'
-    output = (chrom, start, end, fwd_ins, rev_ins, enzyme, strand, 
-              fwd_insert_med, counts[0], fwd_normcounts,
-              rev_insert_med, counts[1], rev_normcounts)
-    print '\t'.join([str(i) for i in output])
+        return('.')
+
+
+def format_site(site, depth, nf):
+    '''Format the depth of coverage at one restriction site.'''
+    fwd_counts, fwd_insert_med, rev_counts, rev_insert_med = depth
+    output = (site.chrom, site.start, site.end, site.fwd_ins, site.rev_ins,
+              site.enzyme, site.strand,
+              fwd_insert_med, fwd_counts, normalize_counts(fwd_counts, fwd_insert_med, nf),
+              rev_insert_med, rev_counts, normalize_counts(rev_counts, rev_insert_med, nf))
+    return('\t'.join([str(i) for i in output]))
+
+
+# Values per sample in a cell of the cohort matrix.
+COHORT_FORMAT = ['fwd_ins_med', 'fwd_counts', 'fwd_normcounts',
+                 'rev_ins_med', 'rev_counts', 'rev_normcounts']
+
+
+def sample_depths(task):
+    '''Count reads at all restriction sites for one sample (cohort mode).'''
+    sample, bamfile = task
+    sam = pysam.Samfile(bamfile, 'rb')
+    depths = []
+    for chrom, sites in gbsbed:
+        depths += sweep_depths(sam, chrom, sites, args.window)
+    sam.close()
+    fwd_counts, fwd_med, rev_counts, rev_med = zip(*depths)
+    return(sample,
+           numpy.array(fwd_counts, dtype=numpy.int32),
+           numpy.array([numpy.nan if m == '.' else m for m in fwd_med]),
+           numpy.array(rev_counts, dtype=numpy.int32),
+           numpy.array([numpy.nan if m == '.' else m for m in rev_med]))
+
+
+def normalize_matrix(counts, insert_med, nf, samples):
+    '''Normalize a sites x samples count matrix by insert size (NaN if unknown).'''
+    normcounts = numpy.empty(counts.shape)
+    normcounts.fill(numpy.nan)
+    if nf is None:
+        return(normcounts)
+    columns = [k for k, insert in enumerate(nf.inserts) if insert is not None]
+    inserts = [nf.inserts[k] for k in columns]
+    for j, sample in enumerate(samples):
+        if sample not in nf.sample_index:
+            continue
+        if not inserts:
+            # RAD-seq normalization factors (a single ``NA`` insert size):
+            # one factor per sample, whatever the insert size.
+            if None in nf.insert_index:
+                factor = nf.nf[nf.sample_index[sample], nf.insert_index[None]]
+                if factor > 0:
+                    normcounts[:, j] = counts[:, j] / factor
+            continue
+        # Normalization factors for the sample, indexed by insert size.
+        lookup = numpy.empty(max(inserts) + 2)
+        lookup.fill(numpy.nan)
+        lookup[inserts] = nf.nf[nf.sample_index[sample], columns]
+        lookup[lookup == 0] = numpy.nan
+        # Unknown or out-of-range medians point at the last (NaN) entry.
+        index = numpy.nan_to_num(insert_med[:, j]).astype(int)
+        index[numpy.isnan(insert_med[:, j]) | (index < 0) | (index >= len(lookup))] = -1
+        normcounts[:, j] = counts[:, j] / lookup[index]
+    return(normcounts)
+
+
+def format_value(val, fmt):
+    if numpy.isnan(val):
+        return('.')
+    return(fmt.format(val))
+
+
+def write_matrix_tsv(output, sites, samples, matrix):
+    '''Write the cohort matrix as a bgzipped, tabix-indexed table.'''
+    if output.endswith('.gz'):
+        output = output[:-3]
+    out = open(output, 'w')
+    out.write('##format=%s\n' % ':'.join(COHORT_FORMAT))
+    out.write('#' + '\t'.join(HEADER[:7] + samples) + '\n')
+    fwd_counts, fwd_med, fwd_norm, rev_counts, rev_med, rev_norm = matrix
+    lines = []
+    for i, site in enumerate(sites):
+        cells = []
+        for j in range(len(samples)):
+            if fwd_counts[i, j] or rev_counts[i, j]:
+                cells.append('%s:%i:%s:%s:%i:%s' % (
+                    format_value(fwd_med[i, j], '{0}'), fwd_counts[i, j],
+                    format_value(fwd_norm[i, j], '{0:.3f}'),
+                    format_value(rev_med[i, j], '{0}'), rev_counts[i, j],
+                    format_value(rev_norm[i, j], '{0:.3f}')))
+            else:
+                cells.append('.:0:.:.:0:.')
+        fields = [site.chrom, str(site.start), str(site.end), site.fwd_ins,
+                  site.rev_ins, site.enzyme, site.strand] + cells
+        lines.append('\t'.join(fields))
+        if len(lines) == 10000:
+            out.write('\n'.join(lines) + '\n')
+            lines = []
+    if lines:
+        out.write('\n'.join(lines) + '\n')
+    out.close()
+    pysam.tabix_index(output, seq_col=0, start_col=1, end_col=2,
+                      zerobased=True, force=True)
+    if os.path.exists(output):
+        os.remove(output)
+    return(None)
+
+
+def write_matrix_npz(output, sites, samples, matrix):
+    '''Write the cohort matrix as a NumPy .npz archive.'''
+    fwd_counts, fwd_med, fwd_norm, rev_counts, rev_med, rev_norm = matrix
+    # Index of the first site of each chromosome.
+    contigs = []
+    offsets = []
+    for i, site in enumerate(sites):
+        if not contigs or site.chrom != contigs[-1]:
+            contigs.append(site.chrom)
+            offsets.append(i)
+    outfile = open(output, 'wb')
+    numpy.savez_compressed(outfile,
+                           samples=numpy.array(samples),
+                           contigs=numpy.array(contigs),
+                           contig_offsets=numpy.array(offsets, dtype=numpy.int64),
+                           start=numpy.array([s.start for s in sites], dtype=numpy.int64),
+                           end=numpy.array([s.end for s in sites], dtype=numpy.int64),
+                           enzyme=numpy.array([s.enzyme for s in sites]),
+                           strand=numpy.array([s.strand for s in sites]),
+                           fwd_counts=fwd_counts, fwd_ins_med=fwd_med,
+                           fwd_normcounts=fwd_norm.astype(numpy.float32),
+                           rev_counts=rev_counts, rev_ins_med=rev_med,
+                           rev_normcounts=rev_norm.astype(numpy.float32))
+    outfile.close()
+    return(None)
+
+
+gbsbed = read_gbsbed(args.bed)
+
+if args.bamlist:
+    if not args.o:
+        parser.error('cohort mode (--bamlist) requires an output file (-o)')
+    bams = []
+    for line in open(args.bamlist, 'r'):
+        line = line.strip()
+        if line:
+            sample, bamfile = line.split()
+            bams.append((sample, bamfile))
+    samples = [sample for sample, bamfile in bams]
+    # The normalization factors are read once for the whole cohort.
+    if args.nf:
+        nf = normfactors.read(args.nf)
+    else:
+        nf = None
+    if args.processes > 1:
+        pool = multiprocessing.Pool(args.processes)
+        results = pool.map(sample_depths, bams)
+        pool.close()
+        pool.join()
+    else:
+        results = [sample_depths(bam) for bam in bams]
+    sample_names, fwd_counts, fwd_med, rev_counts, rev_med = zip(*results)
+    fwd_counts = numpy.column_stack(fwd_counts)
+    fwd_med = numpy.column_stack(fwd_med)
+    rev_counts = numpy.column_stack(rev_counts)
+    rev_med = numpy.column_stack(rev_med)
+    matrix = (fwd_counts, fwd_med, normalize_matrix(fwd_counts, fwd_med, nf, samples),
+              rev_counts, rev_med, normalize_matrix(rev_counts, rev_med, nf, samples))
+    sites = [site for chrom, chrom_sites in gbsbed for site in chrom_sites]
+    if args.o.endswith('.npz'):
+        write_matrix_npz(args.o, sites, samples, matrix)
+    else:
+        write_matrix_tsv(args.o, sites, samples, matrix)
+else:
+    # Normalization factors for the sample, keyed by insert size.
+    nf = normfactors.read(args.nf).column(args.sample)
+    sam = pysam.Samfile(args.i, 'rb')
+    if args.sweep:
+        count_depths = sweep_depths
+    else:
+        count_depths = fetch_depths
+    out = sys.stdout
+    out.write('#' + '\t'.join(HEADER) + '\n')
+    for chrom, sites in gbsbed:
+        depths = count_depths(sam, chrom, sites, args.window)
+        out.write('\n'.join([format_site(site, depth, nf)
+                             for site, depth in zip(sites, depths)]) + '\n')
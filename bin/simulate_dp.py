@@ -1,11 +1,10 @@
 #!/usr/bin/env python
 import random
 import sys
-from scipy.stats import nbinom
-import math
 import numpy
 import argparse
 from collections import namedtuple
+from gbstools import simulate
 
 USAGE = """
 cat <myvcf> | simulate_dp.py --lambda <coverage> > <mynewvcf>
@@ -34,65 +33,70 @@ parser.add_argument('-e', '--epsilon', dest='epsilon', type=float, default=0.001
 parser.add_argument('--dispersion_mean', dest='dmean', type=float, default=2.5, help='index of dispersion mean (default=2.5)')
 parser.add_argument('--dispersion_sd', dest='dsd', type=float, default=0, help='index of dispersion sd (default=0)')
 parser.add_argument('--seed', dest='seed', type=int, default=0, help='seed for random number generator')
+parser.add_argument('--block_size', dest='block_size', type=int, default=1000, help='number of VCF records simulated at a time (default=1000)')
 args = parser.parse_args()
 
-numpy.random.seed(args.seed)
+# Same stream as numpy.random.seed(args.seed), used by earlier versions.
+rng = numpy.random.RandomState(args.seed)
 epsilon = args.epsilon
-def calculate_pl(dp_ref, dp_alt):
+
+# Numbers of ref and alt alleles in each genotype, e.g. (1, 0) for '0/.'.
+copies = {}
+
+def simulate_block(block, outstream):
     """
-    Calculate PL field in vcf file from allelic DP
+    Simulate AD, DP and PL for a block of VCF records and write them out.
     """
+    disp = [d for d, fields in block]
+    genotypes = [fields[9:] for d, fields in block]
+    for gt in set([gt for gts in genotypes for gt in gts]) - set(copies):
+        copies[gt] = (gt.count('0'), gt.count('1'))
+    ref_copies = numpy.array([[copies[gt][0] for gt in gts] for gts in genotypes])
+    alt_copies = numpy.array([[copies[gt][1] for gt in gts] for gts in genotypes])
+    # Draw the depths of all the records in one call (same order as nbinom.rvs per genotype).
+    dp_ref, dp_alt = simulate.simulate_depths(rng, ref_copies, alt_copies, lamb, disp)
     dp = dp_ref + dp_alt
-    if dp > 0:
-        lik_homref = math.log(1 - epsilon, 10) * dp_ref + math.log(epsilon / 3, 10) * dp_alt
-        lik_het = math.log((3 - 2 * epsilon) / 6.0, 10) * dp
-        lik_homnonref = math.log(1 - epsilon, 10) * dp_alt + math.log(epsilon / 3, 10) * dp_ref
-        lik = [lik_homref, lik_het, lik_homnonref]
-        maxlik = max(lik)
-        pl = [int(abs(10 * (l - maxlik))) for l in lik]
-    else:
-        pl = None
-    return(pl)
+    pl = simulate.calculate_pl(dp_ref, dp_alt, epsilon)
+    lines = []
+    for k, (d, fields) in enumerate(block):
+        samples = []
+        for j, gt in enumerate(genotypes[k]):
+            if dp[k, j] > 0:
+                samples.append("%s:%i,%i:%i:%i,%i,%i" % (gt, dp_ref[k, j], dp_alt[k, j], dp[k, j],
+                                                         pl[k, j, 0], pl[k, j, 1], pl[k, j, 2]))
+            else:
+                samples.append(gt)
+        info = '%s;Dispersion=%s' % (fields[7], '{0:.3f}'.format(d))
+        output = fields[:7] + [info] + ['GT:AD:DP:PL'] + samples
+        lines.append('\t'.join(output))
+    outstream.write('\n'.join(lines) + '\n')
+    return(None)
 
 
+# The dispersion is drawn for every line, as in earlier versions, so a given
+# seed gives the same output.
 rand = random.Random(0)
 lamb = args.lamb
+outstream = sys.stdout
+block = []
 for line in sys.stdin:
     d = rand.normalvariate(mu=args.dmean, sigma=args.dsd)
     if d < 1:
         d = 1.001
     line = line.strip()
     if line[:2] == '##':
-        print line
+        outstream.write(line + '\n')
         continue
     elif line[:6] == '#CHROM':
-        print"##INFO=<ID=%s,Number=.,Type=%s,Description=\"%s\">" % (INFO.id, INFO.type, INFO.desc)
+        outstream.write("##INFO=<ID=%s,Number=.,Type=%s,Description=\"%s\">\n" % (INFO.id, INFO.type, INFO.desc))
         for fmat in FORMAT:
-            print"##FORMAT=<ID=%s,Number=.,Type=%s,Description=\"%s\">" % (fmat.id, fmat.type, fmat.desc)
-        print '##analysis=simulate_dp.py --lambda %f --epsilon %f --dispersion_mean %f --dispersion_sd %f --seed %s' % (args.lamb, args.epsilon, args.dmean, args.dsd, str(args.seed))
-        print line
+            outstream.write("##FORMAT=<ID=%s,Number=.,Type=%s,Description=\"%s\">\n" % (fmat.id, fmat.type, fmat.desc))
+        outstream.write('##analysis=simulate_dp.py --lambda %f --epsilon %f --dispersion_mean %f --dispersion_sd %f --seed %s\n' % (args.lamb, args.epsilon, args.dmean, args.dsd, str(args.seed)))
+        outstream.write(line + '\n')
         continue
-    fields = line.split()
-    genotypes = fields[9:]
-    samples = []
-    for gt in genotypes:
-        # scipy nbinom takes (n, p) as arguments.
-        # Convolution: sum_{i=1}{x}nbinom(n, p) = nbinom(xn, p).
-        if gt.count('0')==0:
-            dp_ref = 0
-        else:
-            dp_ref = nbinom.rvs(lamb * gt.count('0') / ((d - 1) * 2), 1 / d)
-        if gt.count('1')==0:
-            dp_alt = 0
-        else:
-            dp_alt = nbinom.rvs(lamb * gt.count('1') / ((d - 1) * 2), 1 / d)
-        dp = dp_ref + dp_alt
-        pl = calculate_pl(dp_ref, dp_alt)
-        if pl:
-            sample = "%s:%i,%i:%i:%i,%i,%i" % (gt, dp_ref, dp_alt, dp, pl[0], pl[1], pl[2])
-            samples.append(sample)
-        else:
-            samples.append(gt)
-    info = '%s;Dispersion=%s' % (fields[7], '{0:.3f}'.format(d))
-    output = fields[:7] + [info] + ['GT:AD:DP:PL'] + samples
-    print '\t'.join(output)
+    block.append((d, line.split()))
+    if len(block) == args.block_size:
+        simulate_block(block, outstream)
+        block = []
+if block:
+    simulate_block(block, outstream)
@@ -1,14 +1,23 @@
 #!/usr/bin/env python
-import vcf
-from Bio import SeqIO
+import os
+import sys
+import gzip
 import math
 import random
 import argparse
+import multiprocessing
+import numpy
+import vcf
+from Bio import SeqIO
+from Bio import bgzf
+from gbstools.simulate import derive_seed
 
 USAGE = """
 simulate_fastq.py --vcf <snps VCF file>
                   --bed <GBSBED file of restriction sites>
                   --fasta <reference fasta>
+                  --compress <none, gzip or bgzip> (default=none)
+                  -p <number of processes>
 """
 
 DESCRIPTION = """
@@ -17,7 +26,9 @@ drawn from a fasta file (ALT alleles are drawn randomly). Sample genotypes
 are taken from the input VCF file. The location of the reads is taken from
 the GBSBED file (generated by make_gbsbed.py). The locations in the VCF
 file do not correspond to those in the GBSBED file; only the genotypes from
-the VCF are used.
+the VCF are used. One FASTQ file is written per sample (e.g. 0.fastq.gz),
+and samples are written in parallel (-p option), each with its own random
+number stream derived from --seed.
 """
 
 parser = argparse.ArgumentParser(usage=USAGE, description=DESCRIPTION)
@@ -28,29 +39,64 @@ parser.add_argument('--seed', dest='seed', type=int, default=0, help='seed for r
 parser.add_argument('--readlen', dest='readlen', type=int, default=101, help='read length (default=101)')
 parser.add_argument('--fragment_max', dest='fragment_max', type=int, default=500, help='maximum length of restriction fragments (default=500)')
 parser.add_argument('--epsilon', dest='epsilon', type=float, default=0.001, help='base call error rate (default=0.001)')
+parser.add_argument('--compress', dest='compress', default='none', choices=['none', 'gzip', 'bgzip'], help='FASTQ compression (default=none)')
+parser.add_argument('-o', '--outdir', dest='outdir', default='.', help='output directory (default=.)')
+parser.add_argument('-p', '--processes', dest='p', type=int, default=1, help='number of processes (default=1)')
 args = parser.parse_args()
 
 rand = random.Random(args.seed)
 readlen = args.readlen
 maxlen = args.fragment_max
 epsilon = args.epsilon
-def write_reads(seq, counts, myfile):
-    '''Write sequence to fastq file.'''
-    for i in range(counts):
-        lane = rand.randint(1,8)
-        tile = rand.randint(1,100)
-        x = rand.randint(1,9999)
-        y = rand.randint(1,9999)
-        seqid = "@SIMULATION:%i:%i:%i:%i#0" % (lane, tile, x, y)
-        qual = [chr(int(-10 * math.log(epsilon, 10) + 33))] * len(seq)
-        qual = ''.join(qual)
-        myfile.write(seqid + '\n')
-        myfile.write(seq + '\n')
-        myfile.write('+\n')
-        myfile.write(qual + '\n')
-        
-# Get the reference sequence.
-seq_record = SeqIO.parse(open(args.fasta, 'r'), 'fasta').next()
+qual_char = chr(int(-10 * math.log(epsilon, 10) + 33))
+# Quality strings, keyed by read length.
+quals = {}
+# Reads per batch of headers/writes.
+batch_size = 100000
+
+def open_fastq(sample):
+    '''Open the FASTQ file for a sample.'''
+    filename = os.path.join(args.outdir, sample + '.fastq')
+    if args.compress == 'gzip':
+        return(gzip.open(filename + '.gz', 'wb', 6))
+    elif args.compress == 'bgzip':
+        return(bgzf.BgzfWriter(filename + '.gz', 'wb'))
+    return(open(filename, 'w', 1 << 20))
+
+def write_reads(seq, counts, rng, lines):
+    '''Append FASTQ records for ``counts`` copies of seq to lines.'''
+    if len(seq) not in quals:
+        quals[len(seq)] = qual_char * len(seq)
+    tail = '#0\n%s\n+\n%s\n' % (seq, quals[len(seq)])
+    for start in range(0, counts, batch_size):
+        n = min(batch_size, counts - start)
+        # Draw the lane, tile, x and y of the read headers.
+        lane = rng.randint(1, 9, n).tolist()
+        tile = rng.randint(1, 101, n).tolist()
+        x = rng.randint(1, 10000, n).tolist()
+        y = rng.randint(1, 10000, n).tolist()
+        lines.extend(["@SIMULATION:%i:%i:%i:%i" % header + tail
+                      for header in zip(lane, tile, x, y)])
+    return(None)
+
+def write_sample(j):
+    '''Write the FASTQ file for one sample.'''
+    sample = samples[j]
+    rng = numpy.random.RandomState(derive_seed(args.seed, sample))
+    fastq = open_fastq(sample)
+    lines = []
+    for k, (ref, alt) in enumerate(alleles):
+        write_reads(ref, depths[k, j, 0], rng, lines)
+        write_reads(alt, depths[k, j, 1], rng, lines)
+        if len(lines) >= batch_size:
+            fastq.write(''.join(lines))
+            lines = []
+    fastq.write(''.join(lines))
+    fastq.close()
+    return(sample)
+
+# Get the reference sequences, keyed by chrom.
+reference = SeqIO.index(args.fasta, 'fasta')
 
 # Get a list of reads from the in silico digest of the reference.
 reads = []
@@ -59,45 +105,59 @@ for line in bed:
     line = line.strip()
     if line[0] == "#":
         continue
-    (chrom, start, end, fwd_insert, rev_insert, enzyme, strand, 
+    (chrom, start, end, fwd_insert, rev_insert, enzyme, strand,
      site_id, freq, cut_allele, fwd_lig, rev_lig) = line.split()
     if fwd_insert != '.' and rev_insert != '.':
         fwd_insert = int(fwd_insert)
         rev_insert = int(rev_insert)
         fwd_lig = max([int(i) for i in fwd_lig.split(',')])
         rev_lig = min([int(i) for i in rev_lig.split(',')])
+        seq = reference[chrom].seq
         if fwd_insert >= 2 * readlen and fwd_insert <= maxlen:
-            read = seq_record.seq[fwd_lig:fwd_lig + readlen]
+            read = seq[fwd_lig:fwd_lig + readlen]
             reads.append(str(read))
         if rev_insert >= 2 * readlen and rev_insert <= maxlen:
-            read = seq_record.seq[rev_lig - readlen + 1:rev_lig + 1]
+            read = seq[rev_lig - readlen + 1:rev_lig + 1]
             read = read.reverse_complement()
             reads.append(str(read))
     else:
         pass
 readiter = (read for read in reads)
 
-# Make a hash of fastq files, keyed by sample name.
-fastq = {}
+# Parse the vcf file and get the alleles and allelic depths for each SNP.
 reader = vcf.Reader(open(args.vcf, 'r'))
-for sample in reader.samples:
-    fastq[sample] = open(sample + '.fastq', 'w')
-
-# Parse the vcf file and write reads for each sample.
+samples = reader.samples
+alleles = []
+depths = []
 for snp in reader:
-    ref = readiter.next()
+    try:
+        ref = readiter.next()
+    except StopIteration:
+        sys.stderr.write("Not enough restriction fragments for the SNPs in %s; "
+                         "using the first %i SNPs.\n" % (args.vcf, len(alleles)))
+        break
     alt = [base for base in ref]
     bases = ['A', 'G', 'T', 'C']
     bases.remove(ref[50])
     alt[50] = rand.choice(bases)
     alt = ''.join(alt)
+    alleles.append((ref, alt))
+    ad = []
     for sample in snp.samples:
-        if sample['AD']:
-            write_reads(ref, int(sample['AD'][0]), fastq[sample.sample])
-            write_reads(alt, int(sample['AD'][1]), fastq[sample.sample])
-        else:
-            pass
+        try:
+            ad.append((int(sample['AD'][0]), int(sample['AD'][1])))
+        except (AttributeError, TypeError, IndexError):
+            ad.append((0, 0))
+    depths.append(ad)
+depths = numpy.array(depths, dtype=int).reshape(len(alleles), len(samples), 2)
 
-for sample in fastq:
-    fastq[sample].close()
-    
+# Write the reads for each sample (workers share the SNP data by fork).
+if args.p > 1:
+    pool = multiprocessing.Pool(args.p)
+    for sample in pool.imap_unordered(write_sample, range(len(samples))):
+        pass
+    pool.close()
+    pool.join()
+else:
+    for j in range(len(samples)):
+        write_sample(j)
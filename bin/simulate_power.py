@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+import sys
+import argparse
+from gbstools import simulate
+
+USAGE = """
+simulate_power.py --theta <scaled mutation rates>
+                  --lambda <mean depths of coverage>
+                  --dispersion <indices of dispersion>
+                  --replicates <replicates per scenario>
+                  --samples <number of diploid samples>
+                  --draws <number of random draws by ms per replicate>
+                  -o <output table> (default=stdout)
+"""
+
+DESCRIPTION = """
+Power study for the GBStools likelihood ratio test. For every combination of
+theta, lambda and dispersion, simulate GBS SNPs with MS (as simulate_gbs_vcf.py),
+simulate read depths and PL (as simulate_dp.py), and test for restriction site
+variants (as polymorphism_test.py). Scenarios are run in parallel (-p option),
+each with random number streams derived from the master seed (--seed). Output
+is one row per SNP, with the columns of extract_vcf_info.py plus the scenario.
+"""
+
+parser = argparse.ArgumentParser(usage=USAGE, description=DESCRIPTION)
+parser.add_argument('-t', '--theta', dest='t', type=float, nargs='+', required=True, help='scaled mutation rates theta')
+parser.add_argument('-l', '--lambda', dest='lamb', type=float, nargs='+', required=True, help='mean depths of coverage')
+parser.add_argument('-d', '--dispersion', dest='d', type=float, nargs='+', default=[2.5], help='indices of dispersion (default=2.5)')
+parser.add_argument('-r', '--replicates', dest='r', type=int, default=1, help='replicates per scenario (default=1)')
+parser.add_argument('--samples', dest='n', type=int, required=True, help='number of diploid samples')
+parser.add_argument('--draws', dest='draws', type=int, required=True, help='number of random draws by ms per replicate')
+parser.add_argument('-o', '--output', dest='o', default=None, help='output table (default=stdout)')
+parser.add_argument('-p', '--processes', dest='p', type=int, default=1, help='number of processes (default=1)')
+parser.add_argument('--seed', dest='seed', type=int, default=0, help='master seed (default=0)')
+parser.add_argument('--frag_len', dest='frag_len', type=int, default=500, help='mean digest fragment length (default=500)')
+parser.add_argument('--site_len', dest='site_len', type=int, default=6, help='recognition site length (default=6)')
+parser.add_argument('--site_prob', dest='site_prob', type=float, default=0.0011, help='per-bp probability of recognition site')
+parser.add_argument('--read_len', dest='read_len', type=int, default=101, help='read length (default=101)')
+parser.add_argument('--variants_only', dest='variants_only', action="store_true", help='each locus has a restriction site variant')
+parser.add_argument('--sampled_only', dest='sampled_only', action="store_true", help='output only sampled sites')
+parser.add_argument('--missing', dest='missing', type=float, default=0.25, help='missingness threshold (default=0.25)')
+parser.add_argument('-e', '--epsilon', dest='epsilon', type=float, default=0.001, help='base call error rate (default=0.001)')
+parser.add_argument('--dispersion_sd', dest='dsd', type=float, default=0, help='index of dispersion sd (default=0)')
+parser.add_argument('--test_dispersion', dest='test_disp', type=float, default=None, help='index of dispersion used in the test (default=simulated dispersion)')
+parser.add_argument('--dpmode', dest='dpmode', action="store_true", help='use DP data only; ignore PL data')
+parser.add_argument('--ms', dest='ms', default='ms', help='path to ms (default=ms)')
+args = parser.parse_args()
+
+config = simulate.Config(samples=args.n, draws=args.draws, seed=args.seed,
+                         frag_len=args.frag_len, site_len=args.site_len,
+                         site_prob=args.site_prob, read_len=args.read_len,
+                         variants_only=args.variants_only, sampled_only=args.sampled_only,
+                         missing=args.missing, epsilon=args.epsilon,
+                         dispersion_sd=args.dsd, test_dispersion=args.test_disp,
+                         dpmode=args.dpmode, ms=args.ms)
+grid = simulate.scenarios(args.t, args.lamb, args.d, args.r)
+
+if args.o:
+    outstream = open(args.o, 'w')
+else:
+    outstream = sys.stdout
+simulate.run(grid, config, outstream, processes=args.p)
+outstream.close()
@@ -1 +1,2 @@
 from gbstools.parser import Reader, Writer
+from gbstools.instrument import Stats
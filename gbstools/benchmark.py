@@ -0,0 +1,503 @@
+"""
+Benchmark suite for GBStools (see gbstools_benchmark.py).
+
+Generates synthetic GBS data sets (a reference with a PstI site every
+FRAG_LEN bp, its GBSBED file, a VCF of SNPs with DP/AD/PL and one BAM file
+per sample, plus a pooled BAM file) for a grid of sample counts, depths of
+coverage and data types, using the depth and PL simulators of simulate.py.
+Each benchmark is run in a fresh worker process so that its peak RSS can be
+measured, and the results are written as JSON. Results can be compared with
+a saved baseline to flag regressions in throughput or memory.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import itertools
+import subprocess
+import multiprocessing
+from collections import namedtuple
+import numpy
+
+from gbstools import simulate
+from gbstools import pyms
+
+"""A synthetic data set (``data`` is 'pl' for DP and PL, 'dp' for DP only)."""
+Workload = namedtuple('Workload', ['samples', 'markers', 'lamb', 'dispersion', 'data', 'seed'])
+
+FRAG_LEN = 300
+READ_LEN = 101
+# Position of the SNP in the forward read.
+SNP_OFFSET = 50
+ENZYME = 'PstI'
+CHROM = 'bench'
+# Allele and restriction site variant frequencies of the synthetic SNPs,
+# and the fraction of SNPs with a restriction site variant.
+AF = 0.2
+DFREQ = 0.05
+DROPOUT_MARKERS = 0.2
+
+# pyms genotype code for (ref copies, alt copies).
+GENOTYPE_CODES = {(2, 0):0, (1, 1):1, (0, 2):2, (1, 0):3, (0, 1):4, (0, 0):5}
+
+# Threshold of the score_screen benchmark (see Marker.fit), and the DLR
+# threshold of gbstools_filter.py above which skipping a marker is an error.
+SCREEN_THRESHOLD = 0.1
+FILTER_CRITICAL = 2.71
+
+# Fields of a result used to match it with a baseline result.
+KEY_FIELDS = ('benchmark', 'samples', 'markers', 'lambda', 'dispersion', 'data')
+
+
+def workload_dir(outdir, workload):
+    '''Directory of the files for a workload.'''
+    name = 'n%i.m%i.l%g.d%g.%s.s%i' % tuple(workload)
+    return(os.path.join(outdir, name))
+
+
+def make_reference(rng, workload, filename):
+    '''Write a random reference sequence with a PstI site every FRAG_LEN bp.'''
+    site = 'CTGCAG'
+    bases = numpy.array(list('ACGT'))
+    length = FRAG_LEN * (workload.markers + 1)
+    seq = ''.join(bases[rng.randint(0, 4, length)])
+    # Remove chance sites, then add one at the start of each fragment.
+    seq = seq.replace(site, 'CTGCAA')
+    seq = ''.join([site + seq[i + len(site):i + FRAG_LEN] for i in range(0, length, FRAG_LEN)])
+    fasta = open(filename, 'w')
+    fasta.write('>%s\n' % CHROM)
+    for i in range(0, length, 60):
+        fasta.write(seq[i:i + 60] + '\n')
+    fasta.close()
+    return(seq)
+
+
+def make_sites(fasta, filename):
+    '''Digest the reference and write a GBSBED file. Returns the forward read
+    start (ligation site) of each fragment that is sequenced.'''
+    from gbstools import digest
+    from gbstools import gbsbed
+    import pysam
+    pysam.faidx(fasta)
+    sites = digest.digest(fasta, {ENZYME:digest.ENZYMES[ENZYME]})
+    records = list(gbsbed.make_sites(sites))
+    gbsbed.write_file(records, filename)
+    starts = []
+    for chrom, start, end, fwd_len, rev_len, enzyme, strand, fwd_lig, rev_lig in records:
+        if fwd_len != '.' and rev_len != '.' and int(fwd_len) >= 2 * READ_LEN:
+            starts.append(max(fwd_lig))
+    return(starts)
+
+
+def simulate_genotypes(rng, workload):
+    '''Draw pyms genotype codes (markers x samples) for the synthetic SNPs.'''
+    alleles = rng.choice(3, size=(workload.markers, workload.samples, 2),
+                         p=[1 - AF - DFREQ, AF, DFREQ])
+    # Redraw the '-' alleles of SNPs without a restriction site variant.
+    dropout = rng.random_sample(workload.markers) < DROPOUT_MARKERS
+    redraw = (alleles == 2) & ~dropout[:, numpy.newaxis, numpy.newaxis]
+    alleles[redraw] = rng.choice(2, size=redraw.sum(),
+                                 p=[(1 - AF - DFREQ) / (1 - DFREQ), AF / (1 - DFREQ)])
+    ref = (alleles == 0).sum(axis=2)
+    alt = (alleles == 1).sum(axis=2)
+    codes = numpy.zeros(ref.shape, dtype=int)
+    for (r, a), code in GENOTYPE_CODES.items():
+        codes[(ref == r) & (alt == a)] = code
+    return(codes)
+
+
+def write_vcf(filename, workload, seq, starts, codes, dp_ref, dp_alt, pl):
+    '''Write the VCF file of synthetic SNPs (as simulate_dp.py).'''
+    samples = [str(j) for j in range(workload.samples)]
+    vcf = open(filename, 'w')
+    vcf.write('##fileformat=VCFv4.1\n')
+    vcf.write('##INFO=<ID=AF,Number=A,Type=Float,Description="Allele frequency">\n')
+    vcf.write('##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">\n')
+    vcf.write('##FORMAT=<ID=AD,Number=.,Type=Integer,Description="Allelic depths">\n')
+    vcf.write('##FORMAT=<ID=DP,Number=1,Type=Integer,Description="Read depth">\n')
+    vcf.write('##FORMAT=<ID=PL,Number=G,Type=Integer,Description="Phred-scaled genotype likelihoods">\n')
+    vcf.write('#' + '\t'.join(['CHROM', 'POS', 'ID', 'REF', 'ALT', 'QUAL', 'FILTER', 'INFO', 'FORMAT'] + samples) + '\n')
+    genotypes = pyms.GENOTYPES[codes]
+    dp = dp_ref + dp_alt
+    for k, start in enumerate(starts):
+        ref, alt = snp_alleles(seq, start)
+        calls = []
+        for j in range(workload.samples):
+            if dp[k, j] > 0:
+                calls.append('%s:%i,%i:%i:%i,%i,%i' % (genotypes[k, j], dp_ref[k, j], dp_alt[k, j],
+                                                       dp[k, j], pl[k, j, 0], pl[k, j, 1], pl[k, j, 2]))
+            else:
+                calls.append(genotypes[k, j])
+        fields = [CHROM, str(start + SNP_OFFSET + 1), '.', ref, alt, '.', 'PASS',
+                  'AF=%g' % AF, 'GT:AD:DP:PL']
+        vcf.write('\t'.join(fields + calls) + '\n')
+    vcf.close()
+    return(samples)
+
+
+def snp_alleles(seq, start):
+    '''REF and ALT bases of the SNP in the read starting at ``start``.'''
+    ref = seq[start + SNP_OFFSET]
+    alt = 'ACGT'['ACGT'.index(ref) - 1]
+    return(ref, alt)
+
+
+def write_bams(outdir, workload, seq, starts, dp_ref, dp_alt):
+    '''Write a BAM file of forward reads per sample and a pooled BAM file.
+    Returns the bamlist file name.'''
+    import pysam
+    header = {'HD':{'VN':'1.0', 'SO':'coordinate'},
+              'SQ':[{'SN':CHROM, 'LN':len(seq)}]}
+    qual = 'I' * READ_LEN
+    bams = [pysam.Samfile(os.path.join(outdir, '%i.bam' % j), 'wb', header=header)
+            for j in range(workload.samples)]
+    pooled = pysam.Samfile(os.path.join(outdir, 'pooled.bam'), 'wb', header=header)
+    n = 0
+    for k, start in enumerate(starts):
+        ref, alt = snp_alleles(seq, start)
+        read_ref = seq[start:start + READ_LEN]
+        read_alt = read_ref[:SNP_OFFSET] + alt + read_ref[SNP_OFFSET + 1:]
+        for j, bam in enumerate(bams):
+            for read_seq, count in ((read_ref, dp_ref[k, j]), (read_alt, dp_alt[k, j])):
+                for i in range(count):
+                    read = pysam.AlignedRead()
+                    read.qname = 'r%i' % n
+                    read.seq = read_seq
+                    read.qual = qual
+                    read.flag = 0
+                    read.tid = 0
+                    read.pos = start
+                    read.mapq = 60
+                    read.cigar = [(0, READ_LEN)]
+                    bam.write(read)
+                    pooled.write(read)
+                    n += 1
+    bamlist = os.path.join(outdir, 'bamlist.txt')
+    out = open(bamlist, 'w')
+    for j, bam in enumerate(bams):
+        bam.close()
+        pysam.index(bam.filename)
+        out.write('%i\t%s\n' % (j, bam.filename))
+    out.close()
+    pooled.close()
+    pysam.index(pooled.filename)
+    return(bamlist)
+
+
+def make_workload(outdir, workload):
+    '''Generate the files for a workload (if not already made).'''
+    path = workload_dir(outdir, workload)
+    if os.path.exists(os.path.join(path, 'done')):
+        return(path)
+    if not os.path.exists(path):
+        os.makedirs(path)
+    rng = numpy.random.RandomState(simulate.derive_seed(*workload))
+    seq = make_reference(rng, workload, os.path.join(path, 'ref.fa'))
+    starts = make_sites(os.path.join(path, 'ref.fa'), os.path.join(path, 'sites.gbsbed.gz'))
+    workload = workload._replace(markers=len(starts))
+    codes = simulate_genotypes(rng, workload)
+    dp_ref, dp_alt = simulate.simulate_depths(rng, simulate.REF_COPIES[codes],
+                                              simulate.ALT_COPIES[codes], workload.lamb,
+                                              numpy.repeat(workload.dispersion, len(starts)))
+    pl = simulate.calculate_pl(dp_ref, dp_alt)
+    write_vcf(os.path.join(path, 'snps.vcf'), workload, seq, starts, codes, dp_ref, dp_alt, pl)
+    write_bams(path, workload, seq, starts, dp_ref, dp_alt)
+    open(os.path.join(path, 'done'), 'w').close()
+    return(path)
+
+
+def read_markers(path, workload, bamlist=False, engine='em'):
+    '''Read the markers of a workload with ``Reader``.'''
+    from gbstools import parser
+    if bamlist:
+        bamlist = os.path.join(path, 'bamlist.txt')
+    else:
+        bamlist = None
+    reader = parser.Reader(filename=os.path.join(path, 'snps.vcf'), bamlist=bamlist,
+                           disp_intercept=workload.dispersion,
+                           dpmode=(workload.data == 'dp'), engine=engine)
+    return(reader, list(reader))
+
+
+def count_reads(markers):
+    return(sum([call.DP for marker in markers for call in marker.calls]))
+
+
+def bench_em_update(path, workload, bindir):
+    '''One EM update (H1) per marker.'''
+    import em
+    reader, markers = read_markers(path, workload)
+    markers = [m for m in markers if not m.param['H1'][0]['fail']]
+    start = time.time()
+    for marker in markers:
+        em.update(marker.param['H1'][0], marker.calls, marker.disp)
+    return(time.time() - start, len(markers), count_reads(markers))
+
+
+def bench_em_ped_update(path, workload, bindir):
+    '''One pedigree EM update per marker (sample 0 father, 1 mother, the rest children).'''
+    import em
+    reader, markers = read_markers(path, workload)
+    markers = [m for m in markers if not m.param['H1'][0]['fail']]
+    parental_gt = em.ParentalGT(em.GENO[1], em.GENO[1])
+    params = []
+    for marker in markers:
+        for i, call in enumerate(marker.calls):
+            call.is_father = (i == 0)
+            call.is_mother = (i == 1)
+            call.is_child = (i > 1)
+        params.append({'lambda':marker.param['H1'][0]['lambda'],
+                       'delta':marker.param['H1'][0]['delta'], 'fail':False, 'loglik':None})
+    start = time.time()
+    for marker, param in zip(markers, params):
+        em.ped_update(param, marker.calls, marker.disp, parental_gt)
+    return(time.time() - start, len(markers), count_reads(markers))
+
+
+def bench_marker_fit(path, workload, bindir):
+    '''Marker.fit (H0 and H1 EM) per marker.'''
+    reader, markers = read_markers(path, workload)
+    start = time.time()
+    for marker in markers:
+        marker.fit()
+    return(time.time() - start, len(markers), count_reads(markers))
+
+
+def bench_marker_fit_qn(path, workload, bindir):
+    '''Marker.fit with the quasi-Newton engine per marker.'''
+    reader, markers = read_markers(path, workload, engine='qn')
+    start = time.time()
+    for marker in markers:
+        marker.fit()
+    return(time.time() - start, len(markers), count_reads(markers))
+
+
+def bench_score_screen(path, workload, bindir):
+    '''Marker.fit with score-test screening of the H1 EM. Also reports the
+    speedup over Marker.fit without screening, the fraction of markers
+    skipped, and the fraction of markers with DLR > FILTER_CRITICAL (without
+    screening) that were skipped.'''
+    reader, full = read_markers(path, workload)
+    start = time.time()
+    for marker in full:
+        marker.fit()
+    full_seconds = time.time() - start
+    reader, markers = read_markers(path, workload)
+    start = time.time()
+    for marker in markers:
+        marker.fit(screen=SCREEN_THRESHOLD)
+    seconds = time.time() - start
+    skipped = [bool(marker.info.get('ScoreSkipped')) for marker in markers]
+    positive = [(marker.lik_ratio or 0) > FILTER_CRITICAL for marker in full]
+    false_skips = len([1 for s, p in zip(skipped, positive) if s and p])
+    extra = {'speedup':full_seconds / seconds if seconds > 0 else None,
+             'skip_rate':float(sum(skipped)) / max(len(markers), 1),
+             'false_skip_rate':float(false_skips) / sum(positive) if sum(positive) else 0.0}
+    return(seconds, len(markers), count_reads(markers), extra)
+
+
+def bench_reader_vcf(path, workload, bindir):
+    '''Reader.next with data from the VCF file.'''
+    start = time.time()
+    reader, markers = read_markers(path, workload)
+    return(time.time() - start, len(markers), count_reads(markers))
+
+
+def bench_reader_bam(path, workload, bindir):
+    '''Reader.next with data from the BAM files (bamlist mode).'''
+    start = time.time()
+    reader, markers = read_markers(path, workload, bamlist=True)
+    return(time.time() - start, len(markers), count_reads(markers))
+
+
+def bench_writer(path, workload, bindir):
+    '''Writer.write_record for fitted markers.'''
+    from gbstools import parser
+    reader, markers = read_markers(path, workload)
+    for marker in markers:
+        marker.fit()
+    outstream = open(os.devnull, 'w')
+    writer = parser.Writer(outstream, template=reader)
+    start = time.time()
+    for marker in markers:
+        writer.write_record(marker)
+    outstream.close()
+    return(time.time() - start, len(markers), count_reads(markers))
+
+
+def run_script(bindir, script, *args):
+    '''Run a GBStools script with the current Python interpreter.'''
+    cmd = [sys.executable, os.path.join(bindir, script)] + list(args)
+    subprocess.check_call(cmd, stdout=open(os.devnull, 'w'))
+    return(None)
+
+
+def vcf_markers(path):
+    return(len([line for line in open(os.path.join(path, 'snps.vcf')) if line[0] != '#']))
+
+
+def pooled_reads(path):
+    import pysam
+    bam = pysam.Samfile(os.path.join(path, 'pooled.bam'), 'rb')
+    return(bam.mapped + bam.unmapped)
+
+
+def bench_annotate_se(path, workload, bindir):
+    '''annotate_se_bam.py on the pooled BAM file.'''
+    out = os.path.join(path, 'pooled.se.bam')
+    start = time.time()
+    run_script(bindir, 'annotate_se_bam.py', '-i', os.path.join(path, 'pooled.bam'),
+               '-o', out, '-b', os.path.join(path, 'sites.gbsbed.gz'))
+    return(time.time() - start, vcf_markers(path), pooled_reads(path))
+
+
+def bench_annotate_pe(path, workload, bindir):
+    '''annotate_pe_bam.py on the pooled BAM file (single-end reads, so no mates are found).'''
+    out = os.path.join(path, 'pooled.pe.bam')
+    start = time.time()
+    run_script(bindir, 'annotate_pe_bam.py', '-i', os.path.join(path, 'pooled.bam'),
+               '-o', out, '-b', os.path.join(path, 'sites.gbsbed.gz'))
+    return(time.time() - start, vcf_markers(path), pooled_reads(path))
+
+
+def bench_mapping_summary(path, workload, bindir):
+    '''mapping_summary.py on the pooled BAM file annotated by annotate_se_bam.py.'''
+    import pysam
+    bam = os.path.join(path, 'pooled.annotated.bam')
+    if not os.path.exists(bam + '.bai'):
+        run_script(bindir, 'annotate_se_bam.py', '-i', os.path.join(path, 'pooled.bam'),
+                   '-o', bam, '-b', os.path.join(path, 'sites.gbsbed.gz'))
+        pysam.index(bam)
+    start = time.time()
+    run_script(bindir, 'mapping_summary.py', '-i', bam)
+    return(time.time() - start, vcf_markers(path), pooled_reads(path))
+
+
+def bench_import(path, workload, bindir):
+    '''Cold import of gbstools in a new interpreter (less the interpreter's startup).'''
+    times = []
+    for code in ('pass', 'import gbstools'):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', code])
+        times.append(time.time() - start)
+    return(max(times[1] - times[0], 0), 0, 0)
+
+
+"""Benchmarks in the order they are run."""
+BENCHMARKS = (('import', bench_import),
+              ('em_update', bench_em_update),
+              ('em_ped_update', bench_em_ped_update),
+              ('marker_fit', bench_marker_fit),
+              ('marker_fit_qn', bench_marker_fit_qn),
+              ('score_screen', bench_score_screen),
+              ('reader_vcf', bench_reader_vcf),
+              ('reader_bam', bench_reader_bam),
+              ('writer', bench_writer),
+              ('annotate_se', bench_annotate_se),
+              ('annotate_pe', bench_annotate_pe),
+              ('mapping_summary', bench_mapping_summary))
+
+
+def run_benchmark(task):
+    '''Run one benchmark (in a worker process). Returns (seconds, markers,
+    reads, peak RSS in kB of the worker and the scripts it ran, and any
+    further results of the benchmark as a dict).'''
+    name, path, workload, bindir = task
+    result = dict(BENCHMARKS)[name](path, workload, bindir)
+    seconds, markers, reads = result[:3]
+    extra = result[3] if len(result) > 3 else {}
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return(seconds, markers, reads, rss, extra)
+
+
+def run(workloads, names, outdir, bindir, repeat=1):
+    '''Run the benchmarks for each workload. Returns a list of result dicts;
+    the time is the fastest of ``repeat`` runs, the RSS the largest.'''
+    results = []
+    for workload in workloads:
+        path = make_workload(outdir, workload)
+        for name in names:
+            runs = []
+            for i in range(repeat):
+                pool = multiprocessing.Pool(1, maxtasksperchild=1)
+                runs.append(pool.apply(run_benchmark, ((name, path, workload, bindir),)))
+                pool.close()
+                pool.join()
+            seconds = min([r[0] for r in runs])
+            markers, reads = runs[0][1:3]
+            result = {'benchmark':name, 'samples':workload.samples,
+                      'markers':workload.markers, 'lambda':workload.lamb,
+                      'dispersion':workload.dispersion, 'data':workload.data,
+                      'seconds':seconds, 'markers_tested':markers, 'reads':reads,
+                      'markers_per_sec':markers / seconds if seconds > 0 else None,
+                      'reads_per_sec':reads / seconds if seconds > 0 else None,
+                      'peak_rss_kb':max([r[3] for r in runs])}
+            result.update(min(runs)[4])
+            results.append(result)
+            sys.stderr.write('%s\n' % format_result(result))
+    return(results)
+
+
+def workloads(samples, markers, lambdas, dispersion, data, seed=0):
+    '''Generate the grid of workloads.'''
+    for n, lamb, d in itertools.product(samples, lambdas, data):
+        yield Workload(n, markers, lamb, dispersion, d, seed)
+
+
+def format_result(result):
+    line = ('%-16s n=%-5i lambda=%-6g %s %8.3f s %10.1f markers/s %12.1f reads/s %8i kB' %
+            (result['benchmark'], result['samples'], result['lambda'], result['data'],
+             result['seconds'], result['markers_per_sec'] or 0, result['reads_per_sec'] or 0,
+             result['peak_rss_kb']))
+    if 'speedup' in result:
+        line += (' speedup %.2fx, skipped %.3f, false skips %.3f' %
+                 (result['speedup'] or 0, result['skip_rate'], result['false_skip_rate']))
+    return(line)
+
+
+def write_results(results, filename):
+    '''Write the results as JSON, with a description of the machine.'''
+    report = {'python':platform.python_version(),
+              'platform':platform.platform(),
+              'numpy':numpy.__version__,
+              'time':time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'results':results}
+    out = open(filename, 'w')
+    json.dump(report, out, indent=1, sort_keys=True)
+    out.close()
+    return(None)
+
+
+def compare(results, baseline, tolerance=0.1):
+    '''Compare results with a baseline (a JSON file from write_results).
+
+    A result is a regression if its throughput (markers/sec) is more than
+    ``tolerance`` below the baseline (its time more than ``tolerance`` above,
+    for benchmarks without markers such as import), or its peak RSS more
+    than ``tolerance`` above it. Returns a list of (result, baseline result, reasons).
+    '''
+    report = json.load(open(baseline, 'r'))
+    base = dict([(tuple([r[k] for k in KEY_FIELDS]), r) for r in report['results']])
+    regressions = []
+    for result in results:
+        key = tuple([result[k] for k in KEY_FIELDS])
+        if key not in base:
+            continue
+        old = base[key]
+        reasons = []
+        if old['markers_per_sec'] and result['markers_per_sec'] is not None:
+            if result['markers_per_sec'] < old['markers_per_sec'] * (1 - tolerance):
+                reasons.append('markers/sec %.1f -> %.1f' % (old['markers_per_sec'],
+                                                             result['markers_per_sec']))
+        elif not old['markers_tested']:
+            if result['seconds'] > old['seconds'] * (1 + tolerance):
+                reasons.append('seconds %.3f -> %.3f' % (old['seconds'], result['seconds']))
+        if result['peak_rss_kb'] > old['peak_rss_kb'] * (1 + tolerance):
+            reasons.append('peak RSS %i -> %i kB' % (old['peak_rss_kb'], result['peak_rss_kb']))
+        if reasons:
+            regressions.append((result, old, reasons))
+    return(regressions)
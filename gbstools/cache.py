@@ -0,0 +1,92 @@
+"""
+On-disk cache of converged marker fits (see Marker.fit and the --cache
+option of polymorphism_test.py).
+
+Fits are keyed by a hash of the EM inputs of a marker (see
+Marker.cache_key), so a rerun with e.g. a new sample subset or
+normalization factors only refits the markers whose inputs changed. The
+cache is an SQLite database. Its size is bounded by evicting the least
+recently used fits, and it counts hits, misses and evictions.
+"""
+
+import sqlite3
+import cPickle
+
+
+class FitCache():
+    """Size-bounded LRU cache of fits in an SQLite database."""
+    def __init__(self, filename, max_size=1 << 30, commit_interval=1000):
+        self.filename = filename
+        # Maximum total size (bytes) of the pickled fits.
+        self.max_size = max_size
+        self.commit_interval = commit_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.changes = 0
+        self.db = sqlite3.connect(filename)
+        self.db.execute('CREATE TABLE IF NOT EXISTS fits '
+                        '(key TEXT PRIMARY KEY, value BLOB, size INTEGER, used INTEGER)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS fits_used ON fits (used)')
+        self.size, self.clock = self.db.execute(
+            'SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) FROM fits').fetchone()
+
+    def tick(self):
+        '''Advance the clock that orders fits by their last use.'''
+        self.clock += 1
+        return(self.clock)
+
+    def get(self, key):
+        '''Return the cached fit for key, or None.'''
+        row = self.db.execute('SELECT value FROM fits WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return(None)
+        self.hits += 1
+        self.db.execute('UPDATE fits SET used = ? WHERE key = ?', (self.tick(), key))
+        self.changed()
+        return(cPickle.loads(str(row[0])))
+
+    def put(self, key, value):
+        '''Add a fit to the cache, evicting old fits if the cache is full.'''
+        data = cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+        row = self.db.execute('SELECT size FROM fits WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            self.size -= row[0]
+        self.db.execute('INSERT OR REPLACE INTO fits VALUES (?, ?, ?, ?)',
+                        (key, sqlite3.Binary(data), len(data), self.tick()))
+        self.size += len(data)
+        if self.size > self.max_size:
+            self.evict()
+        self.changed()
+        return(None)
+
+    def evict(self):
+        '''Evict least recently used fits until the cache is within max_size.'''
+        while self.size > self.max_size:
+            rows = self.db.execute('SELECT key, size FROM fits ORDER BY used LIMIT 100').fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self.size <= self.max_size:
+                    break
+                self.db.execute('DELETE FROM fits WHERE key = ?', (key,))
+                self.size -= size
+                self.evictions += 1
+        return(None)
+
+    def changed(self):
+        '''Commit every commit_interval changes.'''
+        self.changes += 1
+        if self.changes % self.commit_interval == 0:
+            self.db.commit()
+        return(None)
+
+    def summary(self):
+        return("Fit cache %s: %i hits, %i misses, %i evictions, %.1f MB" %
+               (self.filename, self.hits, self.misses, self.evictions, self.size / 1e6))
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+        return(None)
@@ -0,0 +1,60 @@
+"""
+Checkpoints for resuming polymorphism_test.py runs (see --resume).
+
+A checkpoint records the number of input VCF records that have been fully
+written to the output VCF, the CHROM/POS of the last of them, the size of
+the output file at that point, a hash of the output header and the options
+that change the fits (to check that a run is resumed with the same input
+and settings). Checkpoints are
+written to a temporary file that is then renamed, so a checkpoint file is
+never partly written.
+"""
+
+import os
+import json
+import hashlib
+
+
+def header_hash(header):
+    '''MD5 hex digest of a VCF header.'''
+    return(hashlib.md5(header).hexdigest())
+
+
+def write(filename, records, chrom, pos, offset, header, options=None):
+    '''Write a checkpoint. ``options`` is a hash of the run's settings
+    (JSON-serializable values).'''
+    state = {'records':records, 'chrom':chrom, 'pos':pos, 'offset':offset,
+             'header':header_hash(header), 'options':options}
+    tmp = filename + '.tmp'
+    out = open(tmp, 'w')
+    json.dump(state, out)
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+    os.rename(tmp, filename)
+    return(None)
+
+
+def read(filename):
+    '''Read a checkpoint. Returns None if there is no checkpoint file.'''
+    try:
+        instream = open(filename, 'r')
+    except IOError:
+        return(None)
+    state = json.load(instream)
+    instream.close()
+    return(state)
+
+
+def changed_options(state, options):
+    '''Return the names of the options that differ from a checkpoint.'''
+    saved = state.get('options') or {}
+    keys = set(saved) | set(options)
+    return(sorted([key for key in keys if saved.get(key) != options.get(key)]))
+
+
+def remove(filename):
+    '''Remove a checkpoint (e.g. when a run is complete).'''
+    if os.path.exists(filename):
+        os.remove(filename)
+    return(None)
@@ -0,0 +1,171 @@
+"""
+In-silico restriction digest of a reference genome (see digest_fasta.py).
+
+Recognition sites, including degenerate (IUPAC) sites, are found with
+vectorized NumPy comparisons over the reference sequence. The reference is
+read with pysam from a FASTA file (plain or bgzipped) with a faidx index,
+which is created if it does not exist. Contigs are split into regions that
+are digested in parallel.
+
+Sites are reported like EMBOSS restrict/digest_to_bed.py: the 0-based start
+and end of the recognition site on the forward strand, with strand '-' for
+matches to the reverse complement of non-palindromic sites.
+"""
+
+import os
+import multiprocessing
+import numpy
+
+"""Recognition sites of the enzymes supported by make_gbsbed.py."""
+ENZYMES = {'ApeKI':'GCWGC',
+           'PstI':'CTGCAG',
+           'MspI':'CCGG',
+           'EcoRI':'GAATTC',
+           'SbfI':'CCTGCAGG',
+           'BpuEI':'CTTGAG',
+           'BsaXI':'ACNNNNNCTCC',
+           'CspCI':'CAANNNNNGTGG'}
+
+"""Bases matched by each IUPAC code."""
+IUPAC = {'A':'A', 'C':'C', 'G':'G', 'T':'T',
+         'R':'AG', 'Y':'CT', 'S':'CG', 'W':'AT', 'K':'GT', 'M':'AC',
+         'B':'CGT', 'D':'AGT', 'H':'ACT', 'V':'ACG', 'N':'ACGT'}
+
+COMPLEMENT = {'A':'T', 'C':'G', 'G':'C', 'T':'A',
+              'R':'Y', 'Y':'R', 'S':'S', 'W':'W', 'K':'M', 'M':'K',
+              'B':'V', 'V':'B', 'D':'H', 'H':'D', 'N':'N'}
+
+# One bit per base; ambiguous or masked reference bases (e.g. N) match nothing.
+_BASE_BITS = {'A':1, 'C':2, 'G':4, 'T':8}
+_CODES = numpy.zeros(256, dtype=numpy.uint8)
+for _base, _bit in _BASE_BITS.items():
+    _CODES[ord(_base)] = _bit
+    _CODES[ord(_base.lower())] = _bit
+
+
+def reverse_complement(site):
+    '''Reverse complement of an IUPAC recognition site.'''
+    return(''.join([COMPLEMENT[base] for base in reversed(site.upper())]))
+
+
+def site_mask(site):
+    '''Bit mask of the bases matched at each position of a recognition site.'''
+    return([sum([_BASE_BITS[base] for base in IUPAC[code]]) for code in site.upper()])
+
+
+def make_patterns(enzymes):
+    '''Make a list of (enzyme, strand, mask) search patterns.
+
+    ``enzymes`` is a hash of recognition sites keyed by enzyme name.
+    Non-palindromic sites are also searched for on the reverse strand.
+    '''
+    patterns = []
+    for enzyme in sorted(enzymes):
+        site = enzymes[enzyme].upper()
+        patterns.append((enzyme, '+', site_mask(site)))
+        if reverse_complement(site) != site:
+            patterns.append((enzyme, '-', site_mask(reverse_complement(site))))
+    return(patterns)
+
+
+def find_sites(seq, patterns, offset=0, limit=None):
+    '''Find recognition sites in a sequence.
+
+    Returns a list of (start, end, enzyme, strand) tuples with positions
+    relative to the start of the reference (``offset`` is the position of
+    the first base of ``seq``), sorted by start. Only sites starting in the
+    first ``limit`` bases of ``seq`` are reported.
+    '''
+    codes = _CODES[numpy.frombuffer(seq, dtype=numpy.uint8)]
+    if limit is None:
+        limit = len(codes)
+    hits = []
+    for enzyme, strand, mask in patterns:
+        n = min(limit, len(codes) - len(mask) + 1)
+        if n <= 0:
+            continue
+        match = numpy.ones(n, dtype=bool)
+        for k, bits in enumerate(mask):
+            match &= (codes[k:k + n] & bits) != 0
+        for start in (numpy.flatnonzero(match) + offset).tolist():
+            hits.append((start, start + len(mask), enzyme, strand))
+    hits.sort()
+    return(hits)
+
+
+# Open FASTA files, keyed by process ID and file name. Worker processes must
+# not use a handle inherited from their parent, which shares its file offset.
+_fasta = {}
+
+def _open_fasta(filename):
+    '''Open an indexed FASTA file (one handle per process).'''
+    key = (os.getpid(), filename)
+    if key not in _fasta:
+        import pysam
+        _fasta[key] = pysam.Fastafile(filename)
+    return(_fasta[key])
+
+
+def contigs(filename):
+    '''Return the (name, length) of the contigs in a FASTA file, creating
+    the faidx index if there is none.'''
+    import pysam
+    fasta = pysam.Fastafile(filename)
+    sizes = zip(fasta.references, fasta.lengths)
+    fasta.close()
+    return(sizes)
+
+
+def digest_region(task):
+    '''Find the recognition sites starting in one region of a contig.'''
+    filename, chrom, start, end, length, patterns = task
+    overlap = max([len(mask) for enzyme, strand, mask in patterns]) - 1
+    fasta = _open_fasta(filename)
+    seq = fasta.fetch(chrom, start, min(end + overlap, length))
+    if not isinstance(seq, bytes):
+        seq = seq.encode('ascii')
+    return(chrom, find_sites(seq, patterns, offset=start, limit=end - start))
+
+
+def digest(filename, enzymes, processes=1, region_size=10000000):
+    '''Digest a FASTA file and generate (chrom, start, end, enzyme, strand)
+    tuples, sorted by start within each contig (in FASTA order).
+
+    ``enzymes`` is a list of enzyme names in ``ENZYMES`` or a hash of
+    recognition sites keyed by enzyme name.
+    '''
+    if not isinstance(enzymes, dict):
+        enzymes = dict((enzyme, ENZYMES[enzyme]) for enzyme in enzymes)
+    patterns = make_patterns(enzymes)
+    tasks = []
+    for chrom, length in contigs(filename):
+        for start in range(0, length, region_size):
+            end = min(start + region_size, length)
+            tasks.append((filename, chrom, start, end, length, patterns))
+    if processes > 1:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap(digest_region, tasks)
+    else:
+        pool = None
+        results = (digest_region(task) for task in tasks)
+    for chrom, hits in results:
+        for start, end, enzyme, strand in hits:
+            yield (chrom, start, end, enzyme, strand)
+    if pool:
+        pool.close()
+        pool.join()
+
+
+def write_bed(sites, outstream, buffer_lines=10000):
+    '''Write restriction sites in the BED format made by digest_to_bed.py.'''
+    header = ('chrom', 'chromStart', 'chromEnd', 'name', 'score', 'strand')
+    outstream.write('#' + '\t'.join(header) + '\n')
+    lines = []
+    for chrom, start, end, enzyme, strand in sites:
+        lines.append('\t'.join((chrom, str(start), str(end), enzyme, '.', strand)))
+        if len(lines) == buffer_lines:
+            outstream.write('\n'.join(lines) + '\n')
+            lines = []
+    if lines:
+        outstream.write('\n'.join(lines) + '\n')
+    return(None)
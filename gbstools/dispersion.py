@@ -0,0 +1,143 @@
+"""
+Estimation of the coverage dispersion index (see estimate_dispersion.py).
+
+In the GBStools model the depth of coverage of a sample with two cut
+alleles is negative binomial with mean lambda * NF and a variance of D times
+the mean, where the index of dispersion D is a linear function of the mean
+coverage, D = slope * lambda + intercept (see Marker.__init__). Here D is
+estimated for a sample of markers by the method of moments and the line is
+fitted by weighted least squares, for all markers and optionally for bins of
+the median insert size. The result is a small tab-delimited file that
+``Reader`` reads in place of the --dispersion_slope/--dispersion_intercept
+options of polymorphism_test.py.
+"""
+
+import numpy
+
+# Smallest index of dispersion of the model (the NB size is lambda / (D - 1)).
+MIN_DISPERSION = 1.01
+
+
+class Dispersion():
+    """Dispersion index slope and intercept, optionally by insert size bin."""
+    def __init__(self, default, bins=()):
+        # Slope/intercept dicts (as Reader.disp); bins are (min, max, disp).
+        self.default = default
+        self.bins = list(bins)
+
+    def lookup(self, insert=None):
+        '''Return the slope/intercept dict for a median insert size.'''
+        if insert is not None:
+            for insert_min, insert_max, disp in self.bins:
+                if insert_min <= insert < insert_max:
+                    return(disp)
+        return(self.default)
+
+
+def marker_moments(dp, nf, min_samples=5):
+    '''Method of moments estimates of lambda and D for each marker.
+
+    ``dp`` and ``nf`` are markers x samples arrays of depths and
+    normalization factors. Samples with no reads are left out (they may be
+    missing or carry a dropout allele), which overestimates D at low
+    coverage (lambda below about 5), where zero reads are common. D is the
+    Pearson statistic of the depths divided by its degrees of freedom.
+    Returns arrays of lambda, D and the number of samples used, with NaN
+    for markers with fewer than min_samples samples.
+    '''
+    dp = numpy.asarray(dp, dtype=float)
+    nf = numpy.asarray(nf, dtype=float)
+    covered = dp > 0
+    n = covered.sum(axis=1)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        lamb = numpy.where(covered, dp, 0).sum(axis=1) / numpy.where(covered, nf, 0).sum(axis=1)
+        mu = lamb[:, numpy.newaxis] * nf
+        pearson = numpy.where(covered, (dp - mu) ** 2 / mu, 0).sum(axis=1)
+        disp = pearson / (n - 1)
+    ok = (n >= min_samples) & numpy.isfinite(lamb) & numpy.isfinite(disp)
+    lamb[~ok] = numpy.nan
+    disp[~ok] = numpy.nan
+    return(lamb, disp, n)
+
+
+def fit(lamb, disp, n, constant=False):
+    '''Fit D = slope * lambda + intercept by least squares, weighting the
+    markers by their degrees of freedom (NaN markers are ignored).
+
+    If ``constant`` is True, or if the line falls below MIN_DISPERSION over
+    the range of lambda, only the intercept (the weighted mean D) is
+    fitted. Returns a slope/intercept dict and the number of markers.
+    '''
+    ok = numpy.isfinite(lamb) & numpy.isfinite(disp)
+    if not ok.any():
+        return(None, 0)
+    lamb = lamb[ok]
+    disp = disp[ok]
+    weights = (n[ok] - 1).astype(float)
+    slope = 0.0
+    intercept = (weights * disp).sum() / weights.sum()
+    if not constant and len(set(lamb.tolist())) > 1:
+        x = numpy.vstack([lamb, numpy.ones(len(lamb))]).T
+        sqrt_w = numpy.sqrt(weights)
+        line = numpy.linalg.lstsq(x * sqrt_w[:, numpy.newaxis], disp * sqrt_w, rcond=-1)[0]
+        if (line[0] * lamb + line[1]).min() >= MIN_DISPERSION:
+            slope, intercept = line
+    intercept = max(intercept, MIN_DISPERSION)
+    return({'slope':float(slope), 'intercept':float(intercept)}, int(ok.sum()))
+
+
+def estimate(dp, nf, inserts=None, edges=(), constant=False, min_samples=5):
+    '''Estimate the dispersion for all markers and for insert size bins.
+
+    ``inserts`` are the median insert sizes of the markers (None if
+    unknown) and ``edges`` the bin edges, e.g. (0, 200, 400, 1000).
+    Returns a Dispersion and a list of (min, max, markers) per fit, starting
+    with (None, None, markers) for all markers.
+    '''
+    lamb, disp, n = marker_moments(dp, nf, min_samples)
+    default, markers = fit(lamb, disp, n, constant)
+    if default is None:
+        raise ValueError("No markers with at least %i covered samples." % min_samples)
+    counts = [(None, None, markers)]
+    bins = []
+    if inserts is not None and len(edges) > 1:
+        inserts = numpy.array([numpy.nan if i is None else i for i in inserts], dtype=float)
+        for insert_min, insert_max in zip(edges[:-1], edges[1:]):
+            with numpy.errstate(invalid='ignore'):
+                in_bin = (inserts >= insert_min) & (inserts < insert_max)
+            result, markers = fit(lamb[in_bin], disp[in_bin], n[in_bin], constant)
+            if result is not None:
+                bins.append((insert_min, insert_max, result))
+                counts.append((insert_min, insert_max, markers))
+    return(Dispersion(default, bins), counts)
+
+
+def write(outstream, dispersion, counts):
+    '''Write a dispersion file (the first row, without an insert size bin,
+    is used for markers outside the bins).'''
+    outstream.write("#insert_min\tinsert_max\tslope\tintercept\tmarkers\n")
+    fits = [(None, None, dispersion.default)] + dispersion.bins
+    for (insert_min, insert_max, disp), (a, b, markers) in zip(fits, counts):
+        if insert_min is None:
+            insert_min = insert_max = '.'
+        outstream.write("%s\t%s\t%.6g\t%.6g\t%i\n" % (insert_min, insert_max, disp['slope'],
+                                                      disp['intercept'], markers))
+    return(None)
+
+
+def read(filename):
+    '''Read a dispersion file written by write().'''
+    default = None
+    bins = []
+    for line in open(filename, 'r'):
+        if not line.strip() or line[0] == '#':
+            continue
+        insert_min, insert_max, slope, intercept = line.split()[:4]
+        disp = {'slope':float(slope), 'intercept':float(intercept)}
+        if insert_min == '.':
+            default = disp
+        else:
+            bins.append((float(insert_min), float(insert_max), disp))
+    if default is None:
+        raise ValueError("No default dispersion (insert size '.') in %s" % filename)
+    return(Dispersion(default, bins))
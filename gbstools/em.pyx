@@ -1,8 +1,8 @@
 cdef extern from "math.h":
     double log (double x)
     double exp (double x)
+    double lgamma (double x)
 
-from scipy.misc import comb
 #from math import log
 #from math import exp
 from collections import namedtuple
@@ -15,13 +15,6 @@ GENO = ((2,0,0),
         (0,1,1),
         (0,0,2))
 
-# Make a hash of combinations to avoid redundant calculation.
-choose = {}
-for i in range(300):
-    choose[i] = {}
-    for j in range(i+1):
-        choose[i][j] = comb(i, j, exact=1)
-
 def gametes(g):
     '''Return a list of the possible gametes for genotype g.'''
     gametes = []
@@ -64,8 +57,29 @@ def trio_genotypes(genotypes, loglik=True):
 # Get all possible parent/offspring combinations and their probabilities.
 trio_gt = trio_genotypes(GENO)
 
+def evidence_groups(calls):
+    '''Group calls with identical evidence (DP, NF, PL). Returns a list of
+    (call, samples) pairs: one call of each group and the samples in it.'''
+    groups = {}
+    order = []
+    for call in calls:
+        if call.PL:
+            key = (call.DP, call.NF, tuple(call.PL))
+        else:
+            key = (call.DP, call.NF, None)
+        if key not in groups:
+            groups[key] = (call, [])
+            order.append(key)
+        groups[key][1].append(call.sample)
+    return([groups[key] for key in order])
+
 def update(param, calls, disp):
-    '''Update parameters by EM.'''
+    '''Update parameters by EM.
+
+    The E-step is computed once per group of samples with identical
+    evidence (see evidence_groups), weighted by the size of the group.
+    Calls without PL data use the collapsed states of dp_states.
+    '''
     n = len(calls)    # Number of samples.
     # Initialize counter variables for phi, delta, lambda, loglik.
     phi = [0, 0, 0]
@@ -75,43 +89,37 @@ def update(param, calls, disp):
     loglik = 0
     exp_phi = {}
     exp_delta = {}
-    for call in calls:
-        sample_lik = {}
-        sample_psi = {}
-        exp_phi[call.sample] = [0, 0, 0]
-        exp_delta[call.sample] = 0
-        for z in (0, 1):
-            for g in GENO:
-                m = (2.0 - g[2])    # Apparent ploidy, given g.
-                mu = param['lambda'] * call.NF * z * m / 2    # Expected coverage.
-                psi = mu / (disp - 1)    # Size parameter for nbinom.
-                D_lik = dreads(g, call.PL)    # Read data likelihood.
-                d_lik = dnbinom(call.DP, mu, psi)    # Coverage likelihood.
-                g_lik = dmultinom(g, param['phi'])    # Genotype likelihood.
-                z_lik = dbernoulli(z, param['delta'])    # Digest fail likelihood.
-                sample_lik[(z, g)] = D_lik + d_lik + g_lik + z_lik
-                sample_psi[(z, g)] = psi
+    for call, samples in evidence_groups(calls):
+        w = len(samples)    # Number of samples with this evidence.
+        call_phi = [0, 0, 0]
+        call_delta = 0
+        if call.PL:
+            states = full_states(call, param, disp)
+        else:
+            states = dp_states(call, param, disp)
         # Normalize the likelihoods by likmax to avoid underflow.
-        likmax = max(sample_lik.values())
-        liksum = sum([exp(l - likmax) for l in sample_lik.values()])
-        for z, g in sample_lik:
-            psi = sample_psi[(z, g)]
-            normlik = exp(sample_lik[(z, g)] - likmax)
+        likmax = max([state[2] for state in states])
+        liksum = sum([exp(state[2] - likmax) for state in states])
+        for z, g, lik, psi in states:
+            normlik = exp(lik - likmax)
             # Update the counter variables.
-            phi[0] += g[0] * normlik / (2 * n * liksum)
-            phi[1] += g[1] * normlik / (2 * n * liksum)
-            phi[2] += g[2] * normlik / (2 * n * liksum)
-            delta += (1 - z) * normlik  / (n * liksum)
-            lamb_numer += (lambda_numer(g, z, call.DP, call.NF, param['lambda'], psi) *
+            phi[0] += w * g[0] * normlik / (2 * n * liksum)
+            phi[1] += w * g[1] * normlik / (2 * n * liksum)
+            phi[2] += w * g[2] * normlik / (2 * n * liksum)
+            delta += w * (1 - z) * normlik  / (n * liksum)
+            lamb_numer += (w * lambda_numer(g, z, call.DP, call.NF, param['lambda'], psi) *
                            normlik / liksum)
-            lamb_denom += (lambda_denom(g, z, call.DP, call.NF, param['lambda'], psi) *
+            lamb_denom += (w * lambda_denom(g, z, call.DP, call.NF, param['lambda'], psi) *
                            normlik / liksum)
-            exp_phi[call.sample][0] += g[0] * normlik / liksum
-            exp_phi[call.sample][1] += g[1] * normlik / liksum
-            exp_phi[call.sample][2] += g[2] * normlik / liksum
-            exp_delta[call.sample] += (1 - z) * normlik / liksum
+            call_phi[0] += g[0] * normlik / liksum
+            call_phi[1] += g[1] * normlik / liksum
+            call_phi[2] += g[2] * normlik / liksum
+            call_delta += (1 - z) * normlik / liksum
+        for sample in samples:
+            exp_phi[sample] = list(call_phi)
+            exp_delta[sample] = call_delta
         try:
-            loglik += log(sum([exp(l) for l in sample_lik.values()]))
+            loglik += w * log(sum([exp(state[2]) for state in states]))
         except:
             loglik = None
     lamb = param['lambda'] - lamb_numer / lamb_denom
@@ -127,6 +135,55 @@ def update(param, calls, disp):
     return(param_update)
 
 
+cdef full_states(call, param, disp):
+    '''Return (z, g, loglik, psi) for each latent state of a call.'''
+    states = []
+    for z in (0, 1):
+        for g in GENO:
+            m = (2.0 - g[2])    # Apparent ploidy, given g.
+            mu = param['lambda'] * call.NF * z * m / 2    # Expected coverage.
+            psi = mu / (disp - 1)    # Size parameter for nbinom.
+            D_lik = dreads(g, call.PL)    # Read data likelihood.
+            d_lik = dnbinom(call.DP, mu, psi)    # Coverage likelihood.
+            g_lik = dmultinom(g, param['phi'])    # Genotype likelihood.
+            z_lik = dbernoulli(z, param['delta'])    # Digest fail likelihood.
+            states.append((z, g, D_lik + d_lik + g_lik + z_lik, psi))
+    return(states)
+
+
+cdef dp_states(call, param, disp):
+    '''Return (z, g, loglik, psi) for the collapsed latent states of a call
+    without PL data.
+
+    Without read data the genotypes only differ by their apparent ploidy,
+    so the states collapse to z = 0 and to z = 1 with 2, 1 or 0 copies of
+    the cut alleles. The genotype probabilities are summed over each class
+    and g is the expected genotype given the class, which gives the same
+    EM update as full_states.
+    '''
+    phi = param['phi']
+    total = phi[0] + phi[1] + phi[2]
+    cut = phi[0] + phi[1]
+    if cut > 0:
+        ref = phi[0] / cut
+        alt = phi[1] / cut
+    else:
+        ref = alt = 0.0
+    # No reads are expected for z = 0, whatever the genotype.
+    z_lik = dbernoulli(0, param['delta'])
+    g = tuple([2 * p / total if total > 0 else 0.0 for p in phi])
+    states = [(0, g, dnbinom(call.DP, 0.0, 0.0) + dlog(total**2) + z_lik, 0.0)]
+    z_lik = dbernoulli(1, param['delta'])
+    for g, prob in (((2 * ref, 2 * alt, 0), cut**2),
+                    ((ref, alt, 1), 2 * cut * phi[2]),
+                    ((0, 0, 2), phi[2]**2)):
+        m = (2.0 - g[2])    # Apparent ploidy, given g.
+        mu = param['lambda'] * call.NF * m / 2    # Expected coverage.
+        psi = mu / (disp - 1)    # Size parameter for nbinom.
+        states.append((1, g, dnbinom(call.DP, mu, psi) + dlog(prob) + z_lik, psi))
+    return(states)
+
+
 def ped_update(param, calls, disp, parental_gt):
     '''Update parameters by EM for nuclear family.'''
     # Get hash of F1 GT prob, keyed by GT.
@@ -210,27 +267,23 @@ cdef dreads(g, pl, loglik=True):
 
 cdef dnbinom(x, mu, psi, loglik=True):
     '''Function to calculate negative binomial probability.'''
-    psi = int(psi)    # Round to nearest integer to speed up comb().
+    psi = int(psi)    # Round to an integer, as in earlier versions.
     if psi <= 0:    # psi must be > 0.
         psi = 1
+    mu = float(mu)
+    # Computed in log space: log choose(x + psi - 1, psi - 1) from lgamma.
     if x:
-        try:
-            p = (choose[x + psi - 1][psi - 1] * 
-                 (psi/(float(mu) + psi))**psi * 
-                 (float(mu)/(float(mu) + psi))**x)
-        except:
-            p = (comb(x + psi - 1, psi - 1, exact=True) * 
-                 (psi/(float(mu) + psi))**psi * 
-                 (float(mu)/(float(mu) + psi))**x)
+        if mu > 0:
+            l = (lgamma(x + psi) - lgamma(psi) - lgamma(x + 1) +
+                 psi * log(psi / (mu + psi)) + x * log(mu / (mu + psi)))
+        else:
+            l = -float('Inf')
     else:
-        p = (psi/(float(mu) + psi))**psi
+        l = psi * log(psi / (mu + psi))
     if not loglik:
-        return(p)
+        return(exp(l))
     else:
-        if p > 0:
-            return(log(p))
-        else:
-            return(-float('Inf'))
+        return(l)
 
 
 cdef dmultinom(x, prob, loglik=True):
@@ -244,6 +297,13 @@ cdef dmultinom(x, prob, loglik=True):
         else:
             return(-float('Inf'))
 
+cdef dlog(p):
+    '''Log of a probability (-inf for 0).'''
+    if p > 0:
+        return(log(p))
+    else:
+        return(-float('Inf'))
+
 cdef dbernoulli(x, prob, loglik=True):
     '''Function to calculate bernoulli probability.'''
     p = (1 - prob)**x * prob**(1 - x)
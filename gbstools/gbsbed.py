@@ -0,0 +1,220 @@
+"""
+Convert restriction sites to the GBSBED format used by annotate_se_bam.py,
+annotate_pe_bam.py and other GBStools scripts (see make_gbsbed.py).
+
+Sites are processed as a stream: each chromosome only keeps the sites whose
+fragment lengths are not yet known, so memory use does not grow with the
+size of the genome. Input sites must be sorted by start within each
+chromosome (as in the output of restrict/digest_to_bed.py or digest.py).
+"""
+
+import os
+import heapq
+from collections import deque
+
+# Add these values from the restriction site start to get the expected ligation sites.
+# Keyed by (enyzme, strand, read_is_reverse)
+DEFAULT_OFFSETS = {('BpuEI', '+', True): [19, 20],
+                   ('BpuEI', '+', False): [21, 22],
+                   ('BpuEI', '-', True): [-17, -16],
+                   ('BpuEI', '-', False): [-14, -13],
+                   ('BsaXI', '+', True): [-14, -13, 18, 19],
+                   ('BsaXI', '+', False): [-10, -9, 21, 22],
+                   ('BsaXI', '-', True): [-12, -11, 20, 21],
+                   ('BsaXI', '-', False): [-8, -7, 23, 24],
+                   ('CspCI', '+', True): [-14, -13, 22, 23],
+                   ('CspCI', '+', False): [-11, -10, 24, 25],
+                   ('CspCI', '-', True): [-14, -13, 22, 23],
+                   ('CspCI', '-', False): [-11, -10, 24, 25],
+                   ('ApeKI', '+', True): [3],
+                   ('ApeKI', '+', False): [1],
+                   ('PstI', '+', True): [4],
+                   ('PstI', '+', False): [1],
+                   ('MspI', '+', True): [2],
+                   ('MspI', '+', False): [1],
+                   ('EcoRI', '+', True): [4],
+                   ('EcoRI', '+', False): [1],
+                   ('SbfI', '+', True): [5],
+                   ('SbfI', '+', False): [2]}
+
+HEADER = ['chrom', 'start', 'end', 'fwd_insert', 'rev_insert', 'enzyme', 'strand',
+          'id', 'freq', 'cut_allele', 'fwd_ligation_sites', 'rev_ligation_sites']
+
+# Indices of the fields in a site record (a list, see _Chromosome.add_site).
+_START, _END, _ENZYME, _STRAND, _FWD_LIG, _REV_LIG, _FWD_LEN, _REV_LEN, _PENDING = range(9)
+
+
+def parse_offsets(filename):
+    '''Parse a file of ligation site offsets (enzyme, strand, read_is_reverse, offset).'''
+    offsets = {}
+    for line in open(filename, 'r'):
+        line = line.strip()
+        if not line or line[0] == "#":
+            continue
+        enzyme, strand, read_is_rev, offset = line.split()
+        read_is_rev = read_is_rev.lower() in ('1', 'true')
+        offsets.setdefault((enzyme, strand, read_is_rev), []).append(int(offset))
+    return(offsets)
+
+
+def parse_bed(instream):
+    '''Parse a BED file of restriction sites (see digest_to_bed.py).'''
+    for line in instream:
+        line = line.strip()
+        if not line or line[0] == "#":
+            continue
+        # Unpack the fields in the digest file.
+        chrom, start, end, enzyme, score, strand = line.split()
+        yield (chrom, int(start), int(end), enzyme, strand)
+
+
+class _Chromosome():
+    """Pair up the fwd and rev ligation sites of neighbouring restriction sites
+    on one chromosome and release each site once its fragment lengths are known.
+    """
+    def __init__(self, chrom, offsets, ligsort):
+        self.chrom = chrom
+        self.offsets = offsets
+        self.ligsort = ligsort
+        # Lowest possible offset of a fragment end from its recognition site.
+        self.min_offset = min([min(i) for i in offsets.values()])
+        # Sites in input order whose fragment lengths are not all known.
+        self.pending = deque()
+        # Fragment ends waiting to be sorted (--ligation_sort).
+        self.heap = []
+        self.count = 0
+        self.last_end = None
+        self.last_site = None
+
+    def add_site(self, start, end, enzyme, strand):
+        '''Add a restriction site and return the list of finished sites.'''
+        if self.last_site is not None:
+            if start < self.last_site[0]:
+                raise ValueError("Restriction sites are not sorted by start on %s "
+                                 "(position %i)." % (self.chrom, start))
+            # Skip duplicate records of the same site.
+            if (start, end, enzyme, strand) == self.last_site:
+                return([])
+        self.last_site = (start, end, enzyme, strand)
+        # Make lists of expected mapping (ligation) sites for reads.
+        fwd_lig = [start + i for i in self.offsets[(enzyme, strand, False)]]
+        rev_lig = [start + i for i in self.offsets[(enzyme, strand, True)]]
+        site = [start, end, enzyme, strand, fwd_lig, rev_lig, '.', '.', 2]
+        self.pending.append(site)
+        # Each site contributes a rev fragment end and then a fwd fragment end.
+        ends = ((min(rev_lig), site, True), (max(fwd_lig), site, False))
+        if self.ligsort:
+            # Fragment ends below this bound cannot be preceded by later sites.
+            bound = start + self.min_offset
+            while self.heap and self.heap[0][0] <= bound:
+                frag_end, count, site_end, is_rev = heapq.heappop(self.heap)
+                self.add_end(frag_end, site_end, is_rev)
+            for frag_end, site_end, is_rev in ends:
+                heapq.heappush(self.heap, (frag_end, self.count, site_end, is_rev))
+                self.count += 1
+        else:
+            for frag_end, site_end, is_rev in ends:
+                self.add_end(frag_end, site_end, is_rev)
+        return(self.release())
+
+    def add_end(self, frag_end, site, is_rev):
+        '''Assign an expected fragment length to a fwd end followed by a rev end.'''
+        if self.last_end is not None:
+            last_frag_end, last_site = self.last_end
+            if is_rev:
+                frag_len = frag_end - last_frag_end + 1
+                last_site[_FWD_LEN] = frag_len
+                site[_REV_LEN] = frag_len
+            # The fwd end is finished once the next end is known.
+            last_site[_PENDING] -= 1
+        if is_rev:
+            site[_PENDING] -= 1
+            self.last_end = None
+        else:
+            self.last_end = (frag_end, site)
+        return(None)
+
+    def release(self):
+        '''Return the finished sites at the front of the queue.'''
+        finished = []
+        while self.pending and self.pending[0][_PENDING] == 0:
+            finished.append(self.pending.popleft())
+        return(finished)
+
+    def finish(self):
+        '''Return the remaining sites at the end of the chromosome.'''
+        while self.heap:
+            frag_end, count, site, is_rev = heapq.heappop(self.heap)
+            self.add_end(frag_end, site, is_rev)
+        if self.last_end is not None:
+            self.last_end[1][_PENDING] -= 1
+            self.last_end = None
+        return(self.release())
+
+
+def make_sites(sites, offsets=DEFAULT_OFFSETS, ligsort=False):
+    '''Generate GBSBED records from (chrom, start, end, enzyme, strand) tuples.
+
+    Records are (chrom, start, end, fwd_len, rev_len, enzyme, strand, fwd_lig,
+    rev_lig) tuples, in the same order as the input sites.
+    '''
+    chrom = None
+    for chrom_name, start, end, enzyme, strand in sites:
+        if chrom is None or chrom_name != chrom.chrom:
+            if chrom is not None:
+                for site in chrom.finish():
+                    yield _record(chrom.chrom, site)
+            chrom = _Chromosome(chrom_name, offsets, ligsort)
+        for site in chrom.add_site(start, end, enzyme, strand):
+            yield _record(chrom.chrom, site)
+    if chrom is not None:
+        for site in chrom.finish():
+            yield _record(chrom.chrom, site)
+
+
+def _record(chrom, site):
+    return((chrom, site[_START], site[_END], site[_FWD_LEN], site[_REV_LEN],
+            site[_ENZYME], site[_STRAND], site[_FWD_LIG], site[_REV_LIG]))
+
+
+def format_record(record):
+    '''Format a GBSBED record as a line of text.'''
+    (chrom, start, end, fwd_len, rev_len, enzyme, strand, fwd_lig, rev_lig) = record
+    fwd_lig = ','.join([str(i) for i in fwd_lig])
+    rev_lig = ','.join([str(i) for i in rev_lig])
+    output = [chrom, start, end, fwd_len, rev_len,
+              enzyme, strand, '.', '.', 'ref', fwd_lig, rev_lig]
+    return('\t'.join([str(i) for i in output]))
+
+
+def write(records, outstream, buffer_lines=10000):
+    '''Write GBSBED records (with header) to an open file.'''
+    outstream.write('#' + '\t'.join(HEADER) + '\n')
+    lines = []
+    for record in records:
+        lines.append(format_record(record))
+        if len(lines) == buffer_lines:
+            outstream.write('\n'.join(lines) + '\n')
+            lines = []
+    if lines:
+        outstream.write('\n'.join(lines) + '\n')
+    return(None)
+
+
+def write_file(records, filename):
+    '''Write GBSBED records to a file. If the file name ends in .gz the file is
+    compressed with bgzip and indexed with tabix.'''
+    if not filename.endswith('.gz'):
+        outstream = open(filename, 'w')
+        write(records, outstream)
+        outstream.close()
+        return(None)
+    import pysam
+    plain = filename[:-3]
+    outstream = open(plain, 'w')
+    write(records, outstream)
+    outstream.close()
+    pysam.tabix_index(plain, preset='bed', force=True)
+    if os.path.exists(plain):
+        os.remove(plain)
+    return(None)
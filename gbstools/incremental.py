@@ -0,0 +1,111 @@
+"""
+Estimates from a previous polymorphism_test.py run, for warm-starting the
+EM when a cohort is rescored with new samples (see Marker.warm_start and
+the --previous option of polymorphism_test.py).
+"""
+
+import vcf
+
+"""INFO fields of a scored VCF used as starting values."""
+ESTIMATES = ('DFreq', 'AFH1', 'AFH0', 'LambdaH1', 'LambdaH0', 'DigestH1', 'DigestH0')
+
+
+class PreviousEstimates():
+    """Estimates from a scored VCF, read in step with the input VCF.
+
+    The input VCF must visit the chromosomes in the order of the previous
+    VCF, and both must be sorted by position within chromosomes (as VCFs
+    scored from the same input are). The input may start on any chromosome
+    (e.g. with --intervals or --resume), and markers may be present in only
+    one of the VCFs.
+    """
+    def __init__(self, filename):
+        self.reader = vcf.Reader(filename=filename)
+        self.samples = self.reader.samples
+        self.records = iter(self.reader)
+        self.record = None
+        # Index of each chromosome in the order of the previous VCF.
+        self.order = self.chrom_order(filename)
+        self.index = -1
+
+    def chrom_order(self, filename):
+        '''Order the chromosomes by the ##contig lines of the previous VCF or,
+        if it has none, by a scan of its records.'''
+        contigs = getattr(self.reader, 'contigs', None)
+        if contigs:
+            chroms = contigs.keys()
+        else:
+            chroms = []
+            # Read the CHROM column without parsing the records.
+            for line in vcf.Reader(filename=filename).reader:
+                chrom = line.split('\t', 1)[0]
+                if not chroms or chroms[-1] != chrom:
+                    chroms.append(chrom)
+        order = {}
+        for chrom in chroms:
+            order.setdefault(chrom, len(order))
+        return(order)
+
+    def peek(self):
+        '''The next unused record of the previous VCF (None at the end).'''
+        if self.record is None:
+            try:
+                self.record = self.records.next()
+            except StopIteration:
+                return(None)
+            index = self.order.get(self.record.CHROM)
+            if index is None:
+                raise ValueError("Chromosome %s is not in the ##contig lines of the "
+                                 "previous VCF." % self.record.CHROM)
+            if index < self.index:
+                raise ValueError("The previous VCF is not sorted by chromosome "
+                                 "(at %s:%i)." % (self.record.CHROM, self.record.POS))
+            self.index = index
+        return(self.record)
+
+    def get(self, record):
+        '''Return the estimates for an input VCF record, or None if the marker
+        is not in the previous VCF or was not estimated.
+
+        Estimates are a dict of ('phi', 'lambda', 'delta') dicts keyed by
+        hypothesis ('H0' or 'H1').
+        '''
+        index = self.order.get(record.CHROM)
+        if index is None:
+            # No markers on this chromosome in the previous VCF.
+            return(None)
+        while True:
+            prev = self.peek()
+            if prev is None:
+                return(None)
+            if self.index < index:
+                # The input is past this chromosome (or started after it).
+                self.record = None
+            elif self.index > index:
+                # The previous VCF is on a chromosome not reached yet.
+                return(None)
+            else:
+                if prev.POS > record.POS:
+                    return(None)
+                self.record = None
+                if (prev.POS == record.POS and prev.REF == record.REF and
+                    [str(a) for a in prev.ALT] == [str(a) for a in record.ALT]):
+                    return(self.estimates(prev))
+
+    def estimates(self, record):
+        '''Parse the estimates in the INFO field of a scored record.'''
+        values = {}
+        for key in ESTIMATES:
+            val = record.INFO.get(key)
+            if isinstance(val, list):
+                val = val[0]
+            if val is None:
+                return(None)
+            values[key] = float(val)
+        estimates = {'H1':{'phi':[1 - values['AFH1'] - values['DFreq'], values['AFH1'], values['DFreq']],
+                           'lambda':values['LambdaH1'],
+                           'delta':values['DigestH1']},
+                     'H0':{'phi':[1 - values['AFH0'], values['AFH0'], 0.0],
+                           'lambda':values['LambdaH0'],
+                           'delta':values['DigestH0']}}
+        return(estimates)
@@ -0,0 +1,142 @@
+"""
+Timing and counting instrumentation for GBStools runs.
+
+A ``Stats`` object accumulates wall and CPU time per stage (e.g. VCF
+parsing, BAM pileups, EM) and event counters (e.g. markers, EM
+iterations). ``Reader``, ``Marker`` and ``Writer`` share one through their
+``stats`` attribute, and may update it from several threads (see
+pipeline.run). CPU time is counted per thread where the OS allows it
+(Linux); elsewhere it is the CPU time of the whole process, which is left
+out of the stats of threaded runs. Stats are disabled by default: ``timer`` then returns a
+shared no-op context manager and ``count`` returns at once, so the cost of
+leaving the calls in place is negligible.
+"""
+
+import sys
+import json
+import time
+import resource
+import threading
+from collections import defaultdict
+
+
+# getrusage of the calling thread only (Python 2 has no
+# resource.RUSAGE_THREAD, but Linux accepts its value).
+if sys.platform.startswith('linux'):
+    RUSAGE_THREAD = getattr(resource, 'RUSAGE_THREAD', 1)
+else:
+    RUSAGE_THREAD = None
+
+
+def cpu_time():
+    '''User + system CPU time of the calling thread (of the whole process if
+    RUSAGE_THREAD is None).'''
+    if RUSAGE_THREAD is None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+    else:
+        usage = resource.getrusage(RUSAGE_THREAD)
+    return(usage.ru_utime + usage.ru_stime)
+
+
+class _Timer():
+    """Context manager adding the time spent in a block to a stage."""
+    def __init__(self, stats, stage):
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.cpu = cpu_time()
+        return(self)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.add(self.stage, time.time() - self.wall, cpu_time() - self.cpu)
+        return(False)
+
+
+class _NullTimer():
+    """Context manager that does nothing (for disabled stats)."""
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return(False)
+
+_NULL_TIMER = _NullTimer()
+
+
+class Stats():
+    """Per-stage wall/CPU timers and counters."""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        # Set if stages run in several threads (see pipeline.run).
+        self.threaded = False
+        self.lock = threading.Lock()
+        self.wall = defaultdict(float)
+        self.cpu = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counts = defaultdict(int)
+        self.start = time.time()
+        self.last_progress = self.start
+
+    def timer(self, stage):
+        '''Context manager timing a block of code as ``stage``.'''
+        if not self.enabled:
+            return(_NULL_TIMER)
+        return(_Timer(self, stage))
+
+    def add(self, stage, wall, cpu=0.0, calls=1):
+        '''Add wall and CPU time and calls to a stage.'''
+        with self.lock:
+            self.wall[stage] += wall
+            self.cpu[stage] += cpu
+            self.calls[stage] += calls
+        return(None)
+
+    def count(self, name, n=1):
+        '''Add n to a counter.'''
+        if self.enabled:
+            with self.lock:
+                self.counts[name] += n
+        return(None)
+
+    def as_dict(self):
+        '''Stats as a dict (elapsed time, stages and counters). The CPU times
+        are left out if they are not per thread in a threaded run.'''
+        cpu = not (self.threaded and RUSAGE_THREAD is None)
+        stages = {}
+        for stage in self.calls:
+            stages[stage] = {'wall':self.wall[stage], 'calls':self.calls[stage]}
+            if cpu:
+                stages[stage]['cpu'] = self.cpu[stage]
+        return({'elapsed':time.time() - self.start, 'stages':stages,
+                'counts':dict(self.counts)})
+
+    def merge(self, data):
+        '''Add the stages and counters of another Stats, as returned by its
+        as_dict (e.g. from a worker process).'''
+        for stage, values in data['stages'].items():
+            self.add(stage, values['wall'], values.get('cpu', 0.0), values['calls'])
+        with self.lock:
+            for name, n in data['counts'].items():
+                self.counts[name] += n
+        return(None)
+
+    def dump(self, outstream):
+        '''Write the stats as JSON.'''
+        json.dump(self.as_dict(), outstream, indent=1, sort_keys=True)
+        outstream.write('\n')
+        return(None)
+
+    def progress(self, outstream, interval=10.0):
+        '''Write a progress line (markers, markers/sec) at most every ``interval`` seconds.'''
+        now = time.time()
+        if now - self.last_progress < interval:
+            return(None)
+        self.last_progress = now
+        elapsed = now - self.start
+        markers = self.counts.get('markers', 0)
+        outstream.write("%i markers in %.1f s (%.1f markers/sec)\n" %
+                        (markers, elapsed, markers / elapsed))
+        outstream.flush()
+        return(None)
@@ -0,0 +1,374 @@
+"""
+Vectorized log-likelihood of the GBStools model (see em.pyx and
+docs/gbstools_notes.pdf).
+
+``em.update`` evaluates the likelihood of each sample under the 12 (z, g)
+latent states for one set of parameters at a time. Here the terms that do
+not depend on the parameters (read depth, normalization factor and the read
+data likelihood of each genotype) are computed once per marker, and the
+log-likelihood is evaluated for whole arrays of parameters by broadcasting
+the samples x states array across them.
+
+Parameters outside their bounds (phi or delta outside [0, 1], negative
+lambda) have a log-likelihood of -inf.
+"""
+
+import numpy
+import em
+
+_gammaln = None
+
+
+def gammaln(x):
+    '''scipy.special.gammaln (SciPy is imported on first use).'''
+    global _gammaln
+    if _gammaln is None:
+        from scipy.special import gammaln as _gammaln
+    return(_gammaln(x))
+
+GENO = numpy.array(em.GENO)
+# Apparent ploidy of each genotype (the '-' allele is not sequenced).
+PLOIDY = 2.0 - GENO[:, 2]
+# Log of the multinomial coefficient of each genotype (2 for heterozygotes).
+LOG_COEF = numpy.log(numpy.where((GENO == 1).any(axis=1), 2.0, 1.0))
+# Index of the PL value for each genotype (-1 when no reads are possible).
+PL_INDEX = numpy.where(GENO[:, 2] == 0, GENO[:, 1], numpy.where(GENO[:, 2] == 1, 2 * GENO[:, 1], -1))
+
+# Margin of the [0, 1] bounds of the quasi-Newton parameters (see quasi_newton).
+QN_MARGIN = 1e-8
+
+
+class SampleTerms():
+    """Parameter-independent likelihood terms for the calls at one marker."""
+    def __init__(self, calls):
+        n = len(calls)
+        self.samples = [call.sample for call in calls]
+        self.dp = numpy.array([call.DP for call in calls], dtype=float)
+        self.nf = numpy.array([call.NF for call in calls], dtype=float)
+        # Log-likelihood of the read data given each genotype (samples x GENO).
+        self.dreads = numpy.zeros((n, len(GENO)))
+        for i, call in enumerate(calls):
+            if call.PL:
+                pl = numpy.array(call.PL, dtype=float)
+                self.dreads[i] = numpy.where(PL_INDEX >= 0, -pl[PL_INDEX] / 10 * numpy.log(10),
+                                             -numpy.inf)
+        self.lgamma_dp = gammaln(self.dp + 1)
+        # Coverage log-likelihood when no reads are expected (z = 0 or m = 0).
+        self.dnbinom_zero = numpy.where(self.dp > 0, -numpy.inf, 0.0)
+
+
+def dnbinom(terms, mu, disp):
+    '''Negative binomial log-likelihood of the depths (as em.dnbinom).
+
+    ``mu`` has the samples x genotypes shape as its last two axes. The size
+    parameter is rounded down to an integer of at least 1, as in em.pyx.
+    '''
+    dp = terms.dp[:, numpy.newaxis]
+    psi = numpy.maximum(numpy.floor(mu / (disp - 1)), 1)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        lik = (gammaln(dp + psi) - gammaln(psi) - terms.lgamma_dp[:, numpy.newaxis] +
+               psi * numpy.log(psi / (mu + psi)))
+        lik = lik + numpy.where(dp > 0, dp * numpy.log(mu / (mu + psi)), 0.0)
+    return(numpy.where(mu > 0, lik, terms.dnbinom_zero[:, numpy.newaxis]))
+
+
+def state_loglik(terms, phi, lamb, delta, disp):
+    '''Log-likelihood of each sample's data and latent state.
+
+    ``phi`` (with a last axis of length 3), ``lamb`` and ``delta`` are
+    broadcast against each other. Returns an array with the broadcast shape
+    of the parameters followed by (samples, z, genotype) axes.
+    '''
+    phi = numpy.asarray(phi, dtype=float)
+    lamb = numpy.asarray(lamb, dtype=float)
+    delta = numpy.asarray(delta, dtype=float)
+    shape = numpy.broadcast(phi[..., 0], lamb, delta).shape
+    # Genotype log-likelihood for each parameter set (... x GENO).
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        logphi = numpy.log(phi)[..., numpy.newaxis, :]
+        g_lik = LOG_COEF + numpy.where(GENO > 0, GENO * logphi, 0.0).sum(axis=-1)
+        z_lik = numpy.stack([numpy.log(delta), numpy.log(1 - delta)], axis=-1)
+    # Expected coverage for z = 1 (... x samples x GENO).
+    mu = (lamb[..., numpy.newaxis, numpy.newaxis] * terms.nf[:, numpy.newaxis] * PLOIDY / 2)
+    d_lik = numpy.empty(shape + (len(terms.dp), 2, len(GENO)))
+    d_lik[..., 0, :] = terms.dnbinom_zero[:, numpy.newaxis]
+    d_lik[..., 1, :] = dnbinom(terms, mu, disp)
+    lik = (d_lik + terms.dreads[:, numpy.newaxis, :] +
+           g_lik[..., numpy.newaxis, numpy.newaxis, :] +
+           z_lik[..., numpy.newaxis, :, numpy.newaxis])
+    # Parameters out of bounds.
+    invalid = ((phi < 0) | (phi > 1)).any(axis=-1) | (delta < 0) | (delta > 1) | (lamb < 0)
+    invalid = numpy.broadcast_to(invalid, shape)
+    lik[invalid] = -numpy.inf
+    return(lik)
+
+
+def logsumexp(lik, axis):
+    '''log(sum(exp(lik))) along an axis (or tuple of axes), allowing -inf.'''
+    likmax = numpy.max(lik, axis=axis, keepdims=True)
+    likmax[~numpy.isfinite(likmax)] = 0
+    with numpy.errstate(divide='ignore'):
+        return(numpy.log(numpy.exp(lik - likmax).sum(axis=axis)) +
+               numpy.squeeze(likmax, axis=axis))
+
+
+def loglik(terms, phi, lamb, delta, disp):
+    '''Log-likelihood of the data for arrays of parameters (see state_loglik).
+
+    Returns an array with the broadcast shape of the parameters, e.g. a
+    lambda x phi grid for lamb of shape (L, 1) and phi of shape (1, P, 3).
+    '''
+    lik = state_loglik(terms, phi, lamb, delta, disp)
+    return(logsumexp(lik, axis=(-2, -1)).sum(axis=-1))
+
+
+def profile(func, fixed, start, lo, hi, step, iterations=3):
+    '''Maximize func over a nuisance parameter for an array of fixed values.
+
+    ``func`` takes (T, 1) fixed values and (T, K) nuisance values and returns
+    (T, K) log-likelihoods. Each iteration fits a parabola through x - step,
+    x and x + step (within [lo, hi]) and moves x to its vertex. Returns the
+    best log-likelihood found for each fixed value and its nuisance value.
+    '''
+    fixed = numpy.asarray(fixed, dtype=float)[:, numpy.newaxis]
+    x = numpy.clip(numpy.asarray(start, dtype=float), lo, hi)
+    step = numpy.zeros(x.shape) + step
+    best = numpy.empty(x.shape)
+    best.fill(-numpy.inf)
+    best_x = x.copy()
+    rows = numpy.arange(len(x))
+    for i in range(iterations + 1):
+        if i < iterations:
+            points = numpy.clip(x[:, numpy.newaxis] + step[:, numpy.newaxis] * [-1, 0, 1], lo, hi)
+        else:
+            points = x[:, numpy.newaxis]
+        lik = func(fixed, points)
+        # Keep the best point so far.
+        k = numpy.argmax(lik, axis=1)
+        better = lik[rows, k] > best
+        best[better] = lik[rows, k][better]
+        best_x[better] = points[rows, k][better]
+        if i == iterations:
+            break
+        # Move to the vertex of the parabola if it is concave, else to the best point.
+        (x0, x1, x2), (y0, y1, y2) = points.T, lik.T
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            s01 = (y1 - y0) / (x1 - x0)
+            s12 = (y2 - y1) / (x2 - x1)
+            curv = (s12 - s01) / (x2 - x0)
+            vertex = (x0 + x1) / 2 - s01 / (2 * curv)
+            ok = numpy.isfinite(vertex) & (curv < 0)
+        x_new = numpy.where(ok, numpy.clip(vertex, lo, hi), best_x)
+        step = numpy.maximum(numpy.abs(x_new - x) / 2, step / 4)
+        x = x_new
+    return(best, best_x)
+
+
+def find_bound(func, estimate, nuisance, target, candidates, lo, hi, step, rounds=3, points=8):
+    '''Find where the profile log-likelihood falls to ``target``.
+
+    ``candidates`` are values moving away from the estimate (e.g. geometric
+    steps towards a parameter bound); they are all profiled at once to
+    bracket the bound, and the bracket is then narrowed by profiling
+    ``points`` evenly spaced values per round. The bound is interpolated
+    linearly within the final bracket. Returns None if the profile does not
+    reach ``target`` at the last candidate.
+    '''
+    inner = numpy.zeros(len(candidates)) + nuisance
+    lik, inner = profile(func, candidates, inner, lo, hi, step)
+    below = numpy.flatnonzero(lik < target)
+    if not len(below):
+        return(None)
+    k = below[0]
+    if k == 0:
+        a, lik_a, nuisance_a = estimate, func(numpy.array([[estimate]]), numpy.array([[nuisance]]))[0, 0], nuisance
+    else:
+        a, lik_a, nuisance_a = candidates[k - 1], lik[k - 1], inner[k - 1]
+    b, lik_b = candidates[k], lik[k]
+    for i in range(rounds):
+        values = a + (b - a) * numpy.arange(1, points + 1) / (points + 1.0)
+        lik, inner = profile(func, values, numpy.zeros(points) + nuisance_a, lo, hi, step)
+        below = numpy.flatnonzero(lik < target)
+        if len(below):
+            k = below[0]
+            b, lik_b = values[k], lik[k]
+        else:
+            k = points
+        if k > 0:
+            a, lik_a, nuisance_a = values[k - 1], lik[k - 1], inner[k - 1]
+    if not numpy.isfinite(lik_b):
+        return(b)
+    return(a + (b - a) * (lik_a - target) / (lik_a - lik_b))
+
+
+def profile_intervals(terms, param, disp, level=0.95):
+    '''Profile-likelihood confidence intervals for phi[2] (DFreq) and lambda.
+
+    Starts from the estimates in ``param`` (e.g. converged H1 parameters).
+    In the profile of phi[2], lambda is maximized at each value and vice
+    versa; delta and the REF:ALT ratio of the other alleles are held at
+    their estimates. Returns ((dfreq_lower, dfreq_upper), (lambda_lower,
+    lambda_upper)); a bound is None if it is not reached.
+    '''
+    from scipy.stats import chi2
+    phi_hat = numpy.array(param['phi'], dtype=float)
+    lamb_hat = float(param['lambda'])
+    delta = param['delta']
+    dfreq_hat = phi_hat[2]
+    if phi_hat[:2].sum() > 0:
+        ratio = phi_hat[:2] / phi_hat[:2].sum()
+    else:
+        ratio = numpy.array([1.0, 0.0])
+
+    def make_phi(dfreq):
+        dfreq = numpy.asarray(dfreq)[..., numpy.newaxis]
+        return(numpy.concatenate(((1 - dfreq) * ratio, dfreq), axis=-1))
+
+    def dfreq_lik(dfreq, lamb):
+        dfreq = dfreq + numpy.zeros(lamb.shape)
+        return(loglik(terms, make_phi(dfreq), lamb, delta, disp))
+
+    def lambda_lik(lamb, dfreq):
+        return(loglik(terms, make_phi(dfreq), lamb + numpy.zeros(dfreq.shape), delta, disp))
+
+    maxlik = loglik(terms, phi_hat, lamb_hat, delta, disp)
+    if not numpy.isfinite(maxlik):
+        return((None, None), (None, None))
+    target = maxlik - chi2.ppf(level, 1) / 2
+    # Geometric steps towards the parameter bounds.
+    fractions = 2.0 ** -numpy.arange(8, 0, -1)
+    steps = 2.0 ** (numpy.arange(1, 9) / 2.0)
+    lamb_step = max(0.05 * lamb_hat, 0.01)
+    if dfreq_hat > 0:
+        candidates = numpy.append(dfreq_hat * (1 - fractions), 0.0)
+        dfreq_lower = find_bound(dfreq_lik, dfreq_hat, lamb_hat, target, candidates,
+                                 0, numpy.inf, lamb_step)
+        if dfreq_lower is None:
+            dfreq_lower = 0.0
+    else:
+        dfreq_lower = 0.0
+    candidates = numpy.append(dfreq_hat + (1 - dfreq_hat) * fractions, 1 - 1e-6)
+    dfreq_upper = find_bound(dfreq_lik, dfreq_hat, lamb_hat, target, candidates,
+                             0, numpy.inf, lamb_step)
+    if dfreq_upper is None:
+        dfreq_upper = 1.0
+    candidates = numpy.append(lamb_hat / steps, 0.0)
+    lambda_lower = find_bound(lambda_lik, lamb_hat, dfreq_hat, target, candidates,
+                              0, 1, 0.01)
+    if lambda_lower is None:
+        lambda_lower = 0.0
+    candidates = lamb_hat * steps
+    lambda_upper = find_bound(lambda_lik, lamb_hat, dfreq_hat, target, candidates,
+                              0, 1, 0.01)
+    return((dfreq_lower, dfreq_upper), (lambda_lower, lambda_upper))
+
+
+def dropout_score(terms, param, disp):
+    '''Score statistic for phi[2] at the boundary phi[2] = 0 (H0 estimates).
+
+    phi[2] is moved away from 0 along phi(t) = ((1 - t) phi[0], (1 - t)
+    phi[1], t), so the score of a sample is the expected dropout
+    heterozygote count under its H0 state likelihoods, divided by the
+    allele frequency of the other allele, less 2 (see GBStools notes). The
+    per-sample scores are standardized by their sum of squares, and the
+    statistic is 0 when the score is negative (phi[2] cannot be below 0).
+    Lambda and delta are held at their H0 estimates. Returns (score,
+    statistic).
+    '''
+    phi = numpy.array(param['phi'], dtype=float)
+    # State likelihoods without the genotype frequencies (but with the
+    # multinomial coefficients).
+    lik = state_loglik(terms, numpy.ones(3), param['lambda'], param['delta'], disp)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        logphi = numpy.log(phi)
+        g_lik = numpy.where(GENO[:, :2] > 0, GENO[:, :2] * logphi[:2], 0.0).sum(axis=-1)
+    # H0 likelihood of each sample (genotypes without the '-' allele).
+    null = numpy.where(GENO[:, 2] == 0, g_lik, -numpy.inf)
+    null_lik = logsumexp(lik + null, axis=(-2, -1))
+    # Derivative of the single dropout allele genotypes' likelihood at t = 0.
+    dropout = numpy.where(GENO[:, 2] == 1, g_lik, -numpy.inf)
+    dropout_lik = logsumexp(lik + dropout, axis=(-2, -1))
+    ok = numpy.isfinite(null_lik)
+    scores = numpy.exp(dropout_lik[ok] - null_lik[ok]) - 2
+    score = scores.sum()
+    info = (scores ** 2).sum()
+    if score <= 0 or info <= 0:
+        return(score, 0.0)
+    return(score, score ** 2 / info)
+
+
+def gradient(terms, phi, lamb, delta, disp):
+    '''Log-likelihood and its gradient for one set of parameters.
+
+    The gradient is found from the posterior probabilities of the latent
+    states (the E-step). As in the EM lambda update, the rounded NB size
+    parameter is held fixed in the derivative for lambda. Returns (loglik,
+    d/dphi (3), d/dlambda, d/ddelta).
+    '''
+    phi = numpy.asarray(phi, dtype=float)
+    lik = state_loglik(terms, phi, lamb, delta, disp)
+    sample_lik = logsumexp(lik, axis=(-2, -1))
+    ok = numpy.isfinite(sample_lik)
+    post = numpy.zeros(lik.shape)
+    post[ok] = numpy.exp(lik[ok] - sample_lik[ok, numpy.newaxis, numpy.newaxis])
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        d_phi = numpy.where(phi > 0, numpy.dot(post.sum(axis=(0, 1)), GENO) / phi, 0.0)
+    post_z = post.sum(axis=(0, 2))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        d_delta = post_z[0] / delta - post_z[1] / (1 - delta)
+    # Derivative of the NB log-likelihood (z = 1) by lambda.
+    dp = terms.dp[:, numpy.newaxis]
+    mu = lamb * terms.nf[:, numpy.newaxis] * PLOIDY / 2
+    psi = numpy.maximum(numpy.floor(mu / (disp - 1)), 1)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        d_mu = numpy.where(mu > 0, dp / mu - (dp + psi) / (mu + psi), 0.0)
+    d_lamb = (post[:, 1, :] * d_mu * terms.nf[:, numpy.newaxis] * PLOIDY / 2).sum()
+    return(sample_lik.sum(), d_phi, d_lamb, d_delta)
+
+
+def quasi_newton(terms, param, disp, dropout=True, alt=True, max_eval=200):
+    '''Maximize the log-likelihood with a bounded quasi-Newton method (L-BFGS-B).
+
+    phi is parameterized by stick-breaking, phi = ((1 - a)(1 - b), (1 - a) b,
+    a), so that a (the dropout allele frequency), b (the ALT allele share of
+    the cut alleles) and delta are bounded by [0, 1] (less a margin of
+    QN_MARGIN, where the gradient is finite). a is held at 0 if dropout is
+    False (H0), and b at 0 if alt is False (no PL data). Starts from the
+    estimates in param. Returns (phi, lambda, delta, evaluations, success).
+    '''
+    from scipy.optimize import minimize
+    phi = numpy.array(param['phi'], dtype=float)
+    lamb0 = float(param['lambda'])
+    a = phi[2] / phi.sum()
+    b = phi[1] / phi[:2].sum() if phi[:2].sum() > 0 else 0.0
+    bounds = [(QN_MARGIN, 1 - QN_MARGIN) if dropout else (0.0, 0.0),
+              (QN_MARGIN, 1 - QN_MARGIN) if alt else (0.0, 0.0),
+              (1e-6, None),
+              (QN_MARGIN, 1 - QN_MARGIN)]
+    # lambda is scaled by its starting value.
+    x0 = numpy.array([a, b, 1.0, param['delta']])
+    x0 = numpy.clip(x0, [lo for lo, hi in bounds], [hi if hi is not None else numpy.inf
+                                                    for lo, hi in bounds])
+
+    def unpack(x):
+        a, b, lamb, delta = x
+        return(numpy.array([(1 - a) * (1 - b), (1 - a) * b, a]), lamb * lamb0, delta)
+
+    def func(x):
+        phi, lamb, delta = unpack(x)
+        loglik, d_phi, d_lamb, d_delta = gradient(terms, phi, lamb, delta, disp)
+        if not numpy.isfinite(loglik):
+            return(numpy.inf, numpy.zeros(4))
+        a, b = x[:2]
+        grad = numpy.array([d_phi[2] - (1 - b) * d_phi[0] - b * d_phi[1],
+                            (1 - a) * (d_phi[1] - d_phi[0]),
+                            d_lamb * lamb0,
+                            d_delta])
+        return(-loglik, -grad)
+
+    # Tolerances comparable to the EM convergence tolerances.
+    result = minimize(func, x0, jac=True, method='L-BFGS-B', bounds=bounds,
+                      options={'maxfun':max_eval, 'ftol':1e-8, 'gtol':1e-3})
+    phi, lamb, delta = unpack(result.x)
+    success = bool(result.success) and numpy.isfinite(result.fun)
+    return(phi.tolist(), float(lamb), float(delta), int(result.nfev), success)
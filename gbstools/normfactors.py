@@ -0,0 +1,148 @@
+"""
+Depth-of-coverage normalization factors (see normfactors.py).
+
+Normalization factors are stored as a samples x insert size matrix. The
+matrix can be written as the tab-delimited text file made by normfactors.py,
+or in a binary format (a NumPy .npz archive) that ``Reader`` can load
+without parsing text.
+"""
+
+import numpy
+
+# First bytes of a zip archive (NumPy .npz files are zip archives).
+BINARY_MAGIC = b'PK\x03\x04'
+
+class NormFactors():
+    """Samples x insert size matrix of normalization factors."""
+    def __init__(self, samples, inserts, nf):
+        self.samples = list(samples)
+        # Insert sizes (None is used for the RAD-seq ``NA`` row).
+        self.inserts = list(inserts)
+        self.nf = numpy.asarray(nf, dtype=float)
+        self.sample_index = dict((s, i) for i, s in enumerate(self.samples))
+        self.insert_index = dict((ins, j) for j, ins in enumerate(self.inserts))
+
+    def __getitem__(self, key):
+        '''Look up the normalization factor for a (sample, insert) pair.'''
+        sample, insert = key
+        return(float(self.nf[self.sample_index[sample], self.insert_index[insert]]))
+
+    def __contains__(self, key):
+        sample, insert = key
+        return(sample in self.sample_index and insert in self.insert_index)
+
+    def column(self, sample):
+        '''Return a hash of normalization factors for one sample, keyed by insert.'''
+        row = self.nf[self.sample_index[sample]]
+        return(dict(zip(self.inserts, row.tolist())))
+
+
+def normalize(counts, window=0):
+    '''Normalize a samples x insert size matrix of read counts.
+
+    Each insert size is scaled by its mean count across samples, and the
+    result is smoothed by a sliding-window mean over insert sizes
+    [insert - window, insert + window] (truncated at the matrix edges).
+    '''
+    counts = numpy.asarray(counts, dtype=float)
+    mean = counts.mean(axis=0)
+    nf = numpy.zeros(counts.shape)
+    covered = mean > 0
+    nf[:, covered] = counts[:, covered] / mean[covered]
+    if window > 0:
+        # Window sums from cumulative sums along the insert axis.
+        n = nf.shape[1]
+        csum = numpy.zeros((nf.shape[0], n + 1))
+        numpy.cumsum(nf, axis=1, out=csum[:, 1:])
+        index = numpy.arange(n)
+        lo = numpy.maximum(index - window, 0)
+        hi = numpy.minimum(index + window + 1, n)
+        nf = (csum[:, hi] - csum[:, lo]) / (hi - lo)
+        # Cancellation in the cumulative sums can leave tiny negative values.
+        numpy.maximum(nf, 0, out=nf)
+    return(nf)
+
+
+def read_summary(summary, max_insert):
+    '''Parse insert size counts from a mapping summary (mapping_summary.py).'''
+    counts = numpy.zeros(max_insert, dtype=numpy.int64)
+    for line in open(summary, 'r'):
+        # Ignore headers.
+        if not line.strip() or line[0] == "#":
+            continue
+        fields = line.split()
+        if fields[0] == "insert_size":
+            continue
+        insert = int(fields[0])
+        if 0 <= insert < max_insert:
+            counts[insert] = int(fields[1])
+    return(counts)
+
+
+def read(filename):
+    '''Read a text or binary normalization factors file.'''
+    if open(filename, 'rb').read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+        return(read_binary(filename))
+    return(read_text(filename))
+
+
+def read_text(filename):
+    '''Read a tab-delimited normalization factors file.'''
+    nf_file = open(filename, 'r')
+    # The first header field is the insert size; the rest are sample names.
+    header = nf_file.readline()
+    samples = header.strip().split()[1:]
+    inserts = []
+    rows = []
+    for line in nf_file:
+        fields = line.split()
+        if not fields:
+            continue
+        # In RAD-seq the insert size is random, so ''NA'' is used.
+        if fields[0] == "NA":
+            inserts.append(None)
+        else:
+            inserts.append(int(fields[0]))
+        rows.append([float(i) for i in fields[1:]])
+    nf = numpy.array(rows, dtype=float).reshape(len(rows), len(samples))
+    return(NormFactors(samples, inserts, nf.T))
+
+
+def read_binary(filename):
+    '''Read a binary (.npz) normalization factors file.'''
+    data = numpy.load(filename)
+    samples = [str(s) for s in data['samples']]
+    # The RAD-seq ``NA`` insert size is stored as -1.
+    inserts = [None if i < 0 else int(i) for i in data['inserts']]
+    return(NormFactors(samples, inserts, data['nf']))
+
+
+def write_text(outstream, normfactors):
+    '''Write normalization factors as a tab-delimited table (inserts x samples).'''
+    outstream.write("#insert\t" + "\t".join(normfactors.samples) + "\n")
+    lines = []
+    for insert, row in zip(normfactors.inserts, normfactors.nf.T.tolist()):
+        if insert is None:
+            insert = "NA"
+        lines.append("%s\t" % insert + "\t".join(['%.3f' % nf for nf in row]))
+        if len(lines) == 1000:
+            outstream.write("\n".join(lines) + "\n")
+            lines = []
+    if lines:
+        outstream.write("\n".join(lines) + "\n")
+    return(None)
+
+
+def write_binary(filename, normfactors):
+    '''Write normalization factors in binary (.npz) format.
+
+    Values are rounded to the precision of the text format, so that either
+    file gives the same results.
+    '''
+    inserts = [-1 if i is None else i for i in normfactors.inserts]
+    outfile = open(filename, 'wb')
+    numpy.savez(outfile, samples=numpy.array(normfactors.samples),
+                inserts=numpy.array(inserts, dtype=numpy.int64),
+                nf=numpy.round(normfactors.nf, 3))
+    outfile.close()
+    return(None)
@@ -1,11 +1,16 @@
 import em
+import normfactors
+import likelihood
+import instrument
+import dispersion
 import vcf
-import pysam
 from numpy import median
 import math
 from vcf.model import make_calldata_tuple
 from collections import namedtuple
+from cStringIO import StringIO
 import warnings
+import hashlib
 
 try:
     from collections import Counter
@@ -41,7 +46,15 @@ INFO = (_Info('DLR', None, 'Float', 'Dropout likelihood ratio (GBStools)'),
         _Info('SelfRS', None, 'String', 'Recognition sites for reads mapped to the SNP'),
         _Info('MateRS', None, 'String', 'Recognition sites for mate pairs of reads mapped to the SNP'),
         _Info('InsMed', None, 'Float', 'Insert size median'),
-        _Info('InsMAD', None, 'Float', 'Insert size MAD'))
+        _Info('InsMAD', None, 'Float', 'Insert size MAD'),
+        _Info('DFreqCI', 2, 'Float', 'Profile likelihood confidence interval for DFreq (GBStools)'),
+        _Info('LambdaCI', 2, 'Float', 'Profile likelihood confidence interval for LambdaH1 (GBStools)'),
+        _Info('EMSkipped', 0, 'Flag', 'EM skipped; estimates from a previous run (GBStools)'),
+        _Info('DScore', None, 'Float', 'Score statistic for DFreq > 0 at the null hypothesis estimates (GBStools)'),
+        _Info('ScoreSkipped', 0, 'Flag', 'Alt hypothesis EM skipped; DScore below the screening threshold (GBStools)'),
+        _Info('EMEarlyStop', 0, 'Flag', 'Alt hypothesis EM stopped once DLR was above the filter threshold (GBStools)'),
+        _Info('EvaluationsH1', None, 'Integer', 'Likelihood evaluations of the alt hypothesis quasi-Newton fit (GBStools)'),
+        _Info('EvaluationsH0', None, 'Integer', 'Likelihood evaluations of the null hypothesis quasi-Newton fit (GBStools)'))
 
 """INFO fields to be added to vcf header when --ped option is used."""
 PEDINFO = (_Info('DLR', None, 'Float', 'Dropout likelihood ratio (GBStools)'),
@@ -73,10 +86,27 @@ GT_FORMATTED = {(2,0,0):'0/0',
                 (0,1,1):'1/.',
                 (0,0,2):'./.'}
 
+"""EM convergence tolerances (see Marker.check_convergence)."""
+PHI_TOL = 0.001
+LAMB_TOL = 0.1
+DELTA_TOL = 0.005
+
+"""Version of the fitting code, part of the fit cache key (see Marker.cache_key).
+Change it when a change to the EM gives different estimates."""
+ENGINE_VERSION = 'em-2'
+
+"""Fitting engines and their versions (see Marker.fit)."""
+ENGINES = {'em':ENGINE_VERSION, 'qn':'qn-1'}
+
+"""Smallest starting value of the allele frequencies and digest failure rate
+when the EM is warm-started (0 is a fixed point of the EM)."""
+WARM_START_MIN = 0.001
+
 class Reader():
     """Reader for a VCF file, an iterator returning ``_Marker`` objects."""
     def __init__(self, filename=None, bamlist=None, norm=None, disp_intercept=2.5, 
-                 disp_slope=0.0, ped=None, samples=None, dpmode=False):
+                 disp_slope=0.0, ped=None, samples=None, dpmode=False, stats=None,
+                 engine='em', disp_file=None):
                  
         """Create a new Reader for a VCF file containing GBS data.
 
@@ -87,11 +117,27 @@ class Reader():
            numbers of reads across samples, use norm=<mynormfile>,
            generated by normfactors.py
 
-           To set the coverage dispersion index use the disp option
+           To set the coverage dispersion index use the disp_slope and
+           disp_intercept options, or disp_file=<mydispersionfile>,
+           generated by estimate_dispersion.py (which can give a slope and
+           intercept by median insert size)
+
+           To time the stages of a run and count markers, EM iterations
+           etc., use stats=instrument.Stats(enabled=True) (see also
+           Reader.stats, which is shared with the markers).
+
+           To fit the markers by quasi-Newton maximization instead of EM,
+           use engine='qn' (see Marker.maximize).
         """
+        if stats is None:
+            stats = instrument.Stats()
+        self.stats = stats
+        self.engine = engine
         # Make a generator for vcf records.
         self._reader = vcf.Reader(filename=filename)
         self.reader = (record for record in self._reader)
+        # True when records come from Reader.fetch.
+        self.fetched = False
         self.filename = filename
         # Make a list of samples to go into the analysis.
         try:
@@ -110,6 +156,11 @@ class Reader():
             self.normfactors = None
 
         self.disp = {'slope':disp_slope, 'intercept':disp_intercept}
+        # Estimated dispersion, if given, replaces disp_slope/disp_intercept.
+        self.dispersion = None
+        if disp_file is not None:
+            self.dispersion = dispersion.read(disp_file)
+            self.disp = self.dispersion.default
         # Should DP-only mode be used?
         self.dpmode = dpmode
         # Get family info from PED file if it exists.
@@ -144,34 +195,17 @@ class Reader():
         return(alignments)
 
     def parse_norm(self, norm):
-        '''Parse the normalization factors file and store data in a hash.'''
-        norm = open(norm, 'r')
-        # The first two header fields define the bin limits; the rest are sample names.
-        header = norm.readline()
-        header = header.strip()
-        samples = header.split()[1:]
-        normfactors = {}    # Hash of keyed by (sample, insert).
-        for line in norm:
-            line = line.strip()
-            fields = line.split()
-            insert = fields[0]
-            # In RAD-seq the insert size is random, so ''NA'' is used.
-            if insert == "NA":
-                insert = None
-            # In GBS the expected insert size is known for any given site.
-            else:
-                insert = int(insert)
-            nf_row = [float(i) for i in fields[1:]]
-            for (sample, nf) in zip(samples, nf_row):
-                normfactors[(sample, insert)] = nf
-        if set(samples) != set(self.samples):
+        '''Parse the normalization factors file (text or binary format).'''
+        # Keyed by (sample, insert).
+        nf = normfactors.read(norm)
+        if set(nf.samples) != set(self.samples):
             message = ("Numbers of samples in Reader.normfactors and "
                        "Reader.samples do not agree. This may cause DP "
                        "normalization errors. GBStools will use the "
                        "default normalization factor (1.0)")
             warnings.warn(message, Warning)
-            normfactors = None
-        return(normfactors)
+            nf = None
+        return(nf)
     
     def parse_ped(self, ped):
         '''Parse the PED file and return a named tuple of family members.'''
@@ -196,8 +230,12 @@ class Reader():
         return self
    
     def next(self):
+        stats = self.stats
         # Extract SNP info from the vcf file.
-        vcf_record = self.reader.next()
+        with stats.timer('vcf_parse'):
+            vcf_record = self.reader.next()
+        stats.count('markers')
+        stats.count('samples', len(self.samples))
         chrom = vcf_record.CHROM
         pos = vcf_record.POS - 1
         ref = vcf_record.REF
@@ -208,25 +246,29 @@ class Reader():
             try:
                 # Get read data directly from bam file.
                 alignment = self.alignments[sample]
-                call = alignment.pileup(chrom, pos, ref, alt[0])
+                with stats.timer('pileup'):
+                    call = alignment.pileup(chrom, pos, ref, alt[0])
+                stats.count('reads_pileup', call.DP)
             except:
                 try:
-                    # Make a dict of PyVCF ``_Call`` objects keyed by sample name.
-                    vcf_calls = dict(zip(self._reader.samples, vcf_record.samples))
-                    # Get read data from VCF.
-                    keys = vcf_calls[sample].data._fields
-                    vals = list(iter(vcf_calls[sample].data))
-                    data = dict(zip(keys, vals))
-                    call = CallData(sample, **data)
+                    with stats.timer('vcf_calls'):
+                        # Make a dict of PyVCF ``_Call`` objects keyed by sample name.
+                        vcf_calls = dict(zip(self._reader.samples, vcf_record.samples))
+                        # Get read data from VCF.
+                        keys = vcf_calls[sample].data._fields
+                        vals = list(iter(vcf_calls[sample].data))
+                        data = dict(zip(keys, vals))
+                        call = CallData(sample, **data)
                 except:
                     message = ("Sample ''%s'' not found in user-supplied VCF "
                                "or in user-supplied list of bam files." % sample)
                     raise Exception(message)
             # Look up the normalization factor based on insert size.            
-            try:
-                call.NF = self.normfactors[(sample, int(call.INS))]
-            except:
-                call.NF = 1.0
+            with stats.timer('normfactors'):
+                try:
+                    call.NF = self.normfactors[(sample, int(call.INS))]
+                except:
+                    call.NF = 1.0
             calls.append(call)
                 
         # If DP-only mode is being used, set PL to None.
@@ -272,12 +314,17 @@ class Reader():
         except:
             pass
 
+        # Dispersion for the median insert size (see dispersion.Dispersion).
+        disp = self.disp
+        if self.dispersion is not None:
+            disp = self.dispersion.lookup(ins_med)
         # Generate ''Marker'' or ''PedMarker'' object.
         if not self.family:
-            marker = Marker(rec=vcf_record, calls=calls, disp=self.disp, info=info)
+            marker = Marker(rec=vcf_record, calls=calls, disp=disp, info=info,
+                            stats=stats, engine=self.engine)
         else:
-            marker = PedMarker(rec=vcf_record, calls=calls, disp=self.disp,
-                               info=info, family=self.family)
+            marker = PedMarker(rec=vcf_record, calls=calls, disp=disp,
+                               info=info, family=self.family, stats=stats)
         return(marker)
 
     def fetch(self, chrom, start, end=None):
@@ -288,12 +335,35 @@ class Reader():
             except StopIteration:
                 return None
         self.reader = self._reader.fetch(chrom, start, end)
+        self.fetched = True
         return self
 
+    def skip(self, n):
+        '''Skip the next n VCF records without making markers (e.g. to resume a
+        run). Returns the (CHROM, POS) of the last record skipped, or None.'''
+        last = None
+        for i in range(n):
+            try:
+                if self.fetched:
+                    record = self.reader.next()
+                    last = (record.CHROM, record.POS)
+                else:
+                    # Skip the lines of the VCF without parsing the samples.
+                    fields = self._reader.reader.next().split('\t', 2)
+                    last = (fields[0], int(fields[1]))
+            except StopIteration:
+                break
+            self.stats.count('records_skipped')
+        return(last)
+
 
 class Writer():
     """Output GBS marker data in VCF format."""
-    def __init__(self, outstream, template, lineterminator='\n'):
+    def __init__(self, outstream, template, lineterminator='\n', stats=None, header=True):
+        # Stage timers (shared with the template Reader by default).
+        if stats is None:
+            stats = template.stats
+        self.stats = stats
         filename = template.filename
         disp = template.disp
         self.template = vcf.Reader(filename=filename)
@@ -309,10 +379,49 @@ class Writer():
                             "disp_slope=%f " % disp['slope'],
                             "disp_intercept=%f" % disp['intercept']))
         self.template.metadata['GBStools'] = [analysis]
-        self.writer = vcf.Writer(outstream, self.template, lineterminator)
-        
+        # Records are formatted in a buffer and then written to outstream, so
+        # the number of bytes written (``offset``) is known, e.g. for
+        # checkpoints. Set header=False to append to an existing VCF.
+        self.outstream = outstream
+        self.buffer = StringIO()
+        self.writer = vcf.Writer(self.buffer, self.template, lineterminator)
+        self.header = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.offset = 0
+        # Call data classes, keyed by their FORMAT ids (see calldata_class).
+        self.calldata = {}
+        if header:
+            self.outstream.write(self.header)
+            self.offset = len(self.header)
+
+    def flush(self):
+        '''Write the buffered records to outstream.'''
+        data = self.buffer.getvalue()
+        self.outstream.write(data)
+        self.offset += len(data)
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return(None)
+
     def write_record(self, marker):
         '''Write the marker data to outstream.'''
+        with self.stats.timer('vcf_write'):
+            self._write_record(marker)
+            self.flush()
+        self.stats.count('records_written')
+        return(None)
+
+    def calldata_class(self, ids):
+        '''Return the PyVCF call data class for a list of FORMAT ids. Classes
+        are made once per list of ids (making a namedtuple class takes longer
+        than formatting a sample).'''
+        key = tuple(ids)
+        if key not in self.calldata:
+            self.calldata[key] = make_calldata_tuple(ids)
+        return(self.calldata[key])
+
+    def _write_record(self, marker):
         # Update the vcf INFO field.
         for info_id, val in marker.info.items():
             if isinstance(val, float):
@@ -358,7 +467,7 @@ class Writer():
                     vals.append(round(dropout_count, 3))
                 except:
                     vals.append(None)
-            new_cls = make_calldata_tuple(ids)
+            new_cls = self.calldata_class(ids)
             sample.data = new_cls._make(vals)
         # Write record to outstream.
         self.writer.write_record(marker.record)
@@ -367,12 +476,23 @@ class Writer():
 
 class Marker():
     """Store data from a single GBS SNP marker and call EM functions."""
-    def __init__(self, rec, calls, disp, info):
+    def __init__(self, rec, calls, disp, info, stats=None, engine='em'):
         self.record = rec
         self.calls = calls
         self.info = info
         self.param = {}
         self.lik_ratio = None
+        if stats is None:
+            stats = instrument.Stats()
+        self.stats = stats
+        # Fitting engine: 'em' or 'qn' (see Marker.fit).
+        if engine not in ENGINES:
+            raise ValueError("Unknown engine %s (use one of %s)" % (engine, ', '.join(ENGINES)))
+        self.engine = engine
+        # Parameter-independent likelihood terms (see loglik_surface).
+        self.terms = None
+        # Cache and key of a fit made by run_task (see Marker.task).
+        self.cache_entry = None
         # Initial dropout frequency.                                                                                                                                                                                                                                                                             
         dfreq = 0.01
         # Bool indicating allele data is missing.                                                                                                                                                                                                                                                                
@@ -416,7 +536,7 @@ class Marker():
                              'exp_phi':None,
                              'exp_delta':None}]
 
-    def check_convergence(self, param, phi_tol=0.001, lamb_tol=0.1, delta_tol=0.005):
+    def check_convergence(self, param, phi_tol=PHI_TOL, lamb_tol=LAMB_TOL, delta_tol=DELTA_TOL):
         '''Check convergence of EM.'''
         if param[-1]['fail']:
             converged = True
@@ -443,6 +563,318 @@ class Marker():
             param_new['fail'] = True
         return(param_new)
 
+    def warm_start(self, estimates, samples=None):
+        '''Start the EM from previous estimates (see incremental.PreviousEstimates).
+
+        Allele frequencies and digest failure rates are at least
+        WARM_START_MIN (AF is 0 in DP-only mode, as in Marker.__init__). If
+        the samples of the previous estimates are given, lambda is scaled by
+        the ratio of the mean DP of all samples to that of those samples.
+        '''
+        dp_mode = not bool([call.PL for call in self.calls if call.PL])
+        scale = 1.0
+        if samples is not None:
+            dp_all = [call.DP for call in self.calls if call.DP > 0]
+            dp_old = [call.DP for call in self.calls if call.DP > 0 and call.sample in samples]
+            if dp_all and dp_old:
+                scale = (float(sum(dp_all)) / len(dp_all)) / (float(sum(dp_old)) / len(dp_old))
+        for hyp in ('H0', 'H1'):
+            param = self.param[hyp][0]
+            if param['fail']:
+                continue
+            phi = [max(p, WARM_START_MIN) for p in estimates[hyp]['phi']]
+            if dp_mode:
+                phi[1] = 0.0
+            if hyp == 'H0':
+                phi[2] = 0.0
+            param['phi'] = [p / sum(phi) for p in phi]
+            if estimates[hyp]['lambda'] > 0:
+                param['lambda'] = estimates[hyp]['lambda'] * scale
+            param['delta'] = min(max(estimates[hyp]['delta'], WARM_START_MIN), 1 - WARM_START_MIN)
+        return(None)
+
+    def lr_change(self, samples):
+        '''Contribution of the given samples to the likelihood ratio at the
+        starting parameters (e.g. of new samples, after warm_start).'''
+        calls = [call for call in self.calls if call.sample in samples]
+        if not calls or self.disp is None:
+            return(0.0)
+        terms = likelihood.SampleTerms(calls)
+        loglik = {}
+        for hyp in ('H0', 'H1'):
+            param = self.param[hyp][0]
+            loglik[hyp] = likelihood.loglik(terms, param['phi'], param['lambda'],
+                                            param['delta'], self.disp)
+        return(-2.0 * (loglik['H0'] - loglik['H1']))
+
+    def evaluate(self):
+        '''Use the starting parameters as the estimates without running EM
+        (e.g. warm-started markers that new samples cannot change). One EM
+        update gives their loglik and expected dropout counts.'''
+        for hyp in ('H0', 'H1'):
+            param = self.param[hyp][-1]
+            update = self.update_param(self.param[hyp])
+            for key in ('loglik', 'exp_phi', 'exp_delta'):
+                param[key] = update[key]
+            param['fail'] = update['fail']
+        if self.param['H1'][-1]['loglik'] < self.param['H0'][-1]['loglik']:
+            self.param['H1'].append(self.param['H0'][-1])
+        self.lik_ratio = self.likelihood_ratio()
+        self.update_info()
+        self.info['EMSkipped'] = True
+        self.stats.count('em_skipped')
+        return(None)
+
+    def cache_key(self, max_iter=30, screen=None, critical=None):
+        '''Hash of the EM inputs (see Marker.fit and cache.FitCache).'''
+        data = [ENGINES[self.engine], max_iter, PHI_TOL, LAMB_TOL, DELTA_TOL, self.disp, screen,
+                critical]
+        for hyp in ('H0', 'H1'):
+            param = self.param[hyp][0]
+            data.append((param['phi'], param['lambda'], param['delta'], param['fail']))
+        data.append([(call.DP, call.NF, call.PL) for call in self.calls])
+        return(hashlib.sha1(repr(data)).hexdigest())
+
+    def cached_fit(self):
+        '''The fitted parameters, in a form that does not depend on sample names.'''
+        fit = {}
+        for hyp in ('H0', 'H1'):
+            param = self.param[hyp][-1].copy()
+            for key in ('exp_phi', 'exp_delta'):
+                if param[key] is not None:
+                    param[key] = [param[key].get(call.sample) for call in self.calls]
+            fit[hyp] = (len(self.param[hyp]), param)
+        fit['info'] = dict([(key, self.info[key]) for key in ('DScore', 'ScoreSkipped', 'EMEarlyStop', 'EvaluationsH0', 'EvaluationsH1')
+                            if key in self.info])
+        return(fit)
+
+    def load_fit(self, fit):
+        '''Set the fitted parameters from Marker.cached_fit (of a marker with the
+        same EM inputs). The iterations are filled with the final estimates.'''
+        samples = [call.sample for call in self.calls]
+        for hyp in ('H0', 'H1'):
+            iterations, param = fit[hyp]
+            for key in ('exp_phi', 'exp_delta'):
+                if param[key] is not None:
+                    param[key] = dict(zip(samples, param[key]))
+            self.param[hyp] = self.param[hyp][:1] + [param] * (iterations - 1)
+        self.info.update(fit.get('info', {}))
+        return(None)
+
+    def load_cached(self, cache, key):
+        '''Set the fit from a cache.FitCache. Returns False if it is not cached.'''
+        fit = cache.get(key)
+        if fit is None:
+            self.stats.count('fit_cache_misses')
+            return(False)
+        self.stats.count('fit_cache_hits')
+        self.load_fit(fit)
+        self.lik_ratio = self.likelihood_ratio()
+        self.update_info()
+        return(True)
+
+    def task(self, max_iter=30, cache=None, screen=None, critical=None, ci=None):
+        '''The inputs of Marker.fit (and of profile_intervals, if the level ci
+        is given) as a picklable tuple, to fit the marker in another process
+        with run_task. Load the result with Marker.load_task.
+
+        Only the sample names, DP, NF and PL of the calls are included.
+        Returns None, with the marker fitted, if the fit is in the cache.
+        '''
+        if cache is not None:
+            key = self.cache_key(max_iter, screen, critical)
+            if self.load_cached(cache, key):
+                if ci:
+                    self.profile_intervals(ci)
+                return(None)
+            self.cache_entry = (cache, key)
+        calls = [(call.sample, call.DP, call.NF, call.PL) for call in self.calls]
+        param = dict([(hyp, self.param[hyp][0]) for hyp in ('H0', 'H1')])
+        options = {'max_iter':max_iter, 'screen':screen, 'critical':critical}
+        return((calls, param, self.disp, self.engine, self.stats.enabled, options, ci))
+
+    def load_task(self, result):
+        '''Set the fit made by run_task, and add it to the cache given to
+        Marker.task.'''
+        fit, info, stats = result
+        if self.cache_entry:
+            cache, key = self.cache_entry
+            cache.put(key, fit)
+            self.cache_entry = None
+        self.load_fit(fit)
+        self.info.update(info)
+        if stats:
+            self.stats.merge(stats)
+        self.lik_ratio = self.likelihood_ratio()
+        self.update_info()
+        return(None)
+
+    def fit(self, max_iter=30, cache=None, screen=None, critical=None):
+        '''Estimate the H0 and H1 parameters by EM and calculate the likelihood ratio.
+
+        If a cache.FitCache is given, the fit is looked up by the EM inputs
+        (Marker.cache_key) first, and added to the cache after EM. If a
+        screening threshold is given, the H1 EM is only run when the score
+        statistic for dropout at the H0 estimates (see dropout_score) exceeds
+        it; otherwise the H0 estimates are used for H1 (DLR = 0). If the
+        critical DLR of gbstools_filter.py is given, the H1 EM stops as soon
+        as the DLR of its estimates is above it (see filter_decision) and
+        EMEarlyStop is set.
+
+        With the 'qn' engine (Marker.engine) each hypothesis is fitted by
+        Marker.maximize instead, falling back to EM if it fails; early
+        stopping does not apply.
+        '''
+        if cache is not None:
+            key = self.cache_key(max_iter, screen, critical)
+            if self.load_cached(cache, key):
+                return(None)
+        for hyp in ('H0', 'H1'):
+            param = self.param[hyp]
+            if hyp == 'H1' and screen is not None and self.screen(screen):
+                param.append(self.param['H0'][-1])
+                break
+            if self.engine == 'qn' and self.maximize(hyp):
+                continue
+            with self.stats.timer('em_' + hyp):
+                while not self.check_convergence(param):
+                    param.append(self.update_param(param))
+                    if len(param) > max_iter:
+                        param[-1]['fail'] = True
+                    elif hyp == 'H1' and critical is not None:
+                        if self.filter_decision(critical):
+                            # Keep the estimates whose loglik is known to be
+                            # above the threshold.
+                            param.pop()
+                            self.info['EMEarlyStop'] = True
+                            self.stats.count('em_early_stops')
+                            break
+                # Update once more to get the loglik of the final estimates.
+                param[-1]['loglik'] = self.update_param(param)['loglik']
+            self.stats.count('em_iterations_' + hyp, len(param))
+            self.stats.count('em_failures_' + hyp, int(param[-1]['fail']))
+        # If the null hypothesis has a higher loglik, use it instead.
+        if self.param['H1'][-1]['loglik'] < self.param['H0'][-1]['loglik']:
+            self.param['H1'].append(self.param['H0'][-1])
+        if cache is not None:
+            cache.put(key, self.cached_fit())
+        self.lik_ratio = self.likelihood_ratio()
+        self.update_info()
+        return(None)
+
+    def maximize(self, hyp, max_eval=200):
+        '''Fit a hypothesis by quasi-Newton maximization of the likelihood
+        (see likelihood.quasi_newton). The estimates are added to
+        Marker.param[hyp] and the likelihood evaluations to INFO
+        (EvaluationsH0/H1). Returns False, with Marker.param unchanged, if
+        the maximization fails.'''
+        param = self.param[hyp]
+        if param[-1]['fail']:
+            return(False)
+        if self.terms is None:
+            self.terms = likelihood.SampleTerms(self.calls)
+        dp_mode = not bool([call.PL for call in self.calls if call.PL])
+        with self.stats.timer('qn_' + hyp):
+            try:
+                phi, lamb, delta, evaluations, success = likelihood.quasi_newton(
+                    self.terms, param[-1], self.disp, dropout=(hyp == 'H1'),
+                    alt=(not dp_mode), max_eval=max_eval)
+            except (ValueError, FloatingPointError, ZeroDivisionError):
+                success = False
+            if success:
+                estimates = {'phi':phi, 'lambda':lamb, 'delta':delta, 'fail':False,
+                             'loglik':None, 'exp_phi':None, 'exp_delta':None}
+                # One EM update gives the loglik and expected counts of the estimates.
+                update = self.update_param([estimates])
+                success = not update['fail'] and update['loglik'] is not None
+            if not success:
+                self.stats.count('qn_fallbacks_' + hyp)
+                return(False)
+            for key in ('loglik', 'exp_phi', 'exp_delta'):
+                estimates[key] = update[key]
+        param.append(estimates)
+        self.info['Evaluations' + hyp] = evaluations + 1
+        self.stats.count('qn_evaluations_' + hyp, evaluations + 1)
+        return(True)
+
+    def filter_decision(self, critical):
+        '''Return 'above' if the DLR of the previous H1 estimates (whose loglik
+        is that of the last update) is above the critical DLR of
+        gbstools_filter.py, else None.
+
+        For an EM that never decreases the likelihood this DLR is a lower
+        bound on the DLR of the full fit, so the filter decision would not
+        change. The NB size is rounded to an integer (see em.dnbinom), so
+        the loglik can drop slightly when lambda moves it across an integer,
+        and the full fit can end up below the threshold (with a lower
+        loglik than the early estimates). Early stopping is therefore not
+        exact; no decision is made below the threshold, where there is no
+        bound at all.
+        '''
+        param = self.param['H1']
+        null = self.param['H0'][-1]
+        if len(param) < 3 or null['fail'] or null['loglik'] is None:
+            return(None)
+        # loglik of an update is that of the previous estimates.
+        if param[-1]['fail'] or param[-1]['loglik'] is None:
+            return(None)
+        if 2.0 * (param[-1]['loglik'] - null['loglik']) > critical:
+            return('above')
+        return(None)
+
+    def dropout_score(self):
+        '''Score statistic for phi[2] > 0 at the H0 estimates (see
+        likelihood.dropout_score), or None if the H0 EM failed.'''
+        param = self.param['H0'][-1]
+        if param['fail'] or self.disp is None:
+            return(None)
+        if self.terms is None:
+            self.terms = likelihood.SampleTerms(self.calls)
+        with self.stats.timer('score'):
+            score, statistic = likelihood.dropout_score(self.terms, param, self.disp)
+        return(statistic)
+
+    def screen(self, threshold):
+        '''Add the dropout score statistic to INFO (DScore) and return True if
+        it is at most threshold (the H1 EM can be skipped).'''
+        statistic = self.dropout_score()
+        if statistic is None:
+            return(False)
+        self.info['DScore'] = round(statistic, 3)
+        if statistic > threshold:
+            return(False)
+        self.info['ScoreSkipped'] = True
+        self.stats.count('score_skipped')
+        return(True)
+
+    def loglik_surface(self, phi, lamb, delta):
+        '''Evaluate the log-likelihood at arrays of parameters without updating them.
+
+        The arrays are broadcast against each other (phi has a last axis of
+        length 3), e.g. lamb[:, None] and phi[None, :, :] give a 2-D lambda x
+        phi grid. Parameters out of bounds give -inf.
+        '''
+        if self.terms is None:
+            self.terms = likelihood.SampleTerms(self.calls)
+        return(likelihood.loglik(self.terms, phi, lamb, delta, self.disp))
+
+    def profile_intervals(self, level=0.95):
+        '''Profile-likelihood confidence intervals for DFreq and lambda (H1).
+
+        Uses the converged H1 estimates (see likelihood.profile_intervals) and
+        adds the intervals to the INFO field as DFreqCI and LambdaCI.
+        '''
+        param = self.param['H1'][-1]
+        if param['fail'] or self.disp is None:
+            return(None)
+        if self.terms is None:
+            self.terms = likelihood.SampleTerms(self.calls)
+        with self.stats.timer('profile_intervals'):
+            dfreq_ci, lambda_ci = likelihood.profile_intervals(self.terms, param, self.disp, level)
+        self.info['DFreqCI'] = [round(i, 3) if i is not None else None for i in dfreq_ci]
+        self.info['LambdaCI'] = [round(i, 3) if i is not None else None for i in lambda_ci]
+        return(dfreq_ci, lambda_ci)
+
     def print_param(self, param_dict):
         '''Print out parameter estimates in a easy-to-read format'''
         try:
@@ -480,15 +912,37 @@ class Marker():
         self.info['EMFailH0'] = self.param['H0'][-1]['fail']
         return(None)
     
+def run_task(task):
+    '''Fit a marker from the tuple made by Marker.task (e.g. in a worker
+    process). Returns the fit (see Marker.cached_fit), the INFO fields and
+    the stats (as in Stats.as_dict, or None if stats are disabled).'''
+    calls, param, disp, engine, enabled, options, ci = task
+    calls = [CallData(sample, DP=dp, NF=nf, PL=pl) for sample, dp, nf, pl in calls]
+    stats = instrument.Stats(enabled)
+    marker = Marker(None, calls, {'slope':0.0, 'intercept':0.0}, {}, stats=stats, engine=engine)
+    # The dispersion and starting values of the original marker.
+    marker.disp = disp
+    marker.param = dict([(hyp, [param[hyp]]) for hyp in param])
+    marker.fit(**options)
+    if ci:
+        marker.profile_intervals(ci)
+    if enabled:
+        return(marker.cached_fit(), marker.info, stats.as_dict())
+    return(marker.cached_fit(), marker.info, None)
+
+
 class PedMarker():
     """Store data from a single pedigree GBS SNP marker and call EM functions."""
-    def __init__(self, rec, calls, disp, info, family):
+    def __init__(self, rec, calls, disp, info, family, stats=None):
         self.record = rec
         self.calls = calls
         self.info = info
         self.family = family
         self.param = {}
         self.lik_ratio = None
+        if stats is None:
+            stats = instrument.Stats()
+        self.stats = stats
         dp = sum([call.DP for call in calls])
         missing = sum([call.DP == 0 for call in calls])
         if dp > 0:
@@ -530,6 +984,24 @@ class PedMarker():
             param_new['fail'] = True
         return(param_new)
 
+    def fit(self, max_iter=30):
+        '''Estimate the parameters for each pair of parental genotypes by EM and
+        calculate the likelihood ratio.'''
+        for gt in self.param:
+            param = self.param[gt]
+            with self.stats.timer('em_ped'):
+                while not self.check_convergence(param):
+                    param.append(self.update_param(param, gt))
+                    if len(param) > max_iter:
+                        param[-1]['fail'] = True
+                # Update once more to get the loglik of the final estimates.
+                param[-1]['loglik'] = self.update_param(param, gt)['loglik']
+            self.stats.count('em_iterations_ped', len(param))
+            self.stats.count('em_failures_ped', int(param[-1]['fail']))
+        self.lik_ratio = self.likelihood_ratio()
+        self.update_info()
+        return(None)
+
     def likelihood_ratio(self):
         '''Null hypothesis: DCount = 0. Alt hypothesis DCount > 0.'''
         h0_lik = 0
@@ -575,6 +1047,8 @@ class PedMarker():
 class _Samfile():
     """ Class for generating ''Pileup'' objects from pysam ''Samfile'' objects. """
     def __init__(self, bam, sample):
+        # pysam is only needed in bamlist mode.
+        import pysam
         self.sample = sample
         self.bam = pysam.Samfile(bam, 'rb')
 
@@ -0,0 +1,241 @@
+"""
+Pipelined driver: read, fit and write markers in overlapping stages.
+
+A run of polymorphism_test.py does three kinds of work per marker: reading
+(VCF parsing and BAM pileups in ``Reader.next``), fitting (EM in
+``Marker``) and writing (``Writer.write_record``). ``run`` does each in its
+own stage: a reader thread prefetches markers, the EM runs in a pool of
+worker processes (the fitting holds the GIL, so threads would not overlap
+it), and a writer thread writes the markers in input order. Only the EM
+inputs of a marker (its DP, NF and PL, see ``Marker.task``) are sent to the
+workers, and only the fitted parameters come back. Everything else (e.g.
+the fit cache and warm starts) stays in the calling thread.
+
+Each stage records its busy time and the time it waits for the stages
+before and after it (in ``Stats.wall`` as ``pipeline_<stage>`` and
+``pipeline_<stage>_wait``). The utilization of a stage is its busy time
+divided by the elapsed time (and by the number of workers for the fit
+stage); the stage with the highest utilization limits the throughput.
+"""
+
+import sys
+import time
+import threading
+import multiprocessing
+import Queue
+from collections import deque
+import instrument
+from parser import run_task
+
+# Marks the end of the markers in a queue.
+_END = object()
+
+
+class _Stage(threading.Thread):
+    """Thread running one stage. An exception is kept for the caller and
+    sets the ``abort`` event, if any."""
+    def __init__(self, name, target, abort=None):
+        threading.Thread.__init__(self, name=name)
+        self.daemon = True
+        self.target = target
+        self.abort = abort
+        self.exc_info = None
+
+    def run(self):
+        try:
+            self.target()
+        except:
+            self.exc_info = sys.exc_info()
+            if self.abort is not None:
+                self.abort.set()
+
+
+class _Timing():
+    """Busy and wait times of a stage."""
+    def __init__(self, stats, stage):
+        self.stats = stats
+        self.stage = 'pipeline_' + stage
+        self.busy = 0.0
+        self.wait = 0.0
+        self.items = 0
+
+    def record(self):
+        '''Add the times to the stats (from the thread that owns them).'''
+        self.stats.add(self.stage, self.busy, calls=self.items)
+        self.stats.add(self.stage + '_wait', self.wait, calls=self.items)
+        return(None)
+
+
+def _put(queue, item, stop):
+    '''Put an item on a queue, giving up when stop is set.'''
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return(True)
+        except Queue.Full:
+            pass
+    return(False)
+
+
+def _get(queue, stop):
+    '''Get an item from a queue, returning _END when stop is set.'''
+    while not stop.is_set():
+        try:
+            return(queue.get(timeout=0.1))
+        except Queue.Empty:
+            pass
+    return(_END)
+
+
+def _timed_task(task):
+    '''Run a fit task, returning the result and the time it took.'''
+    start = time.time()
+    result = run_task(task)
+    return(result, time.time() - start)
+
+
+def run(markers, process, write, read_depth=64, write_depth=64, stats=None, processes=1):
+    '''Read markers from an iterator, call process(marker) on each, fit them
+    and write(marker) in input order, in pipelined stages.
+
+    process runs in the calling thread, in input order. It returns None if
+    the marker needs no more work, or a task (see Marker.task) that is
+    fitted in one of ``processes`` worker processes and loaded with
+    Marker.load_task, also in the calling thread. With processes=1 tasks
+    are fitted in the calling thread, so only the reading and writing
+    overlap the fits (e.g. waits on disk, since the fits hold the GIL). ``read_depth`` markers are read ahead,
+    up to ``read_depth`` tasks are fitted at once, and ``write_depth``
+    fitted markers wait to be written. An exception in any stage stops the
+    pipeline and is raised again here. If stats (an instrument.Stats) is
+    given, the stage times are added to it. Returns a dict of the elapsed
+    time, the utilization of each stage and the number of markers written.
+    '''
+    if stats is None:
+        stats = instrument.Stats()
+    stats.threaded = True
+    read_queue = Queue.Queue(maxsize=max(read_depth, 1))
+    write_queue = Queue.Queue(maxsize=max(write_depth, 1))
+    # Set to stop reading, or to stop all stages (after an error in the
+    # writer). After an error in the reader, the markers already read are
+    # still processed and written.
+    stop_read = threading.Event()
+    abort = threading.Event()
+    timing = dict([(stage, _Timing(stats, stage)) for stage in ('read', 'process', 'fit', 'write')])
+    iterator = iter(markers)
+
+    def read():
+        t = timing['read']
+        try:
+            while not stop_read.is_set():
+                start = time.time()
+                try:
+                    marker = iterator.next()
+                except StopIteration:
+                    break
+                t.busy += time.time() - start
+                t.items += 1
+                start = time.time()
+                if not _put(read_queue, marker, stop_read):
+                    break
+                t.wait += time.time() - start
+        finally:
+            _put(read_queue, _END, stop_read)
+            t.record()
+
+    def write_markers():
+        t = timing['write']
+        try:
+            while True:
+                start = time.time()
+                marker = _get(write_queue, abort)
+                t.wait += time.time() - start
+                if marker is _END:
+                    break
+                start = time.time()
+                write(marker)
+                t.busy += time.time() - start
+                t.items += 1
+        finally:
+            t.record()
+
+    # Markers in input order, with their pending fits (None if there is no task).
+    pending = deque()
+    t = timing['process']
+
+    def finish():
+        '''Load the fit of the first pending marker and pass it to the writer.'''
+        marker, result = pending.popleft()
+        if result is not None:
+            start = time.time()
+            value, busy = result.get()
+            t.wait += time.time() - start
+            timing['fit'].busy += busy
+            timing['fit'].items += 1
+            start = time.time()
+            marker.load_task(value)
+            t.busy += time.time() - start
+        start = time.time()
+        ok = _put(write_queue, marker, abort)
+        t.wait += time.time() - start
+        return(ok)
+
+    elapsed = time.time()
+    # Fork the workers before starting any threads.
+    pool = None
+    if processes > 1:
+        pool = multiprocessing.Pool(processes)
+    reader = _Stage('pipeline_read', read)
+    writer = _Stage('pipeline_write', write_markers, abort)
+    reader.start()
+    writer.start()
+    try:
+        while True:
+            start = time.time()
+            marker = _get(read_queue, abort)
+            t.wait += time.time() - start
+            if marker is _END:
+                break
+            start = time.time()
+            task = process(marker)
+            result = None
+            if task is not None:
+                if pool is None:
+                    value, busy = _timed_task(task)
+                    timing['fit'].busy += busy
+                    timing['fit'].items += 1
+                    marker.load_task(value)
+                else:
+                    result = pool.apply_async(_timed_task, (task,))
+            t.busy += time.time() - start
+            t.items += 1
+            pending.append((marker, result))
+            # Write the markers whose fits are done, in order, and wait for
+            # the oldest fit while too many are pending.
+            ok = True
+            while ok and pending and (pending[0][1] is None or pending[0][1].ready() or
+                                      len(pending) > read_depth):
+                ok = finish()
+            if not ok:
+                break
+        while pending and not abort.is_set():
+            finish()
+    finally:
+        # The writer finishes the markers already processed.
+        stop_read.set()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        _put(write_queue, _END, abort)
+        t.record()
+        timing['fit'].record()
+        writer.join()
+        reader.join()
+    for stage in (reader, writer):
+        if stage.exc_info:
+            raise stage.exc_info[0], stage.exc_info[1], stage.exc_info[2]
+    elapsed = time.time() - elapsed
+    utilization = dict([(stage, t.busy / elapsed if elapsed > 0 else 0.0)
+                        for stage, t in timing.items()])
+    utilization['fit'] /= max(processes, 1)
+    return({'elapsed':elapsed, 'utilization':utilization,
+            'markers':timing['write'].items})
@@ -5,10 +5,17 @@ as described in the docs/gbstools_notes.pdf.
 """
 
 import random
+import numpy
+
+"""Genotypes for pairs of sampled haplotypes, where '.' marks a haplotype
+that is not sequenced because of a '-' restriction site allele."""
+GENOTYPES = numpy.array(['0/0', '0/1', '1/1', '0/.', '1/.', './.'])
+# Contribution of each genotype to the allele count in sampled genotypes.
+AC_SAMPLED = numpy.array([0, 1, 2, 0, 2, 0])
 
 class Reader():
     """Parser class for MS output files. Generates ``Sample`` objects."""
-    def __init__(self, msfile, fraglen=500, sitelen=6, siteprob=0.0011, readlen=101, variantsonly=False):
+    def __init__(self, msfile, fraglen=500, sitelen=6, siteprob=0.0011, readlen=101, variantsonly=False, seed=0):
         self.msfile = msfile
         self.samples = None
         self.seeds = None
@@ -23,7 +30,7 @@ class Reader():
         # Flag=true when each site has a segregating restriction site variant.
         self.variantsonly = variantsonly
         # Set the seed for the random number generator.
-        self.rand = random.Random(0)
+        self.rand = random.Random(seed)
         self.sitenum = 0
     
     def parse_header(self):
@@ -52,23 +59,25 @@ class Reader():
         haplotypes = []
         for line in self.msfile:
             line = line.strip()
-            fields = line.split()
             if line == '//':
                 break
             elif not line:
                 continue
-            elif fields[0] == 'segsites:':
+            elif line.startswith('segsites:'):
                 # Record the number of segregating sites.
-                segsites = int(fields[1])
-            elif fields[0] == 'positions:':
+                segsites = int(line.split()[1])
+            elif line.startswith('positions:'):
                 # Convert the MS position field to integers in sequence 0-N.
-                positions = [int(self.fraglen * float(pos)) for pos in fields[1:]]
+                positions = [int(self.fraglen * float(pos)) for pos in line.split()[1:]]
             else:
                 # Record the individual haplotypes.
-                haplotypes.append([int(i) for i in list(fields[0])])
+                haplotypes.append(line)
         if segsites is not None:
+            # Haplotypes x segregating sites matrix of alleles (0 or 1).
+            matrix = numpy.frombuffer(''.join(haplotypes), dtype=numpy.uint8) - ord('0')
+            matrix = matrix.reshape(len(haplotypes), segsites)
             # Create a "Sample" object.
-            return(Sample(segsites, positions, haplotypes, self.fraglen, self.sitelen, self.siteprob,
+            return(Sample(segsites, positions, matrix, self.fraglen, self.sitelen, self.siteprob,
                           self.readlen, self.variantsonly, self.rand, self.sitenum))
         raise StopIteration
 
@@ -89,7 +98,7 @@ class Sample():
         self.minus_haplotype = self.get_minus_haplotype()
         (self.dcount, self.missing, self.ac, self.ac_sampled, self.hets, 
          self.hets_sampled, self.background, self.genotypes, self.true_genotypes,
-         self.hets_missing) = self.counts()
+         self.hets_missing, self.genotype_codes) = self.counts()
         
     def get_minus_haplotype(self):
         '''Get list of SNP alleles that cause the '-' haplotype (0, 1, or None).'''
@@ -116,101 +125,55 @@ class Sample():
         return(minus_haplotype)
 
     def counts(self):
-        '''Calculate DCount, Missing, AC, ACgbs, `-` background, GT list.'''
-        n = len(self.haplotypes)
-        # Indices of alleles in the haplotype that are in the 2 x 101 bp region.
-        indices = []
-        for i in range(self.segsites):
-            # Forward read indices.
-            if (self.positions[i] > self.sitelen and 
-                self.positions[i] <= self.sitelen + self.readlen):
-                indices.append(i)
-            # Reverse read indices.
-            elif (self.positions[i] >= self.fraglen - (self.sitelen + self.readlen) and 
-                  self.positions < self.fraglen - self.sitelen):
-                indices.append(i)
+        '''Calculate DCount, Missing, AC, ACgbs, `-` background, GT list and
+        the loci x samples array of sampled genotype codes (see GENOTYPES).'''
+        # Indices of alleles in the haplotype that are in the forward read. The
+        # reverse read test used to compare the whole positions list to an int,
+        # which never held, so only forward read SNPs are sampled (as before).
+        positions = numpy.array(self.positions[:self.segsites], dtype=int)
+        indices = numpy.flatnonzero((positions > self.sitelen) &
+                                    (positions <= self.sitelen + self.readlen))
+        haplotypes = self.haplotypes[:, indices]
 
-        # Get haplotypes.
-        haplotypes = []
-        sequenced_haplotypes = []
-        dropout_haplotypes = []
-        dcount = 0
-        for hap in self.haplotypes:
-            haplotypes.append([hap[i] for i in indices])
-            if sum([a == b for a, b in zip(hap, self.minus_haplotype)]) == 0:
-                sequenced_haplotypes.append([hap[i] for i in indices])
-            else:
-                sequenced_haplotypes.append([None] * len(indices))
-                dropout_haplotypes.append([hap[i] for i in indices])
-                dcount += 1
+        # Haplotypes with a '-' restriction site allele are not sequenced.
+        dropout = numpy.zeros(len(self.haplotypes), dtype=bool)
+        for i, allele in enumerate(self.minus_haplotype):
+            if allele is not None:
+                dropout |= self.haplotypes[:, i] == allele
+        dcount = int(dropout.sum())
 
         # Get true allele counts.
-        ac = [sum(i) for i in zip(*haplotypes)]
-                    
-        # Initialize lists of sequenced genotypes, sampled AC, and sampled hets.
-        genotypes = [[] for i in range(len(ac))]
-        ac_sampled = [0] * len(ac)
-        missing = [0] * len(ac)
-
-        # Iterate through pairs of samples (a, b).
-        hap_pairs = zip(sequenced_haplotypes[0::2], sequenced_haplotypes[1::2])
-        for hap_pair in hap_pairs:
-            loci = zip(*hap_pair)
-            for i in range(len(loci)):    # Iterate over loci and get genotypes.
-                if loci[i] == (0, 0):
-                    genotypes[i].append('0/0')
-                elif loci[i] == (0, 1) or loci[i] == (1, 0):
-                    genotypes[i].append('0/1')
-                    ac_sampled[i] += 1
-                elif loci[i] == (1, 1):
-                    genotypes[i].append('1/1')
-                    ac_sampled[i] += 2
-                elif loci[i] == (0, None) or loci[i] == (None, 0):
-                    genotypes[i].append('0/.')
-                elif loci[i] == (1, None) or loci[i] == (None, 1):
-                    genotypes[i].append('1/.')
-                    ac_sampled[i] += 2
-                else:
-                    genotypes[i].append('./.')
-                    missing[i] += 1
-        # Calculate number of observed hets.
-        hets_sampled = [geno.count('0/1') for geno in genotypes]
-
-        # Determine true genotypes and calculate true number of hets.
-        hets = [0] * len(ac)
-        true_hap_pairs = zip(haplotypes[0::2], haplotypes[1::2])
-        true_genotypes = [[] for i in range(len(ac))]
-        for hap_pair in true_hap_pairs:
-            loci = zip(*hap_pair)
-            for i in range(len(loci)):    # Iterate over loci and get genotypes.
-                if loci[i] == (0, 0):
-                    true_genotypes[i].append('0/0')
-                elif loci[i] == (0, 1) or loci[i] == (1, 0):
-                    hets[i] += 1
-                    true_genotypes[i].append('0/1')
-                elif loci[i] == (1, 1):
-                    true_genotypes[i].append('1/1')
+        ac = haplotypes.sum(axis=0, dtype=int)
 
+        # Genotype codes (see GENOTYPES) for pairs of haplotypes (a, b).
+        npairs = len(haplotypes) // 2
+        a, b = haplotypes[0:2 * npairs:2].T, haplotypes[1:2 * npairs:2].T
+        drop_a, drop_b = dropout[0:2 * npairs:2], dropout[1:2 * npairs:2]
+        true_codes = a.astype(int) + b
+        codes = true_codes.copy()
+        codes[:, drop_a & ~drop_b] = 3 + b[:, drop_a & ~drop_b]
+        codes[:, drop_b & ~drop_a] = 3 + a[:, drop_b & ~drop_a]
+        codes[:, drop_a & drop_b] = 5
+        genotypes = GENOTYPES[codes].tolist()
+        true_genotypes = GENOTYPES[true_codes].tolist()
+        ac_sampled = AC_SAMPLED[codes].sum(axis=1)
+        missing = (codes == 5).sum(axis=1)
+        hets_sampled = (codes == 1).sum(axis=1)
+        hets = (true_codes == 1).sum(axis=1)
         # Calculate number of hets with './.' observed (missing) genotype.
-        hets_missing = [0] * len(ac)
-        for i in range(len(true_genotypes)):
-            for j in range(len(true_genotypes[i])):
-                if true_genotypes[i][j] == '0/1' and genotypes[i][j] == './.':
-                    hets_missing[i] += 1
+        hets_missing = ((true_codes == 1) & (codes == 5)).sum(axis=1)
 
         # Determine the allelic background for the dropout allele.
-        dropout_alleles = zip(*dropout_haplotypes)    # Make list of tuples of alleles at each locus.
-        if dropout_alleles:
-            background = []
-            for alleles in dropout_alleles:
-                if 0 in alleles:
-                    if 1 in alleles:
-                        background.append('both')    # '-' is seen with both derived and ancestral alleles.
-                    else:
-                        background.append('ancestral')    # '-' is only seen with the ancestral allele.
-                else:
-                    background.append('derived')    # '-' is only seen with the derived allele.
+        dropout_haplotypes = haplotypes[dropout]
+        if len(dropout_haplotypes) and len(indices):
+            has_ancestral = (dropout_haplotypes == 0).any(axis=0)
+            has_derived = (dropout_haplotypes == 1).any(axis=0)
+            # '-' is seen with both alleles, only the ancestral allele or only the derived allele.
+            background = numpy.where(has_ancestral, numpy.where(has_derived, 'both', 'ancestral'), 'derived')
+            background = background.tolist()
         else:
             background = [None] * len(indices)
 
-        return((dcount, missing, ac, ac_sampled, hets, hets_sampled, background, genotypes, true_genotypes, hets_missing))
+        return((dcount, missing.tolist(), ac.tolist(), ac_sampled.tolist(), hets.tolist(),
+                hets_sampled.tolist(), background, genotypes, true_genotypes, hets_missing.tolist(),
+                codes))
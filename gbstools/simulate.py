@@ -0,0 +1,221 @@
+"""
+Simulation driver for GBStools power studies (see simulate_power.py).
+
+Runs the simulate_gbs_vcf.py -> simulate_dp.py -> polymorphism_test.py ->
+extract_vcf_info.py pipeline in-process for a grid of scenarios (theta,
+lambda, dispersion and replicate) across a process pool. Data are passed
+between the stages as arrays rather than VCF text, and the results of all
+scenarios are written to one tab-delimited table with a row per SNP.
+
+Each scenario gets its own random number streams (for ms, the restriction
+site model in pyms and the depth simulation), derived from a master seed by
+hashing, so the results do not depend on the number of processes or on the
+order in which scenarios are run.
+"""
+
+import hashlib
+import itertools
+import math
+import multiprocessing
+import random
+import subprocess
+from collections import namedtuple
+import numpy
+
+from gbstools import pyms
+from gbstools.parser import Marker, CallData
+
+try:
+    from collections import OrderedDict
+except:
+    from ordereddict import OrderedDict
+
+Scenario = namedtuple('Scenario', ['theta', 'lamb', 'dispersion', 'replicate'])
+
+"""Options shared by all scenarios (see simulate_power.py)."""
+Config = namedtuple('Config', ['samples', 'draws', 'seed', 'frag_len', 'site_len',
+                               'site_prob', 'read_len', 'variants_only', 'sampled_only',
+                               'missing', 'epsilon', 'dispersion_sd', 'test_dispersion',
+                               'dpmode', 'ms'])
+
+# Numbers of sequenced ref and alt alleles for each pyms genotype code.
+REF_COPIES = numpy.array([2, 1, 0, 1, 0, 0])
+ALT_COPIES = numpy.array([0, 1, 2, 0, 1, 0])
+
+HEADER = ('theta', 'lambda', 'dispersion', 'replicate', 'seed', 'site', 'snp',
+          'DCount', 'AC', 'ACgbs', 'Hets', 'HetsGBS', 'HetsMissing', 'Missing',
+          'Background', 'AncestralRS', 'DLR', 'DFreq', 'AFH0', 'AFH1', 'LambdaH0',
+          'LambdaH1', 'DigestH0', 'DigestH1', 'EMFailH0', 'EMFailH1', 'Dispersion', 'DP')
+
+# Marker INFO fields reported in the table.
+INFO_KEYS = ('DLR', 'DFreq', 'AFH0', 'AFH1', 'LambdaH0', 'LambdaH1',
+             'DigestH0', 'DigestH1', 'EMFailH0', 'EMFailH1')
+
+
+def derive_seed(*keys):
+    '''Derive a 32-bit seed from a master seed and a scenario/stream key.'''
+    key = ':'.join([repr(k) for k in keys])
+    return(int(hashlib.sha256(key.encode('ascii')).hexdigest()[:8], 16))
+
+
+def draw_dispersion(rand, mean, sd):
+    '''Draw the index of dispersion for a site (as in simulate_dp.py).'''
+    d = rand.normalvariate(mu=mean, sigma=sd)
+    if d < 1:
+        d = 1.001
+    return(d)
+
+
+def simulate_depths(rng, ref_copies, alt_copies, lamb, disp):
+    '''Draw ref and alt read depths from negative binomial distributions.
+
+    ``ref_copies`` and ``alt_copies`` are sites x samples arrays of the
+    numbers of sequenced ref and alt alleles, and ``disp`` is the index of
+    dispersion at each site. Each allele copy contributes lamb / 2 to the
+    mean depth. Depths are drawn in one call to ``rng``, in the order ref,
+    alt for each sample at each site, and only for non-zero allele counts.
+    '''
+    copies = numpy.dstack((ref_copies, alt_copies)).astype(float)
+    disp = numpy.asarray(disp, dtype=float).reshape(-1, 1, 1)
+    # NumPy's (n, p) parameters: mean = n * (1 - p) / p = lamb * copies / 2.
+    n = lamb * copies / ((disp - 1) * 2)
+    p = numpy.broadcast_to(1 / disp, n.shape)
+    depths = numpy.zeros(n.shape, dtype=int)
+    drawn = copies > 0
+    depths[drawn] = rng.negative_binomial(n[drawn], p[drawn])
+    return(depths[:, :, 0], depths[:, :, 1])
+
+
+def calculate_pl(dp_ref, dp_alt, epsilon=0.001):
+    '''Calculate PL from allelic depths (as in simulate_dp.py).
+
+    Returns an (..., 3) integer array; PL is undefined where the depth is 0.
+    '''
+    dp_ref = numpy.asarray(dp_ref)
+    dp_alt = numpy.asarray(dp_alt)
+    correct = math.log(1 - epsilon, 10)
+    error = math.log(epsilon / 3, 10)
+    het = math.log((3 - 2 * epsilon) / 6.0, 10)
+    lik = numpy.empty(dp_ref.shape + (3,))
+    lik[..., 0] = correct * dp_ref + error * dp_alt
+    lik[..., 1] = het * (dp_ref + dp_alt)
+    lik[..., 2] = correct * dp_alt + error * dp_ref
+    maxlik = lik.max(axis=-1)[..., numpy.newaxis]
+    return(numpy.abs(10 * (lik - maxlik)).astype(int))
+
+
+def ancestral_rs(minus_haplotype):
+    '''Get the ancestral restriction site allele(s) (as in simulate_gbs_vcf.py).'''
+    if 0 in minus_haplotype:
+        if 1 in minus_haplotype:
+            return('+-')
+        return('-')
+    return('+')
+
+
+def gbs_snps(reader, config):
+    '''Generate (site, index) pairs for the SNPs that simulate_gbs_vcf.py outputs.'''
+    n = reader.samples / 2
+    for site in reader:
+        # Ignore monomorphic sites.
+        if not site.ac or site.dcount >= 2 * n:
+            continue
+        for i in range(len(site.ac)):
+            if config.sampled_only and site.ac_sampled[i] == 0:
+                continue
+            elif site.missing[i] > n * config.missing:
+                continue
+            yield (site, i)
+
+
+def run_ms(scenario, config, seeds):
+    '''Start ms and return its output stream.'''
+    cmd = [config.ms, str(config.samples * 2), str(config.draws),
+           '-t', str(scenario.theta), '-seeds'] + [str(s) for s in seeds]
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    return(p)
+
+
+def run_scenario(task):
+    '''Simulate and test all the SNPs in one scenario. Returns a list of rows.'''
+    scenario, config = task
+    key = (config.seed,) + tuple(scenario)
+    seed = derive_seed(*key)
+    # ms seeds are 16-bit.
+    ms_seeds = [derive_seed(*(key + ('ms', i))) % 65536 for i in range(3)]
+    p = run_ms(scenario, config, ms_seeds)
+    reader = pyms.Reader(p.stdout, fraglen=config.frag_len, sitelen=config.site_len,
+                         siteprob=config.site_prob, readlen=config.read_len,
+                         variantsonly=config.variants_only,
+                         seed=derive_seed(*(key + ('pyms',))))
+    rand = random.Random(derive_seed(*(key + ('dispersion',))))
+    rng = numpy.random.RandomState(derive_seed(*(key + ('depth',))))
+    if config.test_dispersion is None:
+        disp = {'slope':0.0, 'intercept':scenario.dispersion}
+    else:
+        disp = {'slope':0.0, 'intercept':config.test_dispersion}
+    samples = [str(j) for j in range(reader.samples / 2)]
+    rows = []
+    for site, i in gbs_snps(reader, config):
+        d = draw_dispersion(rand, scenario.dispersion, config.dispersion_sd)
+        codes = site.genotype_codes[i][numpy.newaxis]
+        dp_ref, dp_alt = simulate_depths(rng, REF_COPIES[codes], ALT_COPIES[codes],
+                                         scenario.lamb, [d])
+        dp = (dp_ref + dp_alt)[0].tolist()
+        pl = calculate_pl(dp_ref, dp_alt, config.epsilon)[0].tolist()
+        calls = []
+        for sample, sample_dp, sample_pl in zip(samples, dp, pl):
+            if sample_dp == 0 or config.dpmode:
+                sample_pl = None
+            calls.append(CallData(sample, DP=sample_dp, PL=sample_pl))
+        marker = Marker(rec=None, calls=calls, disp=disp, info=OrderedDict())
+        marker.fit()
+        background = site.background[i]
+        if background is None:
+            background = '.'
+        row = [scenario.theta, scenario.lamb, scenario.dispersion, scenario.replicate,
+               seed, site.sitenum, i, site.dcount, site.ac[i], site.ac_sampled[i],
+               site.hets[i], site.hets_sampled[i], site.hets_missing[i], site.missing[i],
+               background, ancestral_rs(site.minus_haplotype)]
+        row += [marker.info[k] for k in INFO_KEYS]
+        row += [round(d, 3), sum(dp)]
+        rows.append(row)
+    p.stdout.close()
+    p.wait()
+    return(rows)
+
+
+def scenarios(thetas, lambdas, dispersions, replicates):
+    '''Generate the grid of scenarios.'''
+    for theta, lamb, dispersion in itertools.product(thetas, lambdas, dispersions):
+        for replicate in range(replicates):
+            yield Scenario(theta, lamb, dispersion, replicate)
+
+
+def format_value(val):
+    if val is None:
+        return('.')
+    elif isinstance(val, float):
+        return('%.6g' % val)
+    return(str(val))
+
+
+def run(grid, config, outstream, processes=1):
+    '''Run a grid of scenarios and write the results table to outstream.'''
+    tasks = ((scenario, config) for scenario in grid)
+    outstream.write('#' + '\t'.join(HEADER) + '\n')
+    if processes > 1:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap(run_scenario, tasks)
+    else:
+        pool = None
+        results = (run_scenario(task) for task in tasks)
+    for rows in results:
+        lines = ['\t'.join([format_value(val) for val in row]) for row in rows]
+        if lines:
+            outstream.write('\n'.join(lines) + '\n')
+            outstream.flush()
+    if pool:
+        pool.close()
+        pool.join()
+    return(None)
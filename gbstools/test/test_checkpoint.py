@@ -0,0 +1,84 @@
+"""Tests of checkpoint and resume in polymorphism_test.py (see checkpoint.py)."""
+
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+from gbstools import checkpoint
+
+DATA = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(DATA, '..', '..', 'bin', 'polymorphism_test.py')
+
+# Runs polymorphism_test.py and exits without any cleanup (like a killed
+# process) after the given number of records are written.
+CRASH = '''
+import os
+import sys
+import gbstools
+write_record = gbstools.Writer.write_record
+def crash(self, marker):
+    write_record(self, marker)
+    crash.records += 1
+    if crash.records == int(os.environ['CRASH_AFTER']):
+        os._exit(9)
+crash.records = 0
+gbstools.Writer.write_record = crash
+sys.argv[0] = %r
+execfile(sys.argv[0])
+''' % SCRIPT
+
+
+class TestResume(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmpdir, 'sim.scored.vcf')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def run_script(self, args, crash_after=None):
+        '''Run polymorphism_test.py (in the test data directory) and return
+        its exit status.'''
+        env = dict(os.environ)
+        if crash_after:
+            env['CRASH_AFTER'] = str(crash_after)
+            command = [sys.executable, '-c', CRASH] + args
+        else:
+            command = [sys.executable, SCRIPT] + args
+        devnull = open(os.devnull, 'w')
+        status = subprocess.call(command, cwd=DATA, env=env, stderr=devnull)
+        devnull.close()
+        return(status)
+
+    def test_resume(self):
+        '''A run killed after a checkpoint and resumed gives the same output
+        as an uninterrupted run.'''
+        args = ['-i', 'sim.vcf', '-b', 'bamlist.txt', '-n', 'normfactors.txt',
+                '--checkpoint_interval', '5']
+        straight = os.path.join(self.tmpdir, 'straight.vcf')
+        self.assertEqual(self.run_script(args + ['-o', straight]), 0)
+        self.assertEqual(self.run_script(args + ['-o', self.output], crash_after=13), 9)
+        state = checkpoint.read(self.output + '.checkpoint')
+        self.assertEqual(state['records'], 10)
+        # Part of a record written after the checkpoint.
+        out = open(self.output, 'a')
+        out.write('S\t12')
+        out.close()
+        self.assertEqual(self.run_script(args + ['-o', self.output, '--resume']), 0)
+        self.assertEqual(open(self.output, 'r').read(), open(straight, 'r').read())
+        self.assertFalse(os.path.exists(self.output + '.checkpoint'))
+
+    def test_changed_options(self):
+        '''A run is not resumed with options that change the fits.'''
+        args = ['-i', 'sim.vcf', '-o', self.output, '--checkpoint_interval', '5']
+        self.assertEqual(self.run_script(args, crash_after=7), 9)
+        self.assertNotEqual(self.run_script(args + ['--resume', '--engine', 'qn']), 0)
+        self.assertNotEqual(self.run_script(args + ['--resume', '--dpmode']), 0)
+        self.assertTrue(os.path.exists(self.output + '.checkpoint'))
+        self.assertEqual(self.run_script(args + ['--resume']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
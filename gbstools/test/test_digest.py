@@ -0,0 +1,49 @@
+"""Tests of the in-silico digest (digest.py, digest_fasta.py)."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+from gbstools import digest
+
+DATA = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestDigest(unittest.TestCase):
+    def setUp(self):
+        # The faidx index is made next to the FASTA file.
+        self.tmpdir = tempfile.mkdtemp()
+        self.fasta = os.path.join(self.tmpdir, 'sim.fa')
+        shutil.copy(os.path.join(DATA, 'sim.fa'), self.fasta)
+        self.expected = open(os.path.join(DATA, 'sim.digest.bed'), 'r').read()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def bed(self, **kwargs):
+        out = StringIO()
+        digest.write_bed(digest.digest(self.fasta, ['ApeKI'], **kwargs), out)
+        return(out.getvalue())
+
+    def test_digest_fixture(self):
+        '''The ApeKI digest of sim.fa matches sim.digest.bed.'''
+        self.assertEqual(self.bed(), self.expected)
+
+    def test_regions(self):
+        '''Sites spanning region boundaries are found once.'''
+        self.assertEqual(self.bed(region_size=1000), self.expected)
+
+    def test_processes(self):
+        '''Worker processes give the same sites, in order.'''
+        self.assertEqual(self.bed(processes=3, region_size=1000), self.expected)
+
+    def test_reverse_strand(self):
+        '''Non-palindromic sites are reported on the forward strand.'''
+        patterns = digest.make_patterns({'BpuEI':'CTTGAG'})
+        sites = digest.find_sites('AACTTGAGAACTCAAGA', patterns)
+        self.assertEqual(sites, [(2, 8, 'BpuEI', '+'), (10, 16, 'BpuEI', '-')])
+
+
+if __name__ == '__main__':
+    unittest.main()
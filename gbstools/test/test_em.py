@@ -0,0 +1,123 @@
+"""Tests of the EM update (em.pyx) against a direct implementation of the
+12 latent states (z, g) of each sample."""
+
+import unittest
+from math import log, exp, lgamma
+from collections import namedtuple
+import em
+
+Call = namedtuple('Call', 'sample DP NF PL')
+
+
+def reference_update(param, calls, disp):
+    '''EM update summing over the 12 latent states of every sample.'''
+    def dreads(g, pl):
+        g_apparent = {0:g[1], 1:2 * g[1]}.get(g[2])
+        if not pl:
+            return(0.0)
+        if g_apparent is None:
+            return(-float('Inf'))
+        return(log(10**(-float(pl[g_apparent]) / 10)))
+
+    def dnbinom(x, mu, psi):
+        psi = max(int(psi), 1)
+        if x and mu <= 0:
+            return(-float('Inf'))
+        l = psi * log(psi / (mu + psi))
+        if x:
+            l += lgamma(x + psi) - lgamma(psi) - lgamma(x + 1) + x * log(mu / (mu + psi))
+        return(l)
+
+    def dlog(p):
+        return(log(p) if p > 0 else -float('Inf'))
+
+    n = len(calls)
+    lamb = param['lambda']
+    phi = [0.0, 0.0, 0.0]
+    delta = numer = denom = loglik = 0.0
+    exp_phi = {}
+    for call in calls:
+        states = []
+        for z in (0, 1):
+            for g in em.GENO:
+                m = 2.0 - g[2]
+                mu = lamb * call.NF * z * m / 2
+                psi = mu / (disp - 1)
+                g_prob = 2**(1 in g) * param['phi'][0]**g[0] * param['phi'][1]**g[1] * param['phi'][2]**g[2]
+                z_prob = (1 - param['delta'])**z * param['delta']**(1 - z)
+                lik = dreads(g, call.PL) + dnbinom(call.DP, mu, psi) + dlog(g_prob) + dlog(z_prob)
+                states.append((z, g, m, psi, exp(lik)))
+        total = sum([state[-1] for state in states])
+        exp_phi[call.sample] = [0.0, 0.0, 0.0]
+        for z, g, m, psi, lik in states:
+            w = lik / total
+            for k in range(3):
+                phi[k] += w * g[k] / (2.0 * n)
+                exp_phi[call.sample][k] += w * g[k]
+            delta += w * (1 - z) / n
+            d, r = call.DP, call.NF
+            if m * z == 0:
+                numer += w * d / lamb
+                denom -= w * d / lamb**2
+            else:
+                numer += w * (d / lamb - (d + psi) / (lamb + 2 * psi / (r * z * m)))
+                denom += w * ((r * z * m / 2)**2 * (d + psi) / (lamb * r * z * m / 2 + psi)**2 -
+                              d / lamb**2)
+        loglik += log(total)
+    return({'phi':phi, 'delta':delta, 'lambda':lamb - numer / denom,
+            'loglik':loglik, 'exp_phi':exp_phi})
+
+
+def make_calls(pl=True):
+    '''Calls with repeated evidence (groups of identical samples).'''
+    data = [(40, 1.0, [0, 30, 300]), (0, 1.0, [0, 0, 0]), (21, 0.8, [250, 0, 60]),
+            (40, 1.0, [0, 30, 300]), (0, 1.0, [0, 0, 0]), (12, 1.2, [0, 15, 120]),
+            (40, 1.0, [0, 30, 300]), (21, 0.8, [250, 0, 60]), (3, 1.0, [0, 9, 90])]
+    calls = []
+    for i, (dp, nf, call_pl) in enumerate(data):
+        if pl is None:
+            call_pl = None if i % 2 else call_pl
+        elif not pl:
+            call_pl = None
+        calls.append(Call('s%i' % i, dp, nf, call_pl))
+    return(calls)
+
+
+class TestUpdate(unittest.TestCase):
+    param = {'phi':[0.7, 0.2, 0.1], 'delta':0.02, 'lambda':30.0, 'fail':False}
+    disp = 2.5
+
+    def check(self, calls):
+        expected = reference_update(self.param, calls, self.disp)
+        result = em.update(self.param, calls, self.disp)
+        for k in range(3):
+            self.assertAlmostEqual(result['phi'][k], expected['phi'][k], places=10)
+        for key in ('delta', 'lambda', 'loglik'):
+            self.assertAlmostEqual(result[key], expected[key], places=8)
+        for call in calls:
+            for k in range(3):
+                self.assertAlmostEqual(result['exp_phi'][call.sample][k],
+                                       expected['exp_phi'][call.sample][k], places=10)
+
+    def test_pl(self):
+        '''Grouped samples with PL data (full_states).'''
+        self.check(make_calls(pl=True))
+
+    def test_dp_only(self):
+        '''Collapsed states of samples without PL data (dp_states).'''
+        self.check(make_calls(pl=False))
+
+    def test_mixed(self):
+        '''Samples with and without PL data at one marker.'''
+        self.check(make_calls(pl=None))
+
+    def test_groups(self):
+        groups = em.evidence_groups(make_calls())
+        self.assertEqual([samples for call, samples in groups],
+                         [['s0', 's3', 's6'], ['s1', 's4'], ['s2', 's7'], ['s5'], ['s8']])
+        groups = em.evidence_groups(make_calls(pl=False))
+        self.assertEqual(len(groups), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
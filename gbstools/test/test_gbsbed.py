@@ -0,0 +1,46 @@
+"""Tests of the streaming GBSBED conversion (gbsbed.py, make_gbsbed.py)."""
+
+import os
+import unittest
+from StringIO import StringIO
+from gbstools import gbsbed
+
+DATA = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestMakeSites(unittest.TestCase):
+    def convert(self, bed, **kwargs):
+        out = StringIO()
+        gbsbed.write(gbsbed.make_sites(gbsbed.parse_bed(bed), **kwargs), out)
+        return(out.getvalue())
+
+    def test_digest_fixture(self):
+        '''The streamed conversion of sim.digest.bed matches sim.digest.gbsbed.'''
+        bed = open(os.path.join(DATA, 'sim.digest.bed'), 'r')
+        expected = open(os.path.join(DATA, 'sim.digest.gbsbed'), 'r').read()
+        self.assertEqual(self.convert(bed), expected)
+
+    def test_small_buffer(self):
+        '''Output does not depend on the write buffer size.'''
+        lines = open(os.path.join(DATA, 'sim.digest.bed'), 'r').readlines()
+        records = list(gbsbed.make_sites(gbsbed.parse_bed(lines)))
+        out = StringIO()
+        gbsbed.write(records, out, buffer_lines=7)
+        self.assertEqual(out.getvalue(), self.convert(lines))
+
+    def test_chromosomes(self):
+        '''Fragments do not span chromosomes.'''
+        bed = ['S\t12\t17\tApeKI\t.\t+', 'S\t41\t46\tApeKI\t.\t+',
+               'T\t5\t10\tApeKI\t.\t+', 'T\t30\t35\tApeKI\t.\t+']
+        records = list(gbsbed.make_sites(gbsbed.parse_bed(bed)))
+        self.assertEqual([r[:5] for r in records],
+                         [('S', 12, 17, 32, '.'), ('S', 41, 46, '.', 32),
+                          ('T', 5, 10, 28, '.'), ('T', 30, 35, '.', 28)])
+
+    def test_unsorted(self):
+        bed = ['S\t41\t46\tApeKI\t.\t+', 'S\t12\t17\tApeKI\t.\t+']
+        self.assertRaises(ValueError, list, gbsbed.make_sites(gbsbed.parse_bed(bed)))
+
+
+if __name__ == '__main__':
+    unittest.main()
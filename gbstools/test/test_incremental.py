@@ -0,0 +1,77 @@
+"""Tests of the warm-start estimates from a previous run (incremental.py)."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import vcf
+from gbstools import incremental
+
+HEADER = '''##fileformat=VCFv4.1
+%s##INFO=<ID=DFreq,Number=1,Type=Float,Description="">
+##INFO=<ID=AFH1,Number=1,Type=Float,Description="">
+##INFO=<ID=AFH0,Number=1,Type=Float,Description="">
+##INFO=<ID=LambdaH1,Number=1,Type=Float,Description="">
+##INFO=<ID=LambdaH0,Number=1,Type=Float,Description="">
+##INFO=<ID=DigestH1,Number=1,Type=Float,Description="">
+##INFO=<ID=DigestH0,Number=1,Type=Float,Description="">
+#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO
+'''
+
+INFO = 'DFreq=0.1;AFH1=0.2;AFH0=0.25;LambdaH1=%i;LambdaH0=30;DigestH1=0;DigestH0=0'
+
+
+class TestPreviousEstimates(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_vcf(self, name, records, contigs=()):
+        '''Write a VCF of (chrom, pos) records (LambdaH1 is the position).'''
+        filename = os.path.join(self.tmpdir, name)
+        out = open(filename, 'w')
+        out.write(HEADER % ''.join(['##contig=<ID=%s,length=1000>\n' % c for c in contigs]))
+        for chrom, pos in records:
+            out.write('\t'.join((chrom, str(pos), '.', 'A', 'C', '.', '.', INFO % pos)) + '\n')
+        out.close()
+        return(filename)
+
+    def matches(self, previous, records):
+        '''LambdaH1 of the estimates found for input (chrom, pos) records.'''
+        estimates = incremental.PreviousEstimates(previous)
+        inputs = vcf.Reader(filename=self.write_vcf('input.vcf', records))
+        result = []
+        for record in inputs:
+            est = estimates.get(record)
+            result.append(est['H1']['lambda'] if est else None)
+        return(result)
+
+    def test_later_chromosome(self):
+        '''The input starts on a later chromosome than the previous VCF (e.g.
+        --intervals or --resume).'''
+        previous = [('A', 10), ('A', 20), ('S', 5), ('S', 7), ('T', 3)]
+        for contigs in ((), ('A', 'S', 'T')):
+            filename = self.write_vcf('previous.vcf', previous, contigs)
+            self.assertEqual(self.matches(filename, [('S', 5), ('S', 6), ('S', 7), ('T', 3)]),
+                             [5, None, 7, 3])
+            self.assertEqual(self.matches(filename, [('T', 3)]), [3])
+
+    def test_missing_chromosome(self):
+        '''Chromosomes missing from either VCF are skipped.'''
+        previous = [('A', 10), ('S', 5), ('T', 3)]
+        filename = self.write_vcf('previous.vcf', previous)
+        self.assertEqual(self.matches(filename, [('A', 10), ('B', 1), ('T', 3)]),
+                         [10, None, 3])
+
+    def test_contig_order(self):
+        '''Chromosomes are ordered by the ##contig lines, not by name.'''
+        previous = [('T', 3), ('S', 5)]
+        filename = self.write_vcf('previous.vcf', previous, ('T', 'S'))
+        self.assertEqual(self.matches(filename, [('S', 5)]), [5])
+        self.assertEqual(self.matches(filename, [('T', 3), ('S', 5)]), [3, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests of the stage timers and counters (instrument.py)."""
+
+import time
+import threading
+import unittest
+from gbstools import instrument
+
+
+def spin(seconds):
+    '''Use CPU for a number of seconds.'''
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+
+class TestStats(unittest.TestCase):
+    def test_thread_cpu(self):
+        '''A stage is not charged the CPU time of other threads.'''
+        if instrument.RUSAGE_THREAD is None:
+            self.skipTest('no per-thread CPU time')
+        stats = instrument.Stats(enabled=True)
+        worker = threading.Thread(target=spin, args=(0.5,))
+        with stats.timer('main'):
+            worker.start()
+            worker.join()
+        self.assertGreater(stats.wall['main'], 0.4)
+        self.assertLess(stats.cpu['main'], 0.2)
+        self.assertIn('cpu', stats.as_dict()['stages']['main'])
+
+    def test_threaded_counts(self):
+        '''Counters and timers updated from several threads add up.'''
+        stats = instrument.Stats(enabled=True)
+        def work():
+            for i in range(10000):
+                stats.count('events')
+                stats.add('stage', 0.001)
+        threads = [threading.Thread(target=work) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(stats.counts['events'], 40000)
+        self.assertEqual(stats.calls['stage'], 40000)
+        self.assertAlmostEqual(stats.wall['stage'], 40.0)
+
+    def test_threaded_process_cpu(self):
+        '''Process-wide CPU times are left out of threaded stats.'''
+        stats = instrument.Stats(enabled=True)
+        stats.add('stage', 1.0, 1.0)
+        stats.threaded = True
+        thread_cpu = instrument.RUSAGE_THREAD
+        try:
+            instrument.RUSAGE_THREAD = None
+            self.assertNotIn('cpu', stats.as_dict()['stages']['stage'])
+        finally:
+            instrument.RUSAGE_THREAD = thread_cpu
+        self.assertEqual(stats.as_dict()['stages']['stage']['cpu'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""Tests of the pipelined driver (pipeline.py)."""
+
+import os
+import unittest
+import gbstools
+from gbstools import pipeline
+
+DATA = os.path.dirname(os.path.abspath(__file__))
+VCF = os.path.join(DATA, 'sim.vcf')
+KEYS = ('DLR', 'DFreq', 'AFH1', 'AFH0', 'LambdaH1', 'LambdaH0', 'IterationH1', 'IterationH0')
+
+
+def serial_fits():
+    fits = []
+    for snp in gbstools.Reader(VCF):
+        snp.fit()
+        fits.append((snp.record.POS, [snp.info[key] for key in KEYS]))
+    return(fits)
+
+
+class TestRun(unittest.TestCase):
+    def run_pipeline(self, processes, process=None, write=None):
+        written = []
+        if process is None:
+            process = lambda snp: snp.task()
+        if write is None:
+            write = lambda snp: written.append((snp.record.POS, [snp.info[key] for key in KEYS]))
+        result = pipeline.run(gbstools.Reader(VCF), process, write, read_depth=2,
+                              write_depth=2, processes=processes)
+        return(written, result)
+
+    def test_workers(self):
+        '''Fits in worker processes are the serial fits, in input order.'''
+        expected = serial_fits()
+        for processes in (1, 3):
+            written, result = self.run_pipeline(processes)
+            self.assertEqual(written, expected)
+            self.assertEqual(result['markers'], len(expected))
+
+    def test_process_error(self):
+        '''An error in a stage is raised, after writing the markers before it.'''
+        expected = serial_fits()
+        seen = []
+        def process(snp):
+            seen.append(snp)
+            if len(seen) == 5:
+                raise ValueError('process')
+            return(snp.task())
+        written = []
+        def write(snp):
+            written.append((snp.record.POS, [snp.info[key] for key in KEYS]))
+        self.assertRaises(ValueError, self.run_pipeline, 2, process, write)
+        self.assertEqual(written, expected[:len(written)])
+
+    def test_write_error(self):
+        def write(snp):
+            raise IOError('write')
+        self.assertRaises(IOError, self.run_pipeline, 2, None, write)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -51,7 +51,9 @@ else:
 
 scripts = ['bin/annotate_pe_bam.py',
            'bin/annotate_se_bam.py',
+           'bin/digest_fasta.py',
            'bin/digest_to_bed.py',
+           'bin/estimate_dispersion.py',
            'bin/polymorphism_test.py',
            'bin/make_gbsbed.py',
            'bin/mapping_summary.py',
@@ -60,8 +62,10 @@ scripts = ['bin/annotate_pe_bam.py',
            'bin/simulate_fasta.py',
            'bin/simulate_fastq.py',
            'bin/simulate_gbs_vcf.py',
+           'bin/simulate_power.py',
            'bin/simulate_ped_vcf.py',
            'bin/extract_vcf_info.py',
+           'bin/gbstools_benchmark.py',
            'bin/rs_dp.py']
 
 setup(